@@ -12,7 +12,8 @@ from fastapi import APIRouter, HTTPException, Body, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from database.redis_store import redis_store
-from database.postgres_store import postgres_store
+from database.async_postgres_store import async_postgres_store
+from database.message_writer import message_writer
 from bot.whatsapp_api import WhatsAppAPI
 
 logger = logging.getLogger(__name__)
@@ -197,18 +198,15 @@ async def send_agent_message(user_id: str, request: SendMessageRequest):
         
         # Store message in database with agent identifier
         from_number = f"agent_{agent_id}"
-        try:
-            postgres_store.save_message(
-                message_id=message_id,
-                from_number=from_number,
-                to_number=user_id,
-                content=request.message,
-                direction="outbound",
-                message_type="text",
-                status="sent"
-            )
-        except Exception as e:
-            logger.error(f"Error storing agent message: {e}")
+        message_writer.add_message(
+            message_id=message_id,
+            from_number=from_number,
+            to_number=user_id,
+            content=request.message,
+            direction="outbound",
+            message_type="text",
+            status="sent"
+        )
         
         # Broadcast to connected agents via SSE
         try:
@@ -319,7 +317,7 @@ async def get_conversation(user_id: str, view_only: bool = Query(False)):
         }
         
         # Get conversation history from database
-        conversation_history = postgres_store.get_conversation_history(user_id, limit=50)
+        conversation_history = await async_postgres_store.get_conversation_history(user_id, limit=50)
         
         # Get bulk ordering state
         bulk_state = redis_store.get_bulk_order_state(user_id)
@@ -328,7 +326,7 @@ async def get_conversation(user_id: str, view_only: bool = Query(False)):
         redis_conversation = redis_store.get_conversation(user_id)
         
         # Get message count
-        user_stats = postgres_store.get_user_stats(user_id)
+        user_stats = await async_postgres_store.get_user_stats(user_id)
         message_count = user_stats.get("message_count", 0)
         
         return {
@@ -354,7 +352,7 @@ async def list_conversations(all: bool = False):
     try:
         if all:
             # Get all conversations from database
-            all_conversations = postgres_store.get_all_conversations(limit=1000)
+            all_conversations = await async_postgres_store.get_all_conversations(limit=1000)
             
             # Enrich with handoff and bulk state info
             enriched = []
@@ -413,7 +411,7 @@ async def list_conversations(all: bool = False):
                             bulk_state = redis_store.get_bulk_order_state(user_id)
                             
                             # Get last message time from database
-                            conversation_history = postgres_store.get_conversation_history(user_id, limit=1)
+                            conversation_history = await async_postgres_store.get_conversation_history(user_id, limit=1)
                             last_message_time = conversation_history[0].get("created_at") if conversation_history else None
                             
                             conversations.append({
@@ -445,7 +443,7 @@ async def list_conversations(all: bool = False):
 async def archive_conversation(user_id: str):
     """Archive a conversation"""
     try:
-        success = postgres_store.archive_conversation(user_id)
+        success = await async_postgres_store.archive_conversation(user_id)
         if success:
             return {
                 "status": "archived",
@@ -463,7 +461,7 @@ async def archive_conversation(user_id: str):
 async def unarchive_conversation(user_id: str):
     """Unarchive a conversation"""
     try:
-        success = postgres_store.unarchive_conversation(user_id)
+        success = await async_postgres_store.unarchive_conversation(user_id)
         if success:
             return {
                 "status": "unarchived",
@@ -491,7 +489,7 @@ async def get_all_conversations(
     """
     try:
         # Get all conversations from database
-        conversations = postgres_store.get_all_conversations(
+        conversations = await async_postgres_store.get_all_conversations(
             limit=limit,
             offset=offset,
             date_from=date_from,
@@ -506,7 +504,7 @@ async def get_all_conversations(
         quotes_with_quantity = {}
         if user_ids:
             try:
-                session = postgres_store.get_session()
+                session = async_postgres_store.get_session()
                 if session:
                     from sqlalchemy import text
                     # Query analytics for bulk_quote_generated events with quantity
@@ -525,10 +523,10 @@ async def get_all_conversations(
                             AND (data->>'quantity')::int > 0
                             ORDER BY user_id, created_at DESC
                         """)
-                        result = session.execute(query, params)
+                        result = await session.execute(query, params)
                         for row in result:
                             quotes_with_quantity[row.user_id] = row.quantity
-                    session.close()
+                    await session.close()
             except Exception as e:
                 logger.error(f"Error checking analytics for quantities: {e}")
         
@@ -596,7 +594,7 @@ async def get_conversation_stats():
     """
     try:
         # Get all conversations
-        all_conversations = postgres_store.get_all_conversations(limit=10000)
+        all_conversations = await async_postgres_store.get_all_conversations(limit=10000)
         
         # Count claimed conversations
         claimed_count = 0
@@ -614,7 +612,7 @@ async def get_conversation_stats():
         # Calculate recent activity (last 24 hours)
         from datetime import datetime, timedelta
         yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
-        recent_conversations = postgres_store.get_all_conversations(
+        recent_conversations = await async_postgres_store.get_all_conversations(
             limit=10000,
             date_from=yesterday
         )
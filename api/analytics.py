@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Query, HTTPException
 from sqlalchemy import text, func
-from database.postgres_store import postgres_store
+from database.async_postgres_store import async_postgres_store
 import json
 
 logger = logging.getLogger(__name__)
@@ -28,6 +28,14 @@ def parse_jsonb_data(data: Any) -> Dict[str, Any]:
     return {}
 
 
+def parse_date_param(value: str, end_of_day: bool = False) -> datetime:
+    """Parse a YYYY-MM-DD query parameter (asyncpg needs datetime values, not strings)"""
+    parsed = datetime.strptime(value, "%Y-%m-%d")
+    if end_of_day:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    return parsed
+
+
 @router.get("/quotes")
 async def get_quotes(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
@@ -40,7 +48,7 @@ async def get_quotes(
     Get bulk quotes with filtering options
     Returns list of quote events with parsed data
     """
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -63,10 +71,10 @@ async def get_quotes(
         # Add date filters
         if start_date:
             query = text(str(query) + " AND created_at >= :start_date")
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             query = text(str(query) + " AND created_at <= :end_date")
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         
         # Add product filter
         if product:
@@ -78,7 +86,7 @@ async def get_quotes(
         params["limit"] = limit
         params["offset"] = offset
         
-        result = session.execute(query, params)
+        result = await session.execute(query, params)
         
         quotes = []
         for row in result:
@@ -112,7 +120,7 @@ async def get_quotes(
         logger.error(f"Error fetching quotes: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching quotes: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 @router.get("/stats")
@@ -124,7 +132,7 @@ async def get_stats(
     Get aggregated statistics for bulk quotes
     Returns total quotes, total quantity, total revenue, averages, etc.
     """
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -146,13 +154,13 @@ async def get_stats(
         
         if start_date:
             base_query += " AND created_at >= :start_date"
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             base_query += " AND created_at <= :end_date"
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         
         query = text(base_query)
-        result = session.execute(query, params).fetchone()
+        result = (await session.execute(query, params)).fetchone()
         
         if not result:
             return {
@@ -178,7 +186,7 @@ async def get_stats(
         logger.error(f"Error fetching stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 @router.get("/products")
@@ -190,7 +198,7 @@ async def get_products(
     Get quotes grouped by product
     Returns statistics per product
     """
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -212,15 +220,15 @@ async def get_products(
         
         if start_date:
             base_query += " AND created_at >= :start_date"
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             base_query += " AND created_at <= :end_date"
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         
         base_query += " GROUP BY data->>'product' ORDER BY quote_count DESC"
         
         query = text(base_query)
-        result = session.execute(query, params)
+        result = await session.execute(query, params)
         
         products = []
         for row in result:
@@ -243,7 +251,7 @@ async def get_products(
         logger.error(f"Error fetching products: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 @router.get("/timeline")
@@ -256,7 +264,7 @@ async def get_timeline(
     Get quotes over time with aggregation
     Returns daily, weekly, or monthly aggregated data
     """
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -285,15 +293,15 @@ async def get_timeline(
         
         if start_date:
             base_query += " AND created_at >= :start_date"
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             base_query += " AND created_at <= :end_date"
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         
         base_query += f" GROUP BY {date_trunc} ORDER BY date DESC"
         
         query = text(base_query)
-        result = session.execute(query, params)
+        result = await session.execute(query, params)
         
         timeline = []
         for row in result:
@@ -320,7 +328,7 @@ async def get_timeline(
         logger.error(f"Error fetching timeline: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching timeline: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 
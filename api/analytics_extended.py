@@ -7,8 +7,8 @@ import logging
 from typing import Optional
 from fastapi import Query, HTTPException
 from sqlalchemy import text
-from database.postgres_store import postgres_store
-from api.analytics import router, parse_jsonb_data
+from database.async_postgres_store import async_postgres_store
+from api.analytics import router, parse_jsonb_data, parse_date_param
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,7 @@ async def get_abandonments(
     offset: int = Query(0, ge=0, description="Offset for pagination")
 ):
     """Get abandonment events"""
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -37,10 +37,10 @@ async def get_abandonments(
         params = {}
         if start_date:
             query = text(str(query) + " AND created_at >= :start_date")
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             query = text(str(query) + " AND created_at <= :end_date")
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         if state:
             query = text(str(query) + " AND data->>'state' = :state")
             params["state"] = state
@@ -52,7 +52,7 @@ async def get_abandonments(
         params["limit"] = limit
         params["offset"] = offset
         
-        result = session.execute(query, params)
+        result = await session.execute(query, params)
         
         abandonments = []
         for row in result:
@@ -74,7 +74,7 @@ async def get_abandonments(
         logger.error(f"Error fetching abandonments: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching abandonments: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 @router.get("/abandonments/stats")
@@ -83,7 +83,7 @@ async def get_abandonment_stats(
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
 ):
     """Get abandonment statistics"""
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -99,12 +99,12 @@ async def get_abandonment_stats(
         params = {}
         if start_date:
             base_query += " AND created_at >= :start_date"
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             base_query += " AND created_at <= :end_date"
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         
-        result = session.execute(text(base_query), params).fetchone()
+        result = (await session.execute(text(base_query), params)).fetchone()
         total_abandonments = result.total_abandonments or 0
         avg_time = float(result.avg_time_before_abandonment) if result.avg_time_before_abandonment else 0.0
         
@@ -119,7 +119,7 @@ async def get_abandonment_stats(
             state_query += " AND created_at <= :end_date"
         state_query += " GROUP BY data->>'state' ORDER BY count DESC"
         
-        state_result = session.execute(text(state_query), params)
+        state_result = await session.execute(text(state_query), params)
         abandonments_by_state = [{"state": row.state or "unknown", "count": row.count} for row in state_result]
         
         return {
@@ -132,7 +132,7 @@ async def get_abandonment_stats(
         logger.error(f"Error fetching abandonment stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching abandonment stats: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 @router.get("/stage-transitions")
@@ -146,7 +146,7 @@ async def get_stage_transitions(
     offset: int = Query(0, ge=0, description="Offset for pagination")
 ):
     """Get stage transition events"""
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -160,10 +160,10 @@ async def get_stage_transitions(
         params = {}
         if start_date:
             query = text(str(query) + " AND created_at >= :start_date")
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             query = text(str(query) + " AND created_at <= :end_date")
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         if flow:
             query = text(str(query) + " AND data->>'flow' = :flow")
             params["flow"] = flow
@@ -178,7 +178,7 @@ async def get_stage_transitions(
         params["limit"] = limit
         params["offset"] = offset
         
-        result = session.execute(query, params)
+        result = await session.execute(query, params)
         
         transitions = []
         for row in result:
@@ -199,7 +199,7 @@ async def get_stage_transitions(
         logger.error(f"Error fetching stage transitions: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching stage transitions: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 @router.get("/stage-transitions/stats")
@@ -208,7 +208,7 @@ async def get_stage_transition_stats(
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
 ):
     """Get stage transition statistics"""
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -218,10 +218,10 @@ async def get_stage_transition_stats(
         
         if start_date:
             base_where += " AND created_at >= :start_date"
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             base_where += " AND created_at <= :end_date"
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         
         transitions_query = f"""
             SELECT 
@@ -234,7 +234,7 @@ async def get_stage_transition_stats(
             ORDER BY transition_count DESC
         """
         
-        result = session.execute(text(transitions_query), params)
+        result = await session.execute(text(transitions_query), params)
         transitions_per_stage = [
             {
                 "state": row.state or "unknown",
@@ -256,7 +256,7 @@ async def get_stage_transition_stats(
             LIMIT 20
         """
         
-        paths_result = session.execute(text(paths_query), params)
+        paths_result = await session.execute(text(paths_query), params)
         common_paths = [
             {"from_state": row.from_state, "to_state": row.to_state, "count": row.count}
             for row in paths_result
@@ -271,7 +271,7 @@ async def get_stage_transition_stats(
         logger.error(f"Error fetching stage transition stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching stage transition stats: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 @router.get("/funnel")
@@ -280,7 +280,7 @@ async def get_funnel(
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
 ):
     """Get funnel metrics"""
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -290,17 +290,17 @@ async def get_funnel(
         
         if start_date:
             base_where += " AND created_at >= :start_date"
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             base_where += " AND created_at <= :end_date"
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         
         starts_query = f"""
             SELECT COUNT(DISTINCT user_id) as count
             FROM analytics
             WHERE event_type = 'flow_started' {base_where}
         """
-        starts_result = session.execute(text(starts_query), params).fetchone()
+        starts_result = (await session.execute(text(starts_query), params)).fetchone()
         total_starts = starts_result.count if starts_result else 0
         
         stages_query = f"""
@@ -313,7 +313,7 @@ async def get_funnel(
             ORDER BY user_count DESC
         """
         
-        stages_result = session.execute(text(stages_query), params)
+        stages_result = await session.execute(text(stages_query), params)
         
         funnel_stages = []
         previous_count = total_starts
@@ -347,7 +347,7 @@ async def get_funnel(
             AND data->>'action_value' = 'discount_accept'
             {base_where}
         """
-        completions_result = session.execute(text(completions_query), params).fetchone()
+        completions_result = (await session.execute(text(completions_query), params)).fetchone()
         total_completions = completions_result.count if completions_result else 0
         
         completion_rate = 0.0
@@ -365,7 +365,7 @@ async def get_funnel(
         logger.error(f"Error fetching funnel: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching funnel: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 @router.get("/funnel/detailed")
@@ -374,7 +374,7 @@ async def get_funnel_detailed(
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
 ):
     """Get detailed funnel with time analysis"""
-    session = postgres_store.get_session()
+    session = async_postgres_store.get_session()
     if not session:
         raise HTTPException(status_code=503, detail="Database not available")
     
@@ -384,10 +384,10 @@ async def get_funnel_detailed(
         
         if start_date:
             base_where += " AND created_at >= :start_date"
-            params["start_date"] = start_date
+            params["start_date"] = parse_date_param(start_date)
         if end_date:
             base_where += " AND created_at <= :end_date"
-            params["end_date"] = end_date + " 23:59:59"
+            params["end_date"] = parse_date_param(end_date, end_of_day=True)
         
         time_query = f"""
             SELECT 
@@ -402,7 +402,7 @@ async def get_funnel_detailed(
             ORDER BY avg_duration DESC
         """
         
-        time_result = session.execute(text(time_query), params)
+        time_result = await session.execute(text(time_query), params)
         time_per_stage = [
             {
                 "state": row.state or "unknown",
@@ -423,7 +423,7 @@ async def get_funnel_detailed(
             ORDER BY abandonment_count DESC
         """
         
-        dropoff_result = session.execute(text(dropoff_query), params)
+        dropoff_result = await session.execute(text(dropoff_query), params)
         drop_off_points = [
             {
                 "state": row.state or "unknown",
@@ -442,7 +442,7 @@ async def get_funnel_detailed(
         logger.error(f"Error fetching detailed funnel: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching detailed funnel: {str(e)}")
     finally:
-        session.close()
+        await session.close()
 
 
 
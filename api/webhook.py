@@ -3,13 +3,36 @@ from fastapi.responses import PlainTextResponse, JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 import json
-from config.settings import WEBHOOK_VERIFY_TOKEN
+from config.settings import (
+    WEBHOOK_VERIFY_TOKEN,
+    WEBHOOK_LOG_SAMPLE_RATE,
+    DEBUG,
+    MAX_CONCURRENT_MESSAGES,
+    SHUTDOWN_DRAIN_TIMEOUT,
+    LAZY_STARTUP
+)
 from bot.whatsapp_api import WhatsAppAPI
 from bot.llm_handler import LLMHandler
 from rag.vector_store import VectorStore
+from rag.retrieval_cache import retrieval_cache
+from services.catalog_index import catalog_index
 from utils.error_handler import register_error_handlers
-from database.redis_store import redis_store
+from utils.webhook_parser import parse_webhook, loads as webhook_loads
+from utils.task_supervisor import TaskSupervisor
+from utils.http_client import http_clients
+from utils.send_scheduler import send_scheduler
+from database.async_redis_store import async_redis_store
+from services.ingest_queue import ingest_queue
+from services.message_dedup import message_deduplicator
+from services.status_tracker import status_update_batcher
+from database.message_writer import message_writer
+from database.analytics_writer import analytics_writer
+from database.async_postgres_store import async_postgres_store
+from services.response_cache import response_cache
+from services.semantic_cache import semantic_cache
+from services.warmup import warmup
 import asyncio
+import random
 import time
 
 logging.basicConfig(
@@ -47,8 +70,8 @@ import api.analytics_extended
 from api.agent_console import router as agent_router
 app.include_router(agent_router)
 
-# Initialize components
-vector_store = VectorStore()
+# Initialize components (with LAZY_STARTUP, ChromaDB is opened by the warm-up task instead of here)
+vector_store = VectorStore(lazy=LAZY_STARTUP)
 whatsapp_api = WhatsAppAPI()
 llm_handler = LLMHandler(vector_store, whatsapp_api)
 
@@ -56,55 +79,53 @@ llm_handler = LLMHandler(vector_store, whatsapp_api)
 from services.bulk_ordering import get_bulk_ordering_service
 bulk_ordering_service = get_bulk_ordering_service(whatsapp_api)
 
+# Caps concurrent process_message calls (and so concurrent OpenAI/WhatsApp calls)
+message_supervisor = TaskSupervisor(max_concurrency=MAX_CONCURRENT_MESSAGES, name="messages")
+
 # Auto-ingest documents if vector store is empty (for Railway deployment)
 import os
 from pathlib import Path
 
 def check_and_ingest_documents():
-    """Check if vector store is empty and ingest documents if needed"""
+    """Sync data/documents into the vector store (only new/changed chunks are embedded)"""
     try:
-        # Try to retrieve from vector store - if empty or error, ingest
-        try:
-            test_results = vector_store.retrieve("test query", k=1)
-            if test_results and len(test_results) > 0:
-                logger.info("✓ Vector store already has data")
-                return
-        except:
-            pass  # Vector store is empty, continue to ingestion
-        
-        logger.info("📚 Vector store is empty, ingesting documents...")
-        
-        # Check if documents directory exists
         docs_dir = Path("./data/documents")
-        if docs_dir.exists():
-            # Filter out .gitkeep and .DS_Store
-            doc_files = [f for f in docs_dir.glob("*.*") if f.name not in ['.gitkeep', '.DS_Store']]
-            
-            if doc_files:
-                logger.info(f"📄 Found {len(doc_files)} document files to ingest")
-                chunks_added = vector_store.add_documents(str(docs_dir))
-                logger.info(f"✅ Successfully ingested {chunks_added} document chunks into vector store")
-            else:
-                logger.warning("⚠️ No document files found in data/documents/ - vector store will be empty")
-        else:
+        if not docs_dir.exists():
             logger.warning("⚠️ data/documents/ directory not found - vector store will be empty")
+            return
+
+        # Filter out .gitkeep and .DS_Store
+        doc_files = [f for f in docs_dir.glob("*.*") if f.name not in ['.gitkeep', '.DS_Store']]
+        if not doc_files:
+            logger.warning("⚠️ No document files found in data/documents/ - vector store will be empty")
+            return
+
+        logger.info(f"📄 Syncing {len(doc_files)} document files into vector store")
+        report = vector_store.sync_documents(str(docs_dir))
+        if report["added"] or report["removed"]:
+            logger.info(f"✅ Vector store updated: {report['added']} chunks added, {report['removed']} removed, {report['unchanged']} unchanged")
+        else:
+            logger.info(f"✓ Vector store already up to date ({report['unchanged']} chunks)")
+        catalog_index.load()
     except Exception as e:
         logger.error(f"❌ Error checking/ingesting documents: {e}", exc_info=True)
 
-# Run on startup
-check_and_ingest_documents()
+# Warm-up steps, run after the app starts serving (or before, when LAZY_STARTUP is off)
+warmup.add_step("vector_store", vector_store.warm_up, required=True)
+warmup.add_step("sync_documents", check_and_ingest_documents)
+if llm_handler.retriever is not None:
+    warmup.add_step("bm25_index", llm_handler.retriever.warm_up)
 
 
 async def check_abandoned_conversations():
     """Background task to periodically check for abandoned conversations"""
     from datetime import datetime
-    from database.postgres_store import postgres_store
     
     while True:
         try:
             await asyncio.sleep(300)  # Check every 5 minutes
             
-            if not redis_store.client:
+            if not async_redis_store.client:
                 continue
             
             # Scan for all last_message keys
@@ -112,11 +133,11 @@ async def check_abandoned_conversations():
             abandoned_count = 0
             
             while True:
-                cursor, keys = redis_store.client.scan(cursor, match="last_message:*", count=100)
+                cursor, keys = await async_redis_store.client.scan(cursor, match="last_message:*", count=100)
                 
                 for key in keys:
                     try:
-                        data_str = redis_store.client.get(key)
+                        data_str = await async_redis_store.client.get(key)
                         if not data_str:
                             continue
                         
@@ -131,7 +152,7 @@ async def check_abandoned_conversations():
                             
                             # Only track bulk ordering flow
                             if step_info.get("flow") == "bulk_ordering":
-                                state_data = redis_store.get_bulk_order_state(user_id)
+                                state_data = await async_redis_store.get_bulk_order_state(user_id)
                                 selections = state_data.get("selections", {}) if state_data else {}
                                 
                                 abandonment_data = {
@@ -142,7 +163,7 @@ async def check_abandoned_conversations():
                                     "selections": selections
                                 }
                                 
-                                postgres_store.save_analytics_event(
+                                analytics_writer.add_event(
                                     event_type="conversation_abandoned",
                                     user_id=user_id,
                                     data=abandonment_data
@@ -152,7 +173,7 @@ async def check_abandoned_conversations():
                                 abandoned_count += 1
                                 
                                 # Clear the tracking key after logging
-                                redis_store.client.delete(key)
+                                await async_redis_store.client.delete(key)
                     except Exception as e:
                         logger.error(f"Error processing abandonment for key {key}: {e}")
                         continue
@@ -174,6 +195,28 @@ async def startup_event():
     asyncio.create_task(check_abandoned_conversations())
     logger.info("✅ Background task started: check_abandoned_conversations (runs every 5 minutes)")
 
+    await ingest_queue.start(handle_message, supervisor=message_supervisor)
+    status_update_batcher.start()
+    message_writer.start()
+    analytics_writer.start()
+
+    if LAZY_STARTUP:
+        warmup.start()
+    else:
+        await warmup.run()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain in-flight messages, then stop consuming (unfinished messages are redelivered after restart)"""
+    await ingest_queue.stop(drain_timeout=SHUTDOWN_DRAIN_TIMEOUT)
+    await status_update_batcher.stop()
+    await message_writer.stop()
+    await analytics_writer.stop()
+    await async_redis_store.close()
+    await http_clients.close()
+    await async_postgres_store.close()
+
 
 @app.get("/")
 async def root():
@@ -225,92 +268,50 @@ async def receive_webhook(request: Request):
     Receive incoming WhatsApp messages
     This is called by WhatsApp when someone sends a message
     """
-    # CRITICAL: Log FIRST before anything else to confirm POST requests arrive
-    logger.info("=" * 80)
-    logger.info("🚨 POST /webhook CALLED - Webhook endpoint hit!")
-    logger.info("=" * 80)
-    
     try:
-        # Log raw body first to see if requests are arriving
         body_bytes = await request.body()
-        logger.info(f"📦 RAW webhook body received: {len(body_bytes)} bytes")
-        
-        if len(body_bytes) == 0:
-            logger.warning("⚠️ Empty body received!")
-            return {"status": "ok"}
-        
-        import json
-        body = json.loads(body_bytes)
-        logger.info(f"📦 Webhook parsed successfully")
-        logger.info(f"📦 Body keys: {list(body.keys())}")
-        logger.info(f"📦 Full body: {body}")
-
-        # Process webhook data directly (no validation needed for demo)
-        # webhook_data = WhatsAppWebhook(**body)
-
-        # Extract message data
-        entry = body.get("entry", [])
-        if not entry:
+        if not body_bytes:
+            logger.warning("⚠️ Empty webhook body received!")
             return {"status": "ok"}
 
-        changes = entry[0].get("changes", [])
-        if not changes:
-            return {"status": "ok"}
+        body = webhook_loads(body_bytes)
 
-        value = changes[0].get("value", {})
-        messages = value.get("messages", [])
+        # Full payload logging is expensive - only in debug mode or for a sample of requests
+        if DEBUG or (WEBHOOK_LOG_SAMPLE_RATE and random.random() < WEBHOOK_LOG_SAMPLE_RATE):
+            logger.info(f"📦 Webhook body ({len(body_bytes)} bytes): {body_bytes.decode('utf-8', errors='replace')}")
 
-        if not messages:
-            # Could be a status update, not a message
-            return {"status": "ok"}
+        messages, statuses = parse_webhook(body)
+        logger.debug(f"📦 Webhook: {len(messages)} message(s), {len(statuses)} status update(s)")
 
-        # Process each message
-        for message in messages:
-            message_data = {
-                "from": message.get("from"),
-                "message_id": message.get("id"),
-                "timestamp": message.get("timestamp"),
-                "type": message.get("type")
-            }
-
-            # Handle text messages
-            if message_data["type"] == "text":
-                message_data["text"] = message.get("text", {}).get("body", "")
-                # Process message asynchronously
-                asyncio.create_task(process_message(message_data))
-
-            # Handle interactive messages (buttons and lists)
-            elif message_data["type"] == "interactive":
-                interactive = message.get("interactive", {})
-                interactive_type = interactive.get("type")
-                
-                if interactive_type == "button_reply":
-                    button_id = interactive.get("button_reply", {}).get("id")
-                    message_data["button_id"] = button_id
-                    message_data["interactive_type"] = "button"
-                    logger.info(f"🔘 Button clicked: {button_id}")
-                    # Process interactive message asynchronously
-                    asyncio.create_task(process_message(message_data))
-                
-                elif interactive_type == "list_reply":
-                    list_id = interactive.get("list_reply", {}).get("id")
-                    message_data["list_id"] = list_id
-                    message_data["interactive_type"] = "list"
-                    logger.info(f"📋 List selection: {list_id}")
-                    # Process interactive message asynchronously
-                    asyncio.create_task(process_message(message_data))
-
-            # Handle image messages
-            elif message_data["type"] == "image":
-                image_data = message.get("image", {})
-                message_data["media_id"] = image_data.get("id")
-                message_data["mime_type"] = image_data.get("mime_type")
+        # Delivery/read receipts for our outbound messages are written in batches
+        if statuses:
+            status_update_batcher.add(statuses)
+
+        # Queue each message for the worker pool
+        rejected = 0
+        for message_data in messages:
+            # WhatsApp retries deliveries - skip ids we've already accepted
+            if await message_deduplicator.is_duplicate(message_data["message_id"]):
+                logger.info(f"🔁 Duplicate delivery ignored: {message_data['message_id']}")
+                continue
+
+            if message_data.get("interactive_type") == "button":
+                logger.info(f"🔘 Button clicked: {message_data['button_id']}")
+            elif message_data.get("interactive_type") == "list":
+                logger.info(f"📋 List selection: {message_data['list_id']}")
+            elif message_data.get("media_id"):
                 logger.info(f"📷 Image received: media_id={message_data['media_id']}")
-                # Process image message asynchronously
-                asyncio.create_task(process_message(message_data))
 
-            else:
-                logger.info(f"ℹ️ Unsupported message type: {message_data['type']}")
+            if not await ingest_queue.enqueue(message_data):
+                await message_deduplicator.release(message_data["message_id"])
+                rejected += 1
+
+        if rejected:
+            # Queue is saturated - ask WhatsApp to redeliver later instead of dropping
+            return JSONResponse(
+                status_code=503,
+                content={"status": "busy", "message": f"{rejected} message(s) not accepted, retry later"}
+            )
 
         return {"status": "ok"}
 
@@ -323,10 +324,19 @@ async def receive_webhook(request: Request):
         )
 
 
+async def handle_message(message_data: dict):
+    """
+    Ingest queue handler: process a message with the sender's Redis state loaded
+    up front (one MGET) and written back in one pipeline at the end
+    """
+    async with async_redis_store.session(message_data["from"]):
+        await process_message(message_data)
+
+
 async def process_message(message_data: dict):
     """
     Process incoming message and generate response
-    Runs asynchronously to avoid blocking the webhook
+    Called by the ingest queue workers, so it never blocks the webhook
     """
     start_time = time.time()
 
@@ -347,14 +357,13 @@ async def process_message(message_data: dict):
         logger.info(f"List ID: {list_id}")
 
         # Check if agent has claimed this conversation
-        if redis_store.is_agent_handoff(from_number):
-            handoff_info = redis_store.get_agent_handoff(from_number)
+        if await async_redis_store.is_agent_handoff(from_number):
+            handoff_info = await async_redis_store.get_agent_handoff(from_number)
             agent_id = handoff_info.get("agent_id", "unknown") if handoff_info else "unknown"
             logger.info(f"🤖 Agent handoff active for {from_number} (claimed by agent {agent_id}), skipping bot response")
             
             # Still store incoming message in database
             from datetime import datetime
-            from database.postgres_store import postgres_store
             
             # Determine message content based on type
             message_content = text
@@ -363,18 +372,15 @@ async def process_message(message_data: dict):
             if not message_content:
                 message_content = f"[{message_data.get('type', 'unknown')} message]"
             
-            try:
-                postgres_store.save_message(
-                    message_id=message_id,
-                    from_number=from_number,
-                    to_number=None,
-                    content=message_content,
-                    direction="inbound",
-                    message_type=message_data.get("type", "text"),
-                    status="received"
-                )
-            except Exception as e:
-                logger.error(f"Error storing message during handoff: {e}")
+            message_writer.add_message(
+                message_id=message_id,
+                from_number=from_number,
+                to_number=None,
+                content=message_content,
+                direction="inbound",
+                message_type=message_data.get("type", "text"),
+                status="received"
+            )
             
             # Broadcast message to connected agents via SSE
             try:
@@ -400,7 +406,6 @@ async def process_message(message_data: dict):
 
         # Save incoming message to database (for all messages, not just handoff)
         from datetime import datetime
-        from database.postgres_store import postgres_store
         
         # Determine message content based on type
         message_content = text
@@ -409,21 +414,18 @@ async def process_message(message_data: dict):
         if not message_content:
             message_content = f"[{message_data.get('type', 'unknown')} message]"
         
-        try:
-            postgres_store.save_message(
-                message_id=message_id,
-                from_number=from_number,
-                to_number=None,
-                content=message_content,
-                direction="inbound",
-                message_type=message_data.get("type", "text"),
-                status="received"
-            )
-        except Exception as e:
-            logger.error(f"Error storing incoming message: {e}")
+        message_writer.add_message(
+            message_id=message_id,
+            from_number=from_number,
+            to_number=None,
+            content=message_content,
+            direction="inbound",
+            message_type=message_data.get("type", "text"),
+            status="received"
+        )
         
         # Check for conversation abandonment (15 minute timeout)
-        last_message = redis_store.get_last_message_sent(from_number)
+        last_message = await async_redis_store.get_last_message_sent(from_number)
         if last_message:
             last_time = datetime.fromisoformat(last_message["timestamp"])
             time_diff = (datetime.utcnow() - last_time).total_seconds()
@@ -431,7 +433,7 @@ async def process_message(message_data: dict):
             if time_diff > 900:  # 15 minutes = 900 seconds
                 # Log abandonment event
                 step_info = last_message.get("step_info", {})
-                state_data = redis_store.get_bulk_order_state(from_number)
+                state_data = await async_redis_store.get_bulk_order_state(from_number)
                 selections = state_data.get("selections", {}) if state_data else {}
                 
                 abandonment_data = {
@@ -442,7 +444,7 @@ async def process_message(message_data: dict):
                     "selections": selections
                 }
                 
-                postgres_store.save_analytics_event(
+                analytics_writer.add_event(
                     event_type="conversation_abandoned",
                     user_id=from_number,
                     data=abandonment_data
@@ -450,7 +452,7 @@ async def process_message(message_data: dict):
                 logger.info(f"📊 Logged abandonment for {from_number} - stopped at: {step_info.get('state', 'unknown')} (after {time_diff:.0f}s)")
             
             # Clear last message tracking since user is back
-            redis_store.clear_last_message_sent(from_number)
+            await async_redis_store.clear_last_message_sent(from_number)
 
         # Mark message as read (async, non-blocking)
         await whatsapp_api.mark_message_as_read(message_id)
@@ -492,7 +494,7 @@ async def process_message(message_data: dict):
             image_creation_service = get_image_creation_service(whatsapp_api)
             
             # Check if user is in image creation flow
-            creation_state = redis_store.get_image_creation_state(from_number)
+            creation_state = await async_redis_store.get_image_creation_state(from_number)
             logger.info(f"🔍 Image creation state for {from_number}: {creation_state}")
             
             if creation_state:
@@ -514,18 +516,18 @@ async def process_message(message_data: dict):
             end_commands = ['bye', 'end', 'goodbye', 'see you', 'farewell']
             if any(cmd in text_lower for cmd in end_commands):
                 # Clear bulk ordering state if exists
-                bulk_state = redis_store.get_bulk_order_state(from_number)
+                bulk_state = await async_redis_store.get_bulk_order_state(from_number)
                 if bulk_state:
-                    redis_store.clear_bulk_order_state(from_number)
-                    redis_store.clear_last_message_sent(from_number)
+                    await async_redis_store.clear_bulk_order_state(from_number)
+                    await async_redis_store.clear_last_message_sent(from_number)
                     logger.info(f"🔄 User {from_number} ended bulk ordering flow")
                 
                 # Clear conversation history
-                redis_store.clear_conversation(from_number)
+                await async_redis_store.clear_conversation(from_number)
                 logger.info(f"🔄 User {from_number} cleared conversation history")
                 
                 # Get user's stored language preference (or default to English)
-                user_language = redis_store.get_user_language(from_number)
+                user_language = await async_redis_store.get_user_language(from_number)
                 language_code = user_language.get("language_code", "en") if user_language else "en"
                 
                 # Send goodbye message in user's language
@@ -541,21 +543,21 @@ async def process_message(message_data: dict):
             restart_commands = ['restart', 'reset', 'cancel', 'stop', 'exit', 'start over', 'new order']
             if any(cmd in text_lower for cmd in restart_commands):
                 # Clear bulk ordering state if exists
-                bulk_state = redis_store.get_bulk_order_state(from_number)
+                bulk_state = await async_redis_store.get_bulk_order_state(from_number)
                 bulk_ended = False
                 
                 if bulk_state:
-                    redis_store.clear_bulk_order_state(from_number)
-                    redis_store.clear_last_message_sent(from_number)
+                    await async_redis_store.clear_bulk_order_state(from_number)
+                    await async_redis_store.clear_last_message_sent(from_number)
                     bulk_ended = True
                     logger.info(f"🔄 User {from_number} ended bulk ordering flow")
                 
                 # Clear conversation history (normal conversations)
-                redis_store.clear_conversation(from_number)
+                await async_redis_store.clear_conversation(from_number)
                 logger.info(f"🔄 User {from_number} cleared conversation history")
                 
                 # Get user's stored language preference (or default to English)
-                user_language = redis_store.get_user_language(from_number)
+                user_language = await async_redis_store.get_user_language(from_number)
                 language_code = user_language.get("language_code", "en") if user_language else "en"
                 
                 # Send welcome message in user's language (bulk ordering flow)
@@ -579,16 +581,16 @@ async def process_message(message_data: dict):
                 logger.info(f"🔄 Greeting detected: '{text}' - restarting flow")
                 
                 # Clear bulk ordering state if exists
-                bulk_state = redis_store.get_bulk_order_state(from_number)
+                bulk_state = await async_redis_store.get_bulk_order_state(from_number)
                 if bulk_state:
-                    redis_store.clear_bulk_order_state(from_number)
-                    redis_store.clear_last_message_sent(from_number)
+                    await async_redis_store.clear_bulk_order_state(from_number)
+                    await async_redis_store.clear_last_message_sent(from_number)
                 
                 # Clear conversation history
-                redis_store.clear_conversation(from_number)
+                await async_redis_store.clear_conversation(from_number)
                 
                 # Store language preference
-                redis_store.set_user_language(from_number, detected_language, region)
+                await async_redis_store.set_user_language(from_number, detected_language, region)
                 
                 # Send welcome message in detected language (bulk ordering flow)
                 from utils.language_detection import get_bulk_message
@@ -607,7 +609,7 @@ async def process_message(message_data: dict):
             is_bulk_request = any(keyword in text_lower for keyword in bulk_order_keywords)
             
             # Check if user is in bulk ordering flow
-            bulk_state = redis_store.get_bulk_order_state(from_number)
+            bulk_state = await async_redis_store.get_bulk_order_state(from_number)
             
             if bulk_state:
                 # Check if this is a request to start a new bulk order
@@ -629,7 +631,8 @@ async def process_message(message_data: dict):
                     await whatsapp_api.send_typing_indicator(from_number)
                     response = await llm_handler.generate_response(
                         user_id=from_number,
-                        message=text
+                        message=text,
+                        send=lambda reply: whatsapp_api.send_message(from_number, reply)
                     )
                     if response:
                         await whatsapp_api.send_message(from_number, response)
@@ -666,10 +669,11 @@ async def process_message(message_data: dict):
                 logger.info("🤖 Generating response...")
                 response = await llm_handler.generate_response(
                     user_id=from_number,
-                    message=text
+                    message=text,
+                    send=lambda reply: whatsapp_api.send_message(from_number, reply)
                 )
 
-                # Send response back (if not None - buttons might have been sent)
+                # Send response back (if not None - buttons or a streamed answer might have been sent)
                 if response:
                     logger.info(f"📤 Sending response: {response[:100]}...")
                     await whatsapp_api.send_message(from_number, response)
@@ -710,6 +714,29 @@ async def test_vector_store():
         }
 
 
+@app.get("/stats")
+async def runtime_stats():
+    """Runtime metrics for the message pipeline"""
+    return {
+        "timestamp": time.time(),
+        "ingest_queue": ingest_queue.get_stats(),
+        "message_tasks": message_supervisor.get_stats(),
+        "dedup": message_deduplicator.get_stats(),
+        "status_updates": status_update_batcher.get_stats(),
+        "message_writes": message_writer.get_stats(),
+        "analytics_writes": analytics_writer.get_stats(),
+        "response_cache": response_cache.get_stats(),
+        "semantic_cache": semantic_cache.get_stats(),
+        "embedding_cache": vector_store.embeddings.get_stats(),
+        "retrieval_cache": retrieval_cache.get_stats(),
+        "catalog": catalog_index.get_stats(),
+        "warmup": warmup.get_stats(),
+        "http_clients": http_clients.get_stats(),
+        "send_scheduler": send_scheduler.get_stats(),
+        "async_db_pool": async_postgres_store.get_pool_stats()
+    }
+
+
 @app.get("/health")
 async def health_check():
     """Detailed health check with dependency verification"""
@@ -722,16 +749,21 @@ async def health_check():
         "components": {}
     }
 
-    # Check Vector Store
-    try:
-        if vector_store.vector_store:
-            health_status["components"]["vector_store"] = "healthy"
-        else:
-            health_status["components"]["vector_store"] = "not_initialized"
-            health_status["status"] = "degraded"
-    except Exception as e:
-        health_status["components"]["vector_store"] = f"unhealthy: {str(e)}"
+    # Check warm-up (vector store, document sync, indexes)
+    health_status["ready"] = warmup.ready
+    health_status["warmup"] = warmup.get_stats()
+    if warmup.state == "failed":
         health_status["status"] = "unhealthy"
+    elif not warmup.ready:
+        health_status["status"] = "starting"
+
+    # Check Vector Store (not opened here: that would block on a cold store)
+    if vector_store.is_loaded:
+        health_status["components"]["vector_store"] = "healthy"
+    elif warmup.state == "failed":
+        health_status["components"]["vector_store"] = f"unhealthy: {warmup.errors.get('vector_store', 'not loaded')}"
+    else:
+        health_status["components"]["vector_store"] = "warming_up"
 
     # Check Redis
     try:
@@ -763,6 +795,14 @@ async def health_check():
     return health_status
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once warm-up has finished, 503 before"""
+    if warmup.ready:
+        return {"ready": True, "ready_after_seconds": warmup.ready_after}
+    return JSONResponse(status_code=503, content={"ready": False, "state": warmup.state})
+
+
 if __name__ == "__main__":
     import uvicorn
     from config.settings import PORT
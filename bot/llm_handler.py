@@ -1,24 +1,38 @@
 from langchain_openai import ChatOpenAI
 from langchain.memory import ConversationBufferMemory
 from langchain.prompts import PromptTemplate
-from config.settings import OPENAI_API_KEY, BOT_NAME
-from database.redis_store import redis_store
+from config.settings import OPENAI_API_KEY, BOT_NAME, RETRIEVAL_TOP_K, HYBRID_RETRIEVAL, STREAM_RESPONSES, STREAM_FIRST_CHUNK_MIN_CHARS
+from database.async_redis_store import async_redis_store
 from utils.retry import retry_openai_call
 from utils.error_handler import LLMError
 from services.order_tracking import order_tracking_service
+from services.response_cache import response_cache
+from services.semantic_cache import semantic_cache
+from services.catalog_index import catalog_index
 from bot.whatsapp_api import WhatsAppAPI
+from bot.prompt_builder import PromptBuilder
+from rag.hybrid_retriever import HybridRetriever
+from rag.retrieval_cache import retrieval_cache
+from utils.sentence_splitter import last_sentence_boundary
+from utils.cache_keys import is_self_contained
 from utils.language_detection import detect_language_from_greeting, get_welcome_message, get_button_labels, get_bulk_message
 import logging
 import re
+import time
 import asyncio
+from typing import Any, Awaitable, Callable, Optional, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of recent turns included in the prompt as conversation history
+HISTORY_TURNS = 6
+
 
 class LLMHandler:
     def __init__(self, vector_store, whatsapp_api: WhatsAppAPI = None):
         self.vector_store = vector_store
+        self.retriever = HybridRetriever(vector_store) if HYBRID_RETRIEVAL else None
         self.llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.7,
@@ -27,7 +41,7 @@ class LLMHandler:
         )
 
         # Use Redis for conversation storage
-        self.redis_store = redis_store
+        self.redis_store = async_redis_store
         self.whatsapp_api = whatsapp_api
 
         # Conversational prompt for all non-greeting messages
@@ -56,13 +70,20 @@ CRITICAL RULES - NO EXCEPTIONS:
 12. End with a helpful question or offer assistance
 
 Your response:"""
+        self.prompt_builder = PromptBuilder(self.conversation_prompt)
+
+    async def generate_response(self, user_id: str, message: str, send: Optional[Callable[[str], Awaitable[Any]]] = None):
+        """
+        Generate a response - FAST for greetings, detailed for questions
 
-    async def generate_response(self, user_id: str, message: str):
-        """Generate a response - FAST for greetings, detailed for questions"""
+        If send is given and the answer comes from the LLM, it is streamed to
+        the user through send (see _stream_conversational_response) and None is
+        returned, as it is when buttons were sent instead of text.
+        """
         try:
             # ALWAYS show welcome buttons for first message (empty conversation)
             # This MUST be checked FIRST before any other logic
-            conversation = self.redis_store.get_conversation(user_id)
+            conversation = await self.redis_store.get_conversation(user_id, last_n=1)
             is_first_message = not conversation or len(conversation) == 0
             
             logger.info(f"🔍 First message check: conversation={conversation}, is_first={is_first_message}")
@@ -72,7 +93,7 @@ Your response:"""
                 logger.info(f"✅ FIRST MESSAGE DETECTED - Starting bulk ordering for user {user_id}")
                 
                 # Save user message first
-                self.redis_store.append_to_conversation(user_id, "user", message)
+                await self.redis_store.append_to_conversation(user_id, "user", message)
                 
                 # Detect language from greeting
                 region, language_code = detect_language_from_greeting(message)
@@ -80,7 +101,7 @@ Your response:"""
                 
                 # Store language preference
                 if region and language_code:
-                    self.redis_store.set_user_language(user_id, language_code, region)
+                    await self.redis_store.set_user_language(user_id, language_code, region)
                 else:
                     language_code = "en"  # Default to English
                 
@@ -101,12 +122,17 @@ Your response:"""
                 await bulk_ordering_service.start_bulk_ordering(user_id)
                 
                 # Save assistant response
-                self.redis_store.append_to_conversation(user_id, "assistant", welcome_message)
+                await self.redis_store.append_to_conversation(user_id, "assistant", welcome_message)
                 
                 return None  # No text response needed, bulk flow handles it
             
+            delivered = False  # True once the response was streamed to the user
+            cacheable = True  # False when a streamed answer was cut short
+
             # Check cache first (only for non-first messages)
-            cached_response = self.redis_store.get_cached_response(message)
+            language = await self.redis_store.get_user_language(user_id) or {}
+            language_code, region = language.get("language_code"), language.get("region")
+            cached_response = await response_cache.get(message, language_code, region)
             if cached_response:
                 logger.info("✓ Using cached response")
                 return cached_response
@@ -154,7 +180,7 @@ Your response:"""
                 
                 # Store language preference
                 if region and language_code:
-                    self.redis_store.set_user_language(user_id, language_code, region)
+                    await self.redis_store.set_user_language(user_id, language_code, region)
                 
                 # Get language-specific messages and buttons
                 welcome_text = get_welcome_message(language_code)
@@ -188,7 +214,7 @@ Your response:"""
             elif message_lower in ['uhm', 'uh', 'um', 'hm', 'hmm', 'what', '?', '??', 'idk', "i don't know", "i dont know"]:
                 # User seems unclear, send welcome buttons to guide them
                 # Get user's language preference if available
-                user_language = self.redis_store.get_user_language(user_id)
+                user_language = await self.redis_store.get_user_language(user_id)
                 language_code = user_language.get("language_code", "en") if user_language else "en"
                 welcome_text = get_welcome_message(language_code)
                 button_labels = get_button_labels(language_code)
@@ -220,70 +246,203 @@ Your response:"""
 
             # ALL OTHER MESSAGES: Use conversation context and generate proper responses
             else:
-                # PARALLELIZE: Get conversation history and vector store retrieval at the same time
-                logger.info(f"🔍 Retrieving context for: {message[:50]}...")
-                
-                def get_conversation_sync():
-                    """Get conversation history (sync)"""
-                    return self.redis_store.get_conversation(user_id)
-                
-                def get_context_sync():
-                    """Retrieve vector store context (sync)"""
+                # Direct price/size questions (English only) are answered from the structured catalog
+                response = catalog_index.answer(message, region) if language_code in (None, "en") else None
+                if response is not None:
+                    logger.info("✓ Answered from catalog index")
+                else:
+                    # Embed once: the vector serves both the semantic cache lookup and retrieval
+                    corpus_version = self.vector_store.corpus_version
                     try:
-                        relevant_docs = self.vector_store.retrieve(message, k=3)  # Reduced from 5 to 3 for speed
-                        if relevant_docs:
-                            context = "\n".join([doc.page_content[:500] for doc in relevant_docs])
-                            logger.info(f"✅ Retrieved {len(relevant_docs)} relevant documents ({len(context)} chars)")
-                            return context
-                        else:
-                            logger.warning("⚠️ No documents retrieved - vector store might be empty!")
-                            return ""
+                        embedding = await self.vector_store.embeddings.aembed_query(message)
                     except Exception as e:
-                        logger.error(f"❌ Error retrieving from vector store: {e}", exc_info=True)
-                        return ""
-                
-                # Run both operations in parallel using threads
-                conversation, context = await asyncio.gather(
-                    asyncio.to_thread(get_conversation_sync),
-                    asyncio.to_thread(get_context_sync)
-                )
-                
-                # Format history from conversation
-                history = ""
-                if conversation and len(conversation) > 0:
-                    recent = conversation[-6:] if len(conversation) >= 6 else conversation
-                    history = "\n".join([f"{'Customer' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}" for msg in recent])
-
-                prompt = self.conversation_prompt.format(
-                    message=message,
-                    context=context,
-                    history=history
-                )
-
-                # Use async LLM call
-                response = await self.llm.ainvoke(prompt)
-                response_text = response.content if hasattr(response, 'content') else str(response)
-                
-                # Validate response to prevent hallucinations
-                response_text = self._validate_response(response_text, context)
-                response = response_text
-                
-                logger.info("✓ Generated conversational response")
+                        logger.warning(f"⚠️ Could not embed message, skipping semantic cache: {e}")
+                        embedding = None
+
+                    if embedding is not None:
+                        response = await semantic_cache.lookup(message, embedding, language_code, corpus_version)
+
+                    if response is None:
+                        if send is not None and STREAM_RESPONSES:
+                            response, cacheable = await self._stream_conversational_response(user_id, message, send, embedding)
+                            delivered = True
+                        else:
+                            response = await self._generate_conversational_response(user_id, message, embedding)
+                        if embedding is not None and response and cacheable:
+                            await semantic_cache.add(message, embedding, response, language_code, corpus_version)
 
             # Save conversation to Redis (only if response is not None)
-            self.redis_store.append_to_conversation(user_id, "user", message)
+            await self.redis_store.append_to_conversation(user_id, "user", message)
             if response is not None:
-                self.redis_store.append_to_conversation(user_id, "assistant", response)
+                await self.redis_store.append_to_conversation(user_id, "assistant", response)
                 # Cache response
-                self.redis_store.cache_response(message, response, ttl=3600)
+                if cacheable:
+                    await response_cache.set(message, response, language_code, region)
 
-            return response
+            return None if delivered else response
 
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             # Fallback response
             return "Sorry, I'm having trouble right now. Please try again."
 
+    async def _build_conversational_prompt(self, user_id: str, message: str, embedding=None):
+        """Retrieve context and history and build the LLM prompt (returns prompt, context)"""
+        # PARALLELIZE: Get conversation history and vector store retrieval at the same time
+        logger.info(f"🔍 Retrieving context for: {message[:50]}...")
+        corpus_version = self.vector_store.corpus_version
+
+        # Self-contained questions are answered from the knowledge base alone, so their answers can be
+        # cached and served to other users (see SemanticCache); only follow-ups get the history
+        use_history = not is_self_contained(message)
+
+        async def get_history():
+            if not use_history:
+                return []
+            return await self.redis_store.get_conversation(user_id, last_n=HISTORY_TURNS)
+
+        def get_context_sync():
+            """Retrieve vector store context chunks, most relevant first (sync)"""
+            try:
+                if self.retriever is not None:
+                    relevant_docs = self.retriever.retrieve(message, k=RETRIEVAL_TOP_K, embedding=embedding)
+                elif embedding is not None:
+                    relevant_docs = self.vector_store.retrieve_by_vector(embedding, k=RETRIEVAL_TOP_K)
+                else:
+                    relevant_docs = self.vector_store.retrieve(message, k=RETRIEVAL_TOP_K)
+                if relevant_docs:
+                    logger.info(f"✅ Retrieved {len(relevant_docs)} relevant documents")
+                    retrieval_cache.put(message, RETRIEVAL_TOP_K, corpus_version, relevant_docs)
+                    return [doc.page_content for doc in relevant_docs]
+                else:
+                    logger.warning("⚠️ No documents retrieved - vector store might be empty!")
+                    return []
+            except Exception as e:
+                logger.error(f"❌ Error retrieving from vector store: {e}", exc_info=True)
+                return []
+
+        # Hot queries skip the vector/BM25 search entirely
+        cached_docs = retrieval_cache.get(message, RETRIEVAL_TOP_K, corpus_version)
+        if cached_docs is not None:
+            logger.info(f"✅ Using {len(cached_docs)} cached retrieval results")
+            conversation = await get_history()
+            chunks = [doc.page_content for doc in cached_docs]
+        else:
+            # Run both operations in parallel (vector search in a thread, Redis natively async)
+            conversation, chunks = await asyncio.gather(
+                get_history(),
+                asyncio.to_thread(get_context_sync)
+            )
+
+        # Fill the token budget: rules and message first, then context, then recent history
+        prompt, context, tokens = self.prompt_builder.build(message, chunks, conversation)
+        logger.info(
+            f"🧮 Prompt tokens: {tokens['total']} (rules {tokens['rules']}, message {tokens['message']}, "
+            f"context {tokens['context']} in {tokens['context_chunks']} chunks, history {tokens['history']} in {tokens['history_turns']} turns)"
+        )
+        return prompt, context
+
+    async def _generate_conversational_response(self, user_id: str, message: str, embedding=None) -> str:
+        """Retrieve context and generate an answer with the LLM"""
+        prompt, context = await self._build_conversational_prompt(user_id, message, embedding)
+
+        # Use async LLM call
+        response = await self.llm.ainvoke(prompt)
+        response_text = response.content if hasattr(response, 'content') else str(response)
+
+        # Validate response to prevent hallucinations
+        response_text = self._validate_response(response_text, context)
+
+        logger.info("✓ Generated conversational response")
+        return response_text
+
+    async def _stream_conversational_response(self, user_id: str, message: str, send: Callable[[str], Awaitable[Any]],
+                                              embedding=None) -> Tuple[Optional[str], bool]:
+        """
+        Generate an answer with the LLM, delivering it while it is generated
+
+        The first complete sentence(s) of at least STREAM_FIRST_CHUNK_MIN_CHARS
+        are sent as soon as they are generated; the rest follows as one message
+        when generation finishes. Every completed sentence is checked with
+        _validate_response before anything containing it is sent, and
+        generation is stopped at the first sentence that fails. If generation
+        or delivery fails after the first chunk went out, only a short note
+        that the answer was cut off is sent; failures before that are raised
+        so the caller's usual fallback applies.
+
+        Args:
+            user_id: User identifier
+            message: User message
+            send: Coroutine function delivering a text message to the user
+            embedding: Precomputed message embedding (optional)
+
+        Returns:
+            (text delivered, or None if the stream failed part way; whether the
+            text is a complete validated answer that may be cached)
+        """
+        prompt, context = await self._build_conversational_prompt(user_id, message, embedding)
+
+        start = time.perf_counter()
+        full = ""
+        validated_upto = 0
+        sent_upto = 0
+        first_send = None
+        rejected = False
+
+        try:
+            stream = self.llm.astream(prompt)
+            try:
+                async for chunk in stream:
+                    full += chunk.content if hasattr(chunk, 'content') else str(chunk)
+                    boundary = last_sentence_boundary(full)
+                    if boundary <= validated_upto:
+                        continue
+
+                    if self._validate_response(full[:boundary], context) != full[:boundary]:
+                        rejected = True
+                        break
+                    validated_upto = boundary
+
+                    if first_send is None and boundary >= STREAM_FIRST_CHUNK_MIN_CHARS:
+                        first_send = asyncio.create_task(send(full[:boundary].strip()))
+                        sent_upto = boundary
+                        logger.info(f"⚡ First chunk ready after {(time.perf_counter() - start) * 1000:.0f}ms")
+            finally:
+                await stream.aclose()
+
+            if not rejected and self._validate_response(full, context) != full:
+                rejected = True
+
+            if first_send is not None:
+                await first_send
+
+            if rejected:
+                logger.warning("⚠️ Streamed response failed validation, stopping generation")
+                fallback = self._validate_response(full, context)
+                if fallback == full:
+                    fallback = "I don't have that specific information in our current database. Let me help you find something from our available range."
+                await send(fallback)
+                delivered = f"{full[:sent_upto].strip()}\n{fallback}".strip()
+            else:
+                rest = full[sent_upto:].strip()
+                if rest:
+                    await send(rest)
+                delivered = full.strip()
+        except Exception as e:
+            if first_send is None:
+                raise
+            # Part of the answer may already be with the user: finish the first send and say it was cut off
+            logger.error(f"❌ Streaming failed after the first chunk: {e}")
+            await asyncio.gather(first_send, return_exceptions=True)
+            try:
+                await send("Sorry, I couldn't finish that answer. Please ask again.")
+            except Exception as send_error:
+                logger.error(f"❌ Could not send stream continuation: {send_error}")
+            return None, False
+
+        logger.info(f"✓ Streamed conversational response in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return delivered, not rejected
+
     def _is_order_tracking_request(self, message_lower: str) -> bool:
         """Check if the message is about order tracking"""
         tracking_keywords = [
@@ -322,7 +481,7 @@ Your response:"""
                 first_message, second_message = order_tracking_service.format_tracking_response(tracking_data)
                 
                 # Store the order number in conversation context
-                self.redis_store.append_to_conversation(user_id, "system", f"Order tracked: {order_number}")
+                await self.redis_store.append_to_conversation(user_id, "system", f"Order tracked: {order_number}")
                 
                 # Send first message
                 if self.whatsapp_api:
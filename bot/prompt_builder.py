@@ -0,0 +1,134 @@
+"""Token-budgeted assembly of the conversational prompt"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+from config.settings import PROMPT_TOKEN_BUDGET, PROMPT_CHUNK_MAX_TOKENS, PROMPT_TURN_MAX_TOKENS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is in requirements.txt
+    tiktoken = None
+
+
+class PromptBuilder:
+    """
+    Fills a prompt template within a token budget
+
+    Parts are added by priority: the template itself (system rules) and the
+    current message always go in, then retrieved context chunks in relevance
+    order, then conversation history from the newest turn backwards. Each
+    chunk and turn is capped individually so one long document or message
+    can't crowd out everything else. Token counts use the model's tiktoken
+    encoding (cl100k_base if the installed tiktoken doesn't know the model,
+    roughly 4 characters per token if tiktoken or its encoding
+    files are unavailable).
+    """
+
+    def __init__(self, template: str, model: str = "gpt-4o-mini", budget: int = PROMPT_TOKEN_BUDGET,
+                 chunk_max_tokens: int = PROMPT_CHUNK_MAX_TOKENS, turn_max_tokens: int = PROMPT_TURN_MAX_TOKENS):
+        """
+        Args:
+            template: Prompt with {history}, {message} and {context} placeholders
+            model: Model name used to pick the tokenizer
+            budget: Maximum prompt tokens
+            chunk_max_tokens: Maximum tokens per context chunk
+            turn_max_tokens: Maximum tokens per history turn
+        """
+        self.template = template
+        self.budget = budget
+        self.chunk_max_tokens = chunk_max_tokens
+        self.turn_max_tokens = turn_max_tokens
+        self.encoding = self._load_encoding(model)
+        self.template_tokens = self.count(template.format(history="", message="", context=""))
+
+    @staticmethod
+    def _load_encoding(model: str):
+        if tiktoken is None:
+            logger.warning("⚠️ tiktoken not installed, estimating prompt tokens from length")
+            return None
+        try:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # Encodings are downloaded on first use; don't fail startup if that isn't possible
+            logger.warning(f"⚠️ Could not load tiktoken encoding, estimating prompt tokens from length: {e}")
+            return None
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        if not text:
+            return 0
+        if self.encoding is None:
+            return (len(text) + 3) // 4
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens tokens"""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is None:
+            return text[:max_tokens * 4]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max_tokens])
+
+    def build(self, message: str, context_chunks: List[str], history: Optional[List[Dict[str, str]]] = None) -> Tuple[str, str, Dict[str, int]]:
+        """
+        Assemble the prompt
+
+        Args:
+            message: Current customer message
+            context_chunks: Retrieved chunks, most relevant first
+            history: Conversation turns, oldest first (dicts with role and content)
+
+        Returns:
+            (prompt, context text that was included, token counts per part)
+        """
+        remaining = self.budget - self.template_tokens
+
+        message = self.truncate(message, max(remaining // 2, 0))
+        message_tokens = self.count(message)
+        remaining -= message_tokens
+
+        included_chunks = []
+        context_tokens = 0
+        for chunk in context_chunks:
+            # Leave room for the newline separator, so a chunk cut to fit is still included
+            chunk = self.truncate(chunk, min(self.chunk_max_tokens, remaining - 1))
+            tokens = self.count(chunk) + 1  # newline separator
+            if not chunk or tokens > remaining:
+                break
+            included_chunks.append(chunk)
+            context_tokens += tokens
+            remaining -= tokens
+
+        included_turns = []
+        history_tokens = 0
+        for turn in reversed(history or []):
+            speaker = 'Customer' if turn.get('role') == 'user' else 'Assistant'
+            line = f"{speaker}: {self.truncate(turn.get('content', ''), self.turn_max_tokens)}"
+            tokens = self.count(line) + 1
+            if tokens > remaining:
+                break
+            included_turns.append(line)
+            history_tokens += tokens
+            remaining -= tokens
+        included_turns.reverse()
+
+        context = "\n".join(included_chunks)
+        prompt = self.template.format(history="\n".join(included_turns), message=message, context=context)
+        counts = {
+            "total": self.template_tokens + message_tokens + context_tokens + history_tokens,
+            "rules": self.template_tokens,
+            "message": message_tokens,
+            "context": context_tokens,
+            "context_chunks": len(included_chunks),
+            "history": history_tokens,
+            "history_turns": len(included_turns)
+        }
+        return prompt, context, counts
@@ -5,7 +5,9 @@ from typing import Optional, Dict, Any
 from config.settings import WHATSAPP_TOKEN, PHONE_NUMBER_ID
 from utils.retry import retry_api_call
 from utils.error_handler import WhatsAppAPIError
-from database.redis_store import redis_store
+from database.message_writer import message_writer
+from utils.http_client import http_clients
+from utils.send_scheduler import send_scheduler
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +25,16 @@ class WhatsAppAPI:
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
-        self.client = httpx.AsyncClient(timeout=10.0)
+        # Shared pooled client (HTTP/2 to graph.facebook.com); every WhatsAppAPI instance reuses it
+        self.client = http_clients.get("whatsapp", http2=True)
+
+    async def _post_message(self, to: str, url: str, payload: Dict[str, Any]) -> httpx.Response:
+        """POST a message through the send scheduler (rate limits, per-recipient ordering, 429 retries)"""
+        return await send_scheduler.send(
+            self.phone_number_id,
+            to,
+            lambda: self.client.post(url, headers=self.headers, json=payload)
+        )
 
     async def send_message(self, to: str, message: str, step_info: Optional[Dict[str, Any]] = None):
         """
@@ -51,7 +62,7 @@ class WhatsAppAPI:
         }
 
         try:
-            response = await self.client.post(url, headers=self.headers, json=payload)
+            response = await self._post_message(to, url, payload)
             response.raise_for_status()
 
             data = response.json()
@@ -60,25 +71,21 @@ class WhatsAppAPI:
             # Extract message_id from WhatsApp API response
             message_id = data.get("messages", [{}])[0].get("id") if data.get("messages") else None
             
-            # Save message to database
+            # Save message to database (buffered, written in the next batch)
             if message_id:
-                try:
-                    from database.postgres_store import postgres_store
-                    postgres_store.save_message(
-                        message_id=message_id,
-                        from_number="bot",  # Bot message identifier
-                        to_number=to,
-                        content=message,
-                        direction="outbound",
-                        message_type="text",
-                        status="sent"
-                    )
-                except Exception as e:
-                    logger.error(f"Error storing bot message: {e}")
+                message_writer.add_message(
+                    message_id=message_id,
+                    from_number="bot",  # Bot message identifier
+                    to_number=to,
+                    content=message,
+                    direction="outbound",
+                    message_type="text",
+                    status="sent"
+                )
             
             # Track last message sent for abandonment detection (only for bulk ordering flow)
             if step_info and step_info.get("flow") == "bulk_ordering":
-                redis_store.set_last_message_sent(to, message, step_info)
+                message_writer.set_last_message(to, message, step_info)
             
             return data
 
@@ -127,7 +134,7 @@ class WhatsAppAPI:
         }
 
         try:
-            response = await self.client.post(url, headers=self.headers, json=payload)
+            response = await self._post_message(to, url, payload)
             response.raise_for_status()
 
             data = response.json()
@@ -194,8 +201,8 @@ class WhatsAppAPI:
             return None
 
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Close the shared HTTP clients (call once on shutdown)"""
+        await http_clients.close()
 
     async def send_typing_indicator(self, to: str):
         """Send typing indicator - immediate user feedback (WhatsApp shows typing via read receipts)"""
@@ -247,7 +254,7 @@ class WhatsAppAPI:
         }
         
         try:
-            response = await self.client.post(url, headers=self.headers, json=payload)
+            response = await self._post_message(to, url, payload)
             response.raise_for_status()
             
             data = response.json()
@@ -255,7 +262,7 @@ class WhatsAppAPI:
             
             # Track last message sent for abandonment detection (only for bulk ordering flow)
             if step_info and step_info.get("flow") == "bulk_ordering":
-                redis_store.set_last_message_sent(to, body_text, step_info)
+                message_writer.set_last_message(to, body_text, step_info)
             
             return data
             
@@ -322,7 +329,7 @@ class WhatsAppAPI:
         }
         
         try:
-            response = await self.client.post(url_endpoint, headers=self.headers, json=payload)
+            response = await self._post_message(to, url_endpoint, payload)
             response.raise_for_status()
             
             data = response.json()
@@ -330,7 +337,7 @@ class WhatsAppAPI:
             
             # Track last message sent for abandonment detection
             if step_info and step_info.get("flow") == "bulk_ordering":
-                redis_store.set_last_message_sent(to, body_text, step_info)
+                message_writer.set_last_message(to, body_text, step_info)
             
             return data
             
@@ -403,7 +410,7 @@ class WhatsAppAPI:
         }
         
         try:
-            response = await self.client.post(url, headers=self.headers, json=payload)
+            response = await self._post_message(to, url, payload)
             response.raise_for_status()
             
             data = response.json()
@@ -411,7 +418,7 @@ class WhatsAppAPI:
             
             # Track last message sent for abandonment detection (only for bulk ordering flow)
             if step_info and step_info.get("flow") == "bulk_ordering":
-                redis_store.set_last_message_sent(to, body_text, step_info)
+                message_writer.set_last_message(to, body_text, step_info)
             
             return data
             
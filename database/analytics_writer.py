@@ -0,0 +1,238 @@
+"""Buffered analytics event sink with multi-row INSERTs and a Redis spill buffer for DB outages"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from config.settings import ANALYTICS_FLUSH_INTERVAL, ANALYTICS_FLUSH_MAX_BATCH, ANALYTICS_SPILL_MAX
+from database.postgres_store import postgres_store
+from database.async_redis_store import async_redis_store
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsWriter:
+    """
+    Accumulates analytics events in memory and writes them in batches
+
+    add_event() has the same arguments as PostgresStore.save_analytics_event but
+    only appends to a list. A flush runs every interval, or sooner when
+    max_batch events are buffered, and writes each batch with one multi-row
+    INSERT. If Postgres is down, the batch is pushed to a capped Redis list
+    instead of being retried in memory, so a brief outage neither grows the
+    process nor loses events. After the next successful write the spilled
+    events are drained back into Postgres. Events are dropped (and counted)
+    only when both the database and Redis are unavailable and the in-memory
+    buffer is full, or when the spill list exceeds spill_max.
+    """
+
+    SPILL_KEY = "analytics:spill"
+
+    # Upper bound on buffered events kept while neither Postgres nor Redis is available
+    MAX_BUFFERED = 20000
+
+    def __init__(
+        self,
+        flush_interval: float = ANALYTICS_FLUSH_INTERVAL,
+        max_batch: int = ANALYTICS_FLUSH_MAX_BATCH,
+        spill_max: int = ANALYTICS_SPILL_MAX
+    ):
+        self.postgres_store = postgres_store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.spill_max = spill_max
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.received = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.spilled = 0
+        self.unspilled = 0
+        self.spill_depth = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def add_event(self, event_type: str, user_id: Optional[str], data: Dict[str, Any], email: Optional[str] = None):
+        """Buffer an analytics event (written in the next batch)"""
+        if len(self._pending) >= self.MAX_BUFFERED:
+            self.dropped += 1
+            return
+
+        self._pending.append({
+            "event_type": event_type,
+            "user_id": user_id,
+            "email": email,
+            "data": data,
+            "created_at": datetime.utcnow()
+        })
+        self.received += 1
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ Analytics writer started (interval={self.flush_interval}s, max_batch={self.max_batch})")
+
+    async def stop(self):
+        """Stop the flush task and write (or spill) whatever is still buffered"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        """Flush every interval, or sooner when the buffer reaches max_batch"""
+        await self._load_spill_depth()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> int:
+        """Write rows to Postgres (raises if the database is unavailable)"""
+        if not self.postgres_store.engine:
+            raise RuntimeError("PostgreSQL not available")
+        written = 0
+        for i in range(0, len(rows), self.max_batch):
+            written += await asyncio.to_thread(self.postgres_store.save_analytics_events, rows[i:i + self.max_batch])
+        return written
+
+    @staticmethod
+    def _encode(row: Dict[str, Any]) -> str:
+        return json.dumps({**row, "created_at": row["created_at"].isoformat()})
+
+    @staticmethod
+    def _decode(item: str) -> Dict[str, Any]:
+        row = json.loads(item)
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+        return row
+
+    async def _spill(self, rows: List[Dict[str, Any]]) -> bool:
+        """Push rows to the Redis spill list, keeping at most spill_max (newest)"""
+        if not async_redis_store.client:
+            return False
+        try:
+            pipe = async_redis_store.client.pipeline(transaction=False)
+            pipe.rpush(self.SPILL_KEY, *[self._encode(row) for row in rows])
+            pipe.ltrim(self.SPILL_KEY, -self.spill_max, -1)
+            length, _ = await pipe.execute()
+            self.spilled += len(rows)
+            if length > self.spill_max:
+                self.dropped += length - self.spill_max
+            self.spill_depth = min(length, self.spill_max)
+            logger.warning(f"⚠️ Spilled {len(rows)} analytics events to Redis ({self.spill_depth} waiting)")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Could not spill analytics events to Redis: {e}")
+            return False
+
+    async def _drain_spill(self):
+        """Move spilled events back into Postgres, one batch at a time"""
+        if not async_redis_store.client:
+            return
+        try:
+            while True:
+                items = await async_redis_store.client.lrange(self.SPILL_KEY, 0, self.max_batch - 1)
+                if not items:
+                    self.spill_depth = 0
+                    return
+                rows = []
+                for item in items:
+                    try:
+                        rows.append(self._decode(item))
+                    except (ValueError, KeyError, TypeError):
+                        self.dropped += 1
+                await self._insert(rows)
+                await async_redis_store.client.ltrim(self.SPILL_KEY, len(items), -1)
+                self.unspilled += len(rows)
+                self.written += len(rows)
+                self.spill_depth = max(0, self.spill_depth - len(items))
+                if len(items) < self.max_batch:
+                    self.spill_depth = 0
+                    logger.info(f"✅ Drained spilled analytics events back into PostgreSQL ({self.unspilled} total)")
+                    return
+        except Exception as e:
+            logger.error(f"❌ Error draining spilled analytics events, will retry next flush: {e}")
+
+    async def flush(self) -> int:
+        """
+        Write buffered events (spilling them to Redis if the database is unavailable)
+
+        Returns:
+            Number of rows written
+        """
+        if not self._pending and not self.spill_depth:
+            return 0
+
+        batch = self._pending
+        self._pending = []
+        start = time.perf_counter()
+        written = 0
+
+        if batch:
+            try:
+                written = await self._insert(batch)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Error writing analytics events: {e}")
+                if not await self._spill(batch):
+                    # Neither store is available: keep the events in memory, up to MAX_BUFFERED
+                    room = max(0, self.MAX_BUFFERED - len(self._pending))
+                    self.dropped += max(0, len(batch) - room)
+                    self._pending = batch[:room] + self._pending
+                return 0
+            self.written += written
+            self.flushes += 1
+
+        if self.spill_depth:
+            await self._drain_spill()
+
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+        if written:
+            logger.debug(f"📊 Wrote {written} analytics events in {self.last_flush_ms:.1f}ms")
+        return written
+
+    async def _load_spill_depth(self):
+        """Pick up events spilled by a previous process"""
+        if not async_redis_store.client:
+            return
+        try:
+            self.spill_depth = await async_redis_store.client.llen(self.SPILL_KEY)
+            if self.spill_depth:
+                logger.info(f"📊 {self.spill_depth} spilled analytics events waiting to be written")
+        except Exception as e:
+            logger.error(f"Error reading analytics spill length: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching, spill and drop metrics"""
+        return {
+            "buffered": len(self._pending),
+            "received": self.received,
+            "rows_written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "spilled": self.spilled,
+            "unspilled": self.unspilled,
+            "spill_depth": self.spill_depth,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2)
+        }
+
+
+# Global instance
+analytics_writer = AnalyticsWriter()
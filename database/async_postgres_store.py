@@ -0,0 +1,302 @@
+"""Async PostgreSQL store (asyncpg) for queries made from FastAPI handlers"""
+
+import logging
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from sqlalchemy import select, func, or_
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from config.settings import DATABASE_URL
+from database.postgres_store import Message, Conversation
+from utils.retry import retry_db_operation
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    import asyncpg  # noqa: F401
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+
+
+def _asyncpg_url(database_url: str):
+    """
+    Convert a libpq-style URL to the asyncpg dialect
+
+    asyncpg does not understand sslmode, so it is removed from the URL and
+    returned as the ssl connect argument instead.
+
+    Returns:
+        Tuple of (url, ssl setting or None)
+    """
+    url = make_url(database_url)
+    sslmode = url.query.get("sslmode")
+    url = url.set(drivername="postgresql+asyncpg").difference_update_query(["sslmode"])
+    ssl = "require" if sslmode in ("require", "verify-ca", "verify-full") else None
+    return url, ssl
+
+
+class AsyncPostgresStore:
+    """
+    Async counterpart of PostgresStore for the dashboard handlers
+
+    Offers the read and archive methods the agent console and analytics APIs
+    use as coroutines on an asyncpg-backed engine, so handlers await the
+    database instead of blocking the event loop (and every other webhook being
+    processed) for the length of a query. Tables are created and migrated by
+    PostgresStore, and message and analytics writes go through its batch
+    writers. The pool is sized for dashboard traffic.
+    """
+
+    def __init__(self, database_url: str = DATABASE_URL):
+        """Create the async engine (connections are opened on first use)"""
+        self.engine = None
+        self.SessionLocal = None
+
+        if not ASYNCPG_AVAILABLE:
+            logger.warning("⚠️ asyncpg not installed - async PostgreSQL store disabled")
+            return
+
+        try:
+            url, ssl = _asyncpg_url(database_url)
+            connect_args = {
+                "timeout": 10,
+                "server_settings": {
+                    "application_name": "whatsapp_bot_async",
+                    "statement_timeout": "30000"  # 30 second query timeout
+                }
+            }
+            if ssl:
+                connect_args["ssl"] = ssl
+
+            self.engine = create_async_engine(
+                url,
+                pool_size=5,
+                max_overflow=5,
+                pool_timeout=30,
+                pool_recycle=3600,
+                pool_pre_ping=True,
+                pool_use_lifo=True,
+                connect_args=connect_args
+            )
+            self.SessionLocal = async_sessionmaker(
+                bind=self.engine,
+                autoflush=False,
+                expire_on_commit=False
+            )
+            logger.info("✓ Async PostgreSQL engine created (asyncpg, size=5, max_overflow=5)")
+        except Exception as e:
+            logger.error(f"❌ Failed to create async PostgreSQL engine: {e}")
+            self.engine = None
+            self.SessionLocal = None
+
+    def get_session(self) -> Optional["AsyncSession"]:
+        """Get database session"""
+        if not self.SessionLocal:
+            return None
+        return self.SessionLocal()
+
+    @retry_db_operation()
+    async def get_conversation_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get conversation history for a user"""
+        session = self.get_session()
+        if not session:
+            return []
+
+        try:
+            result = await session.execute(
+                select(Message)
+                .where(or_(Message.from_number == user_id, Message.to_number == user_id))
+                .order_by(Message.created_at.desc())
+                .limit(limit)
+            )
+            messages = result.scalars().all()
+
+            return [
+                {
+                    "message_id": msg.message_id,
+                    "content": msg.content,
+                    "direction": msg.direction,
+                    "created_at": msg.created_at.isoformat()
+                }
+                for msg in reversed(messages)
+            ]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting conversation history: {e}")
+            return []
+        finally:
+            await session.close()
+
+    @retry_db_operation()
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Get statistics for a user"""
+        session = self.get_session()
+        if not session:
+            return {}
+
+        try:
+            message_count = await session.scalar(
+                select(func.count(Message.id)).where(Message.from_number == user_id)
+            )
+            conversation = await session.scalar(
+                select(Conversation).where(Conversation.user_id == user_id).limit(1)
+            )
+
+            return {
+                "message_count": message_count or 0,
+                "first_message": conversation.created_at.isoformat() if conversation else None,
+                "last_updated": conversation.updated_at.isoformat() if conversation else None
+            }
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting user stats: {e}")
+            return {}
+        finally:
+            await session.close()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        if not self.engine:
+            return {"status": "unavailable"}
+
+        try:
+            pool = self.engine.pool
+            return {
+                "status": "connected",
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "total_connections": pool.size() + pool.overflow()
+            }
+        except Exception as e:
+            logger.error(f"Error getting pool stats: {e}")
+            return {"status": "error", "error": str(e)}
+
+    @staticmethod
+    def _parse_date(value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    @retry_db_operation()
+    async def get_all_conversations(self, limit: int = 100, offset: int = 0, date_from: Optional[str] = None, date_to: Optional[str] = None, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all unique conversations (users who have sent messages)
+
+        Args:
+            limit: Maximum number of conversations to return
+            offset: Offset for pagination
+            date_from: Filter conversations from this date (ISO format)
+            date_to: Filter conversations to this date (ISO format)
+            include_archived: If True, include archived conversations
+
+        Returns:
+            List of conversation summaries with user_id, last_message_time, message_count, is_archived
+        """
+        session = self.get_session()
+        if not session:
+            return []
+
+        try:
+            # Exclude bot messages (from_number = "bot" or starts with "agent_")
+            query = (
+                select(
+                    Message.from_number,
+                    func.max(Message.created_at).label('last_message_time'),
+                    func.count(Message.id).label('message_count')
+                )
+                .where(~Message.from_number.like('bot%'))
+                .where(~Message.from_number.like('agent_%'))
+                .group_by(Message.from_number)
+            )
+
+            archived_user_ids = set(
+                (await session.execute(select(Conversation.user_id).where(Conversation.is_archived == True))).scalars().all()
+            )
+            if archived_user_ids and not include_archived:
+                query = query.where(~Message.from_number.in_(archived_user_ids))
+
+            date_from_dt = self._parse_date(date_from)
+            if date_from_dt:
+                query = query.where(Message.created_at >= date_from_dt)
+            date_to_dt = self._parse_date(date_to)
+            if date_to_dt:
+                query = query.where(Message.created_at <= date_to_dt)
+
+            query = query.order_by(func.max(Message.created_at).desc()).limit(limit).offset(offset)
+            results = (await session.execute(query)).all()
+
+            return [
+                {
+                    "user_id": result.from_number,
+                    "last_message_time": result.last_message_time.isoformat() if result.last_message_time else None,
+                    "message_count": result.message_count,
+                    "is_archived": result.from_number in archived_user_ids
+                }
+                for result in results
+            ]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting all conversations: {e}")
+            return []
+        finally:
+            await session.close()
+
+    @retry_db_operation()
+    async def archive_conversation(self, user_id: str) -> bool:
+        """Archive a conversation"""
+        session = self.get_session()
+        if not session:
+            return False
+
+        try:
+            conversation = await session.scalar(select(Conversation).where(Conversation.user_id == user_id).limit(1))
+            if conversation:
+                conversation.is_archived = True
+            else:
+                # Create conversation record if it doesn't exist
+                session.add(Conversation(user_id=user_id, is_archived=True))
+            await session.commit()
+            logger.info(f"Archived conversation for {user_id}")
+            return True
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Error archiving conversation: {e}")
+            return False
+        finally:
+            await session.close()
+
+    @retry_db_operation()
+    async def unarchive_conversation(self, user_id: str) -> bool:
+        """Unarchive a conversation"""
+        session = self.get_session()
+        if not session:
+            return False
+
+        try:
+            conversation = await session.scalar(select(Conversation).where(Conversation.user_id == user_id).limit(1))
+            if conversation:
+                conversation.is_archived = False
+                await session.commit()
+                logger.info(f"Unarchived conversation for {user_id}")
+            # If conversation doesn't exist, it's effectively not archived
+            return True
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Error unarchiving conversation: {e}")
+            return False
+        finally:
+            await session.close()
+
+    async def close(self):
+        """Close database connections and cleanup pool"""
+        if self.engine:
+            await self.engine.dispose()
+            logger.info("Async PostgreSQL connection pool closed")
+
+
+# Global instance
+async_postgres_store = AsyncPostgresStore()
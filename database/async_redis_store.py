@@ -0,0 +1,546 @@
+"""Async Redis store for session and cache management (redis.asyncio)"""
+
+import json
+import logging
+from datetime import datetime
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any
+import redis
+import redis.asyncio as aioredis
+from config.settings import REDIS_URL, CONVERSATION_WINDOW
+from database.redis_session import UserSession, current_session
+from utils.cache_keys import response_cache_key
+from utils.retry import retry_db_operation
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRedisStore:
+    """
+    Non-blocking counterpart of RedisStore for use from async code
+
+    Same method names, arguments, key layout and return values as RedisStore,
+    but every method is a coroutine, so Redis round trips no longer block the
+    event loop while other conversations are being processed.
+    """
+
+    def __init__(self, url: str = REDIS_URL):
+        """Create the async connection pool (connections are opened lazily)"""
+        try:
+            # Ping once synchronously so an unreachable Redis is detected up front, like RedisStore
+            probe = redis.Redis.from_url(url, socket_connect_timeout=5)
+            probe.ping()
+            probe.close()
+
+            pool = aioredis.ConnectionPool.from_url(
+                url,
+                decode_responses=True,
+                max_connections=100,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                socket_keepalive=True,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+            self.client = aioredis.Redis(connection_pool=pool)
+            logger.info("✓ Async Redis connection pool configured (max_connections=100)")
+        except Exception as e:
+            logger.error(f"❌ Failed to configure async Redis: {e}")
+            self.client = None
+
+    @asynccontextmanager
+    async def session(self, user_id: str):
+        """
+        Serve a user's keys from one pipelined load for the duration of a block
+
+        Reads of the user's state inside the block come from memory and writes
+        are flushed together in one pipeline when the block exits. If Redis is
+        unavailable or the load fails, methods simply hit Redis directly.
+
+        Args:
+            user_id: User identifier (WhatsApp number)
+        """
+        if not self.client:
+            yield None
+            return
+
+        user_session = UserSession(self.client, user_id)
+        try:
+            await user_session.load()
+        except Exception as e:
+            logger.error(f"Error loading Redis session for {user_id}: {e}")
+            yield None
+            return
+
+        token = current_session.set(user_session)
+        try:
+            yield user_session
+        finally:
+            current_session.reset(token)
+            try:
+                await user_session.flush()
+            except Exception as e:
+                logger.error(f"Error flushing Redis session for {user_id}: {e}")
+
+    def _session_for(self, key: str) -> Optional[UserSession]:
+        """Get the active session if it holds this key"""
+        user_session = current_session.get()
+        if user_session and user_session.owns(key):
+            return user_session
+        return None
+
+    async def _get(self, key: str) -> Optional[str]:
+        """GET a key (from the active session when possible)"""
+        user_session = self._session_for(key)
+        if user_session:
+            return user_session.get(key)
+        return await self.client.get(key)
+
+    async def _setex(self, key: str, ttl: int, value: str):
+        """SETEX a key (deferred to session flush when possible)"""
+        user_session = self._session_for(key)
+        if user_session:
+            user_session.set(key, value, ttl)
+            return
+        await self.client.setex(key, ttl, value)
+
+    async def _delete(self, key: str):
+        """DEL a key (deferred to session flush when possible)"""
+        user_session = self._session_for(key)
+        if user_session:
+            user_session.delete(key)
+            return
+        await self.client.delete(key)
+
+    async def _rpush_trimmed(self, key: str, value: str, ttl: int):
+        """RPUSH to a list capped at CONVERSATION_WINDOW items (deferred to session flush when possible)"""
+        user_session = current_session.get()
+        if user_session and user_session.owns_list(key):
+            user_session.push(key, value, ttl)
+            return
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(key, value)
+        pipe.ltrim(key, -CONVERSATION_WINDOW, -1)
+        pipe.expire(key, ttl)
+        await pipe.execute()
+
+    async def _get_json(self, key: str) -> Optional[Any]:
+        """GET a key and decode its JSON value"""
+        data = await self._get(key)
+        if data:
+            return json.loads(data)
+        return None
+
+    async def _migrate_legacy_conversation(self, user_id: str) -> List[str]:
+        """
+        Move a conversation stored in the old format to the conversation_turns list
+
+        Conversations used to be a single JSON string under conversation:<user_id>.
+        The turns are pushed to conversation_turns:<user_id> (keeping the remaining
+        TTL) and the old key is deleted, directly rather than through the session.
+        Once the old keys have expired this is a no-op and can be removed.
+
+        Returns:
+            The migrated turns as JSON strings (empty if there was no old key)
+        """
+        legacy_key = f"conversation:{user_id}"
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(legacy_key)
+        pipe.ttl(legacy_key)
+        data, ttl = await pipe.execute()
+        if not data:
+            return []
+
+        items = [json.dumps(turn) for turn in json.loads(data)][-CONVERSATION_WINDOW:]
+        key = f"conversation_turns:{user_id}"
+        pipe = self.client.pipeline(transaction=False)
+        if items:
+            pipe.rpush(key, *items)
+            pipe.ltrim(key, -CONVERSATION_WINDOW, -1)
+            pipe.expire(key, ttl if ttl and ttl > 0 else 86400)
+        pipe.delete(legacy_key)
+        await pipe.execute()
+        logger.info(f"🔁 Migrated {len(items)} conversation turns for {user_id} from the old format")
+        return items
+
+    @retry_db_operation()
+    async def set_conversation(self, user_id: str, conversation: List[Dict[str, str]], ttl: int = 86400):
+        """Replace the conversation history for a user"""
+        if not self.client:
+            logger.warning("Redis not available, skipping conversation storage")
+            return
+
+        try:
+            key = f"conversation_turns:{user_id}"
+            await self._delete(key)
+            await self.client.delete(f"conversation:{user_id}")
+            for turn in conversation[-CONVERSATION_WINDOW:]:
+                await self._rpush_trimmed(key, json.dumps(turn), ttl)
+            logger.debug(f"Stored conversation for {user_id}")
+        except Exception as e:
+            logger.error(f"Error storing conversation: {e}")
+            raise
+
+    @retry_db_operation()
+    async def get_conversation(self, user_id: str, last_n: Optional[int] = None) -> Optional[List[Dict[str, str]]]:
+        """Retrieve conversation history for a user (only the last N turns if last_n is given)"""
+        if not self.client:
+            logger.warning("Redis not available, returning empty conversation")
+            return None
+
+        try:
+            key = f"conversation_turns:{user_id}"
+            user_session = current_session.get()
+            in_session = user_session is not None and user_session.owns_list(key)
+            if in_session:
+                items = user_session.get_list(key, last_n)
+            else:
+                items = await self.client.lrange(key, -last_n if last_n else 0, -1)
+            if not items:
+                migrated = await self._migrate_legacy_conversation(user_id)
+                if in_session and migrated:
+                    user_session.seed_list(key, migrated)
+                items = migrated[-last_n:] if last_n else migrated
+            if items:
+                return [json.loads(item) for item in items]
+            return None
+        except Exception as e:
+            logger.error(f"Error retrieving conversation: {e}")
+            return None
+
+    @retry_db_operation()
+    async def append_to_conversation(self, user_id: str, role: str, content: str, ttl: int = 86400):
+        """Append a message to conversation history (RPUSH + LTRIM + EXPIRE)"""
+        if not self.client:
+            return
+
+        try:
+            await self._rpush_trimmed(f"conversation_turns:{user_id}", json.dumps({"role": role, "content": content}), ttl)
+        except Exception as e:
+            logger.error(f"Error appending to conversation: {e}")
+
+    @retry_db_operation()
+    async def cache_response(self, query: str, response: str, ttl: int = 3600, language_code: Optional[str] = None, region: Optional[str] = None):
+        """Cache a response for a query"""
+        if not self.client:
+            return
+
+        try:
+            await self.client.setex(response_cache_key(query, language_code, region), ttl, response)
+            logger.debug(f"Cached response for query: {query[:50]}")
+        except Exception as e:
+            logger.error(f"Error caching response: {e}")
+
+    @retry_db_operation()
+    async def get_cached_response(self, query: str, language_code: Optional[str] = None, region: Optional[str] = None) -> Optional[str]:
+        """Get cached response for a query"""
+        if not self.client:
+            return None
+
+        try:
+            return await self.client.get(response_cache_key(query, language_code, region))
+        except Exception as e:
+            logger.error(f"Error getting cached response: {e}")
+            return None
+
+    @retry_db_operation()
+    async def increment_counter(self, key: str, amount: int = 1) -> int:
+        """Increment a counter"""
+        if not self.client:
+            return 0
+
+        try:
+            return await self.client.incr(key, amount)
+        except Exception as e:
+            logger.error(f"Error incrementing counter: {e}")
+            return 0
+
+    @retry_db_operation()
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get Redis stats"""
+        if not self.client:
+            return {"status": "unavailable"}
+
+        try:
+            info = await self.client.info()
+            return {
+                "status": "connected",
+                "used_memory": info.get("used_memory_human"),
+                "connected_clients": info.get("connected_clients"),
+                "total_commands": info.get("total_commands_processed")
+            }
+        except Exception as e:
+            logger.error(f"Error getting stats: {e}")
+            return {"status": "error", "error": str(e)}
+
+    @retry_db_operation()
+    async def set_bulk_order_state(self, user_id: str, state: str, data: dict, ttl: int = 3600):
+        """
+        Store bulk ordering state for a user
+
+        Returns:
+            Transition info dict (from_state, to_state, duration_seconds) or None
+        """
+        if not self.client:
+            logger.warning("Redis not available, skipping bulk order state storage")
+            return None
+
+        try:
+            key = f"bulk_order:{user_id}"
+
+            # Get previous state to track transitions
+            previous_state_data = await self.get_bulk_order_state(user_id)
+            previous_state = previous_state_data.get("state") if previous_state_data else None
+            previous_state_entry_time = previous_state_data.get("state_entry_time") if previous_state_data else None
+
+            # Calculate duration if we have previous state entry time
+            duration_seconds = None
+            if previous_state_entry_time and previous_state:
+                try:
+                    entry_time = datetime.fromisoformat(previous_state_entry_time)
+                    duration_seconds = (datetime.utcnow() - entry_time).total_seconds()
+                except:
+                    pass
+
+            state_data = {
+                "state": state,
+                "state_entry_time": datetime.utcnow().isoformat(),
+                **data
+            }
+            await self._setex(key, ttl, json.dumps(state_data))
+            logger.debug(f"Stored bulk order state for {user_id}: {state}")
+
+            return {
+                "from_state": previous_state,
+                "to_state": state,
+                "duration_seconds": duration_seconds
+            }
+        except Exception as e:
+            logger.error(f"Error storing bulk order state: {e}")
+            return None
+
+    @retry_db_operation()
+    async def get_bulk_order_state(self, user_id: str) -> Optional[dict]:
+        """Retrieve bulk ordering state for a user"""
+        if not self.client:
+            logger.warning("Redis not available, returning None for bulk order state")
+            return None
+
+        try:
+            return await self._get_json(f"bulk_order:{user_id}")
+        except Exception as e:
+            logger.error(f"Error retrieving bulk order state: {e}")
+            return None
+
+    @retry_db_operation()
+    async def clear_bulk_order_state(self, user_id: str):
+        """Clear bulk ordering state for a user"""
+        if not self.client:
+            return
+
+        try:
+            await self._delete(f"bulk_order:{user_id}")
+            logger.debug(f"Cleared bulk order state for {user_id}")
+        except Exception as e:
+            logger.error(f"Error clearing bulk order state: {e}")
+
+    @retry_db_operation()
+    async def clear_conversation(self, user_id: str):
+        """Clear conversation history for a user"""
+        if not self.client:
+            return
+
+        try:
+            await self._delete(f"conversation_turns:{user_id}")
+            await self.client.delete(f"conversation:{user_id}")
+            logger.debug(f"Cleared conversation history for {user_id}")
+        except Exception as e:
+            logger.error(f"Error clearing conversation history: {e}")
+
+    @retry_db_operation()
+    async def set_image_creation_state(self, user_id: str, state: str, data: dict = None, ttl: int = 3600):
+        """Store image creation state for a user"""
+        if not self.client:
+            logger.warning("Redis not available, skipping image creation state storage")
+            return
+
+        try:
+            state_data = {
+                "state": state,
+                **(data or {})
+            }
+            await self._setex(f"image_creation:{user_id}", ttl, json.dumps(state_data))
+            logger.debug(f"Stored image creation state for {user_id}: {state}")
+        except Exception as e:
+            logger.error(f"Error storing image creation state: {e}")
+            raise
+
+    @retry_db_operation()
+    async def get_image_creation_state(self, user_id: str) -> Optional[dict]:
+        """Retrieve image creation state for a user"""
+        if not self.client:
+            logger.warning("Redis not available, returning None for image creation state")
+            return None
+
+        try:
+            return await self._get_json(f"image_creation:{user_id}")
+        except Exception as e:
+            logger.error(f"Error retrieving image creation state: {e}")
+            return None
+
+    @retry_db_operation()
+    async def clear_image_creation_state(self, user_id: str):
+        """Clear image creation state for a user"""
+        if not self.client:
+            return
+
+        try:
+            await self._delete(f"image_creation:{user_id}")
+            logger.debug(f"Cleared image creation state for {user_id}")
+        except Exception as e:
+            logger.error(f"Error clearing image creation state: {e}")
+
+    @retry_db_operation()
+    async def set_last_message_sent(self, user_id: str, message_content: str, step_info: dict = None, ttl: int = 900):
+        """Store last message sent to user with timestamp and step info"""
+        if not self.client:
+            logger.warning("Redis not available, skipping last message tracking")
+            return
+
+        try:
+            data = {
+                "content": message_content,
+                "timestamp": datetime.utcnow().isoformat(),
+                "step_info": step_info or {}
+            }
+            await self._setex(f"last_message:{user_id}", ttl, json.dumps(data))
+            logger.debug(f"Stored last message for {user_id} at step: {step_info}")
+        except Exception as e:
+            logger.error(f"Error storing last message: {e}")
+
+    @retry_db_operation()
+    async def get_last_message_sent(self, user_id: str) -> Optional[dict]:
+        """Retrieve last message sent to user"""
+        if not self.client:
+            return None
+
+        # Sends record their last message through the batched writer; an unflushed one is the newest
+        from database.message_writer import message_writer
+        pending = message_writer.pending_last_message(user_id)
+        if pending is not None:
+            return pending
+
+        try:
+            return await self._get_json(f"last_message:{user_id}")
+        except Exception as e:
+            logger.error(f"Error retrieving last message: {e}")
+            return None
+
+    @retry_db_operation()
+    async def clear_last_message_sent(self, user_id: str):
+        """Clear last message tracking for a user"""
+        if not self.client:
+            return
+
+        from database.message_writer import message_writer
+        message_writer.discard_last_message(user_id)
+
+        try:
+            await self._delete(f"last_message:{user_id}")
+            logger.debug(f"Cleared last message tracking for {user_id}")
+        except Exception as e:
+            logger.error(f"Error clearing last message tracking: {e}")
+
+    @retry_db_operation()
+    async def set_agent_handoff(self, user_id: str, agent_id: str, ttl: int = 86400):
+        """Set agent handoff for a user conversation"""
+        if not self.client:
+            logger.warning("Redis not available, skipping agent handoff storage")
+            return
+
+        try:
+            handoff_data = {
+                "agent_id": agent_id,
+                "claimed_at": datetime.utcnow().isoformat()
+            }
+            await self._setex(f"agent_handoff:{user_id}", ttl, json.dumps(handoff_data))
+            logger.info(f"Agent handoff set for {user_id} by agent {agent_id}")
+        except Exception as e:
+            logger.error(f"Error setting agent handoff: {e}")
+            raise
+
+    @retry_db_operation()
+    async def is_agent_handoff(self, user_id: str) -> bool:
+        """Check if conversation is claimed by an agent"""
+        if not self.client:
+            return False
+
+        try:
+            return await self._get(f"agent_handoff:{user_id}") is not None
+        except Exception as e:
+            logger.error(f"Error checking agent handoff: {e}")
+            return False
+
+    @retry_db_operation()
+    async def get_agent_handoff(self, user_id: str) -> Optional[dict]:
+        """Get agent handoff information for a user"""
+        if not self.client:
+            return None
+
+        try:
+            return await self._get_json(f"agent_handoff:{user_id}")
+        except Exception as e:
+            logger.error(f"Error getting agent handoff: {e}")
+            return None
+
+    @retry_db_operation()
+    async def clear_agent_handoff(self, user_id: str):
+        """Clear agent handoff for a user, releasing conversation back to bot"""
+        if not self.client:
+            return
+
+        try:
+            await self._delete(f"agent_handoff:{user_id}")
+            logger.info(f"Agent handoff cleared for {user_id}")
+        except Exception as e:
+            logger.error(f"Error clearing agent handoff: {e}")
+
+    @retry_db_operation()
+    async def set_user_language(self, user_id: str, language_code: str, region: Optional[str] = None, ttl: int = 86400):
+        """Store user's language preference"""
+        if not self.client:
+            logger.warning("Redis not available, skipping language storage")
+            return
+
+        try:
+            language_data = {
+                "language_code": language_code,
+                "region": region
+            }
+            await self._setex(f"language:{user_id}", ttl, json.dumps(language_data))
+            logger.debug(f"Stored language preference for {user_id}: {language_code} (region: {region})")
+        except Exception as e:
+            logger.error(f"Error storing language preference: {e}")
+
+    @retry_db_operation()
+    async def get_user_language(self, user_id: str) -> Optional[dict]:
+        """Get user's language preference"""
+        if not self.client:
+            logger.warning("Redis not available, returning None for language preference")
+            return None
+
+        try:
+            return await self._get_json(f"language:{user_id}")
+        except Exception as e:
+            logger.error(f"Error retrieving language preference: {e}")
+            return None
+
+    async def close(self):
+        """Close Redis connection pool"""
+        if self.client:
+            await self.client.aclose()
+            logger.info("Async Redis connection closed")
+
+
+# Global instance
+async_redis_store = AsyncRedisStore()
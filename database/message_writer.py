@@ -0,0 +1,198 @@
+"""Batched writer for message rows and last-message tracking, flushed off the send path"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from config.settings import MESSAGE_WRITE_INTERVAL, MESSAGE_WRITE_MAX_BATCH
+from database.postgres_store import postgres_store
+from database.async_redis_store import async_redis_store
+from database.redis_session import current_session
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriter:
+    """
+    Buffers message records and last-message updates and writes them on a timer
+
+    Senders only append to memory, so neither the Postgres commit nor the Redis
+    write is part of the user-facing latency. Each flush writes all buffered
+    messages with one multi-row INSERT per max_batch rows and all last-message
+    updates in one Redis pipeline. A flush runs every interval, or sooner when
+    max_batch messages are buffered. Messages are keyed by message_id and the
+    last write wins, so an agent reply recorded after the bot's record of the
+    same send keeps the agent attribution. Last-message reads check the buffer
+    first (see AsyncRedisStore.get_last_message_sent).
+
+    A last-message update made while that user's UserSession is open goes into
+    the session instead of the buffer. Handlers clear the tracking when a
+    message arrives, and the session defers that DEL to its flush at the end of
+    processing. A buffered SETEX flushed before then would be deleted by it, so
+    the update has to be ordered after the clear in the same session.
+    """
+
+    # Upper bound on buffered messages kept while the database is unavailable
+    MAX_BUFFERED = 50000
+
+    def __init__(self, flush_interval: float = MESSAGE_WRITE_INTERVAL, max_batch: int = MESSAGE_WRITE_MAX_BATCH):
+        self.postgres_store = postgres_store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._messages: Dict[str, Dict[str, Any]] = {}
+        self._last_messages: Dict[str, Tuple[Dict[str, Any], int]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.received = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+
+    def add_message(
+        self,
+        message_id: str,
+        from_number: str,
+        to_number: Optional[str],
+        content: str,
+        direction: str,
+        message_type: str = "text",
+        status: str = "sent"
+    ):
+        """Buffer a message record (same fields as PostgresStore.save_message)"""
+        if message_id not in self._messages and len(self._messages) >= self.MAX_BUFFERED:
+            self.dropped += 1
+            return
+
+        now = datetime.utcnow()
+        self._messages[message_id] = {
+            "message_id": message_id,
+            "from_number": from_number,
+            "to_number": to_number,
+            "content": content,
+            "direction": direction,
+            "message_type": message_type,
+            "status": status,
+            "created_at": now,
+            "updated_at": now
+        }
+        self.received += 1
+        if len(self._messages) >= self.max_batch:
+            self._wakeup.set()
+
+    def set_last_message(self, user_id: str, message_content: str, step_info: dict = None, ttl: int = 900):
+        """Buffer the last message sent to a user (same format as AsyncRedisStore.set_last_message_sent)"""
+        data = {
+            "content": message_content,
+            "timestamp": datetime.utcnow().isoformat(),
+            "step_info": step_info or {}
+        }
+        key = f"last_message:{user_id}"
+        user_session = current_session.get()
+        if user_session and user_session.owns(key):
+            # Replaces a clear recorded earlier in this session; written when the session flushes
+            user_session.set(key, json.dumps(data), ttl)
+            self._last_messages.pop(user_id, None)
+            return
+        self._last_messages[user_id] = (data, ttl)
+
+    def pending_last_message(self, user_id: str) -> Optional[dict]:
+        """Last message for a user that hasn't been written to Redis yet"""
+        pending = self._last_messages.get(user_id)
+        return pending[0] if pending else None
+
+    def discard_last_message(self, user_id: str):
+        """Drop a buffered last-message update (the tracking was cleared)"""
+        self._last_messages.pop(user_id, None)
+
+    def start(self):
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ Message writer started (interval={self.flush_interval}s, max_batch={self.max_batch})")
+
+    async def stop(self):
+        """Stop the flush task and write whatever is still buffered"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        """Flush every interval, or sooner when the buffer reaches max_batch"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write buffered messages and last-message updates
+
+        Returns:
+            Number of message rows written
+        """
+        written = 0
+        start = time.perf_counter()
+
+        if self._last_messages:
+            last_messages = self._last_messages
+            self._last_messages = {}
+            try:
+                if async_redis_store.client:
+                    pipe = async_redis_store.client.pipeline(transaction=False)
+                    for user_id, (data, ttl) in last_messages.items():
+                        pipe.setex(f"last_message:{user_id}", ttl, json.dumps(data))
+                    await pipe.execute()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Error writing last-message tracking, will retry next interval: {e}")
+                for user_id, pending in last_messages.items():
+                    self._last_messages.setdefault(user_id, pending)
+
+        if self._messages:
+            batch = self._messages
+            self._messages = {}
+            rows = list(batch.values())
+            try:
+                for i in range(0, len(rows), self.max_batch):
+                    written += await asyncio.to_thread(self.postgres_store.save_messages, rows[i:i + self.max_batch])
+                self.written += written
+                self.flushes += 1
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Error writing messages, will retry next interval: {e}")
+                # Put the batch back without overwriting records added meanwhile
+                for message_id, row in batch.items():
+                    self._messages.setdefault(message_id, row)
+
+        if written:
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+            logger.debug(f"💾 Wrote {written} messages in {self.last_flush_ms:.1f}ms")
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching metrics"""
+        return {
+            "buffered_messages": len(self._messages),
+            "buffered_last_messages": len(self._last_messages),
+            "received": self.received,
+            "rows_written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
+
+
+# Global instance
+message_writer = MessageWriter()
@@ -6,6 +6,7 @@ from typing import Optional, List, Dict, Any
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, JSON, Boolean, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 from config.settings import DATABASE_URL
 from utils.retry import retry_db_operation
@@ -65,8 +66,8 @@ class PostgresStore:
             # Production-grade connection pool configuration
             pool_config = {
                 # Pool settings
-                'pool_size': 20,  # Number of connections to maintain
-                'max_overflow': 40,  # Maximum overflow connections
+                'pool_size': 5,  # Number of connections to maintain (batch writers, status updates, startup)
+                'max_overflow': 5,  # Maximum overflow connections
                 'pool_timeout': 30,  # Seconds to wait for connection
                 'pool_recycle': 3600,  # Recycle connections after 1 hour
                 'pool_pre_ping': True,  # Verify connections before using
@@ -129,7 +130,7 @@ class PostgresStore:
             except Exception as e:
                 logger.warning(f"⚠️ Could not verify/add is_archived column: {e}")
 
-            logger.info("✓ PostgreSQL connection pool established (size=20, max_overflow=40)")
+            logger.info("✓ PostgreSQL connection pool established (size=5, max_overflow=5)")
         except Exception as e:
             logger.error(f"❌ Failed to connect to PostgreSQL: {e}")
             self.engine = None
@@ -178,6 +179,94 @@ class PostgresStore:
         finally:
             session.close()
 
+    @retry_db_operation()
+    def save_messages(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Save many messages with one multi-row INSERT
+
+        A row whose message_id already exists updates sender and content (e.g. an
+        agent reply first recorded as a bot message) but never its status.
+
+        Args:
+            rows: Message dicts with the Message column names (message_id, from_number, ...)
+
+        Returns:
+            Number of rows written
+        """
+        if not rows:
+            return 0
+
+        session = self.get_session()
+        if not session:
+            logger.warning("Database not available")
+            return 0
+
+        try:
+            statement = pg_insert(Message.__table__).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["message_id"],
+                set_={"from_number": statement.excluded.from_number, "content": statement.excluded.content}
+            )
+            result = session.execute(statement)
+            session.commit()
+            logger.debug(f"Saved {len(rows)} messages")
+            return result.rowcount
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Error saving messages: {e}")
+            raise
+        finally:
+            session.close()
+
+    # Delivery status precedence, a late "delivered" must never overwrite "read"
+    STATUS_RANKS = {"sent": 1, "delivered": 2, "read": 3, "failed": 4}
+
+    @retry_db_operation()
+    def update_message_statuses(self, updates: Dict[str, str]) -> int:
+        """
+        Update the status of many messages in one statement
+
+        Args:
+            updates: Mapping of WhatsApp message_id to status (sent/delivered/read/failed)
+
+        Returns:
+            Number of rows updated
+        """
+        if not updates:
+            return 0
+
+        session = self.get_session()
+        if not session:
+            logger.warning("Database not available")
+            return 0
+
+        try:
+            rows = []
+            params = {}
+            for i, (message_id, status) in enumerate(updates.items()):
+                rows.append(f"(:id{i}, :status{i}, :rank{i})")
+                params[f"id{i}"] = message_id
+                params[f"status{i}"] = status
+                params[f"rank{i}"] = self.STATUS_RANKS.get(status, 0)
+
+            rank_case = " ".join(f"WHEN '{name}' THEN {rank}" for name, rank in self.STATUS_RANKS.items())
+            result = session.execute(text(f"""
+                UPDATE messages AS m
+                SET status = v.status, updated_at = NOW()
+                FROM (VALUES {", ".join(rows)}) AS v(message_id, status, rank)
+                WHERE m.message_id = v.message_id
+                  AND (CASE m.status {rank_case} ELSE 0 END) < v.rank
+            """), params)
+            session.commit()
+            logger.debug(f"Updated status for {result.rowcount} of {len(updates)} messages")
+            return result.rowcount
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Error updating message statuses: {e}")
+            raise
+        finally:
+            session.close()
+
     @retry_db_operation()
     def get_conversation_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get conversation history for a user"""
@@ -247,6 +336,39 @@ class PostgresStore:
         finally:
             session.close()
 
+    @retry_db_operation()
+    def save_analytics_events(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Save many analytics events with one multi-row INSERT
+
+        Args:
+            rows: Event dicts with event_type, user_id, email, data and created_at
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            SQLAlchemyError if the insert fails (the caller keeps the events)
+        """
+        if not rows:
+            return 0
+
+        session = self.get_session()
+        if not session:
+            raise SQLAlchemyError("Database not available")
+
+        try:
+            result = session.execute(Analytics.__table__.insert().values(rows))
+            session.commit()
+            logger.debug(f"Saved {len(rows)} analytics events")
+            return result.rowcount
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"❌ Error saving analytics events: {e}")
+            raise
+        finally:
+            session.close()
+
     @retry_db_operation()
     def get_user_stats(self, user_id: str) -> Dict[str, Any]:
         """Get statistics for a user"""
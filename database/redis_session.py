@@ -0,0 +1,136 @@
+"""Request-scoped Redis session for per-user state"""
+
+import logging
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from config.settings import CONVERSATION_WINDOW
+
+logger = logging.getLogger(__name__)
+
+# Session of the message currently being processed (if any)
+current_session: ContextVar[Optional["UserSession"]] = ContextVar("current_redis_session", default=None)
+
+# Per-user keys loaded up front, as "<prefix>:<user_id>"
+SESSION_KEY_PREFIXES = (
+    "bulk_order",
+    "language",
+    "agent_handoff",
+    "last_message",
+    "image_creation"
+)
+
+# Per-user list keys loaded up front (conversation window)
+SESSION_LIST_PREFIXES = (
+    "conversation_turns",
+)
+
+
+class UserSession:
+    """
+    In-memory view of one user's Redis keys for the duration of a message
+
+    All per-user keys are fetched in one pipeline (MGET plus LRANGE for list
+    keys) when the session opens.
+    Reads are then served from memory, writes and deletes are recorded, and
+    everything that changed is written back in one pipeline when the session
+    closes. AsyncRedisStore routes reads/writes for these keys through the
+    active session automatically, so callers don't need to know about it.
+    """
+
+    def __init__(self, client, user_id: str):
+        self.client = client
+        self.user_id = user_id
+        self.active = False
+        self._values: Dict[str, Optional[str]] = {}
+        self._dirty: Dict[str, Tuple[Optional[str], Optional[int]]] = {}  # key -> (value or None for delete, ttl)
+        self._lists: Dict[str, List[str]] = {}
+        self._list_ops: Dict[str, Dict] = {}  # key -> {"reset": bool, "pushed": [...], "ttl": int}
+        self.reads_served = 0
+
+    def owns(self, key: str) -> bool:
+        """True if the key was loaded into this session"""
+        return self.active and (key in self._values or key in self._lists)
+
+    def owns_list(self, key: str) -> bool:
+        """True if the list key was loaded into this session"""
+        return self.active and key in self._lists
+
+    async def load(self):
+        """Fetch all session keys in one round trip"""
+        keys = [f"{prefix}:{self.user_id}" for prefix in SESSION_KEY_PREFIXES]
+        list_keys = [f"{prefix}:{self.user_id}" for prefix in SESSION_LIST_PREFIXES]
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.mget(keys)
+        for key in list_keys:
+            pipe.lrange(key, -CONVERSATION_WINDOW, -1)
+        results = await pipe.execute()
+
+        self._values = dict(zip(keys, results[0]))
+        self._lists = {key: list(items) for key, items in zip(list_keys, results[1:])}
+        self.active = True
+
+    def get(self, key: str) -> Optional[str]:
+        """Read a key from memory"""
+        self.reads_served += 1
+        return self._values.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        """Record a write (applied on flush)"""
+        self._values[key] = value
+        self._dirty[key] = (value, ttl)
+
+    def delete(self, key: str):
+        """Record a delete (applied on flush)"""
+        if key in self._lists:
+            self._lists[key] = []
+            self._list_ops[key] = {"reset": True, "pushed": [], "ttl": None}
+            return
+        self._values[key] = None
+        self._dirty[key] = (None, None)
+
+    def get_list(self, key: str, last_n: Optional[int] = None) -> List[str]:
+        """Read the tail of a list key from memory"""
+        self.reads_served += 1
+        items = self._lists.get(key, [])
+        return items[-last_n:] if last_n else list(items)
+
+    def seed_list(self, key: str, items: List[str]):
+        """Set the in-memory contents of a list that was written to Redis outside the session"""
+        self._lists[key] = list(items[-CONVERSATION_WINDOW:])
+
+    def push(self, key: str, value: str, ttl: int):
+        """Record an RPUSH (applied on flush, trimmed to the conversation window)"""
+        items = self._lists.setdefault(key, [])
+        items.append(value)
+        del items[:-CONVERSATION_WINDOW]
+        op = self._list_ops.setdefault(key, {"reset": False, "pushed": [], "ttl": None})
+        op["pushed"].append(value)
+        op["ttl"] = ttl
+
+    async def flush(self):
+        """Write all changed keys in one pipeline and close the session"""
+        # Close first: anything still running after this writes straight to Redis
+        self.active = False
+        if not self._dirty and not self._list_ops:
+            return
+
+        pipe = self.client.pipeline(transaction=False)
+        for key, (value, ttl) in self._dirty.items():
+            if value is None:
+                pipe.delete(key)
+            elif ttl:
+                pipe.setex(key, ttl, value)
+            else:
+                pipe.set(key, value)
+        for key, op in self._list_ops.items():
+            if op["reset"]:
+                pipe.delete(key)
+            if op["pushed"]:
+                pipe.rpush(key, *op["pushed"])
+                pipe.ltrim(key, -CONVERSATION_WINDOW, -1)
+                pipe.expire(key, op["ttl"])
+        await pipe.execute()
+        logger.debug(f"Flushed {len(self._dirty) + len(self._list_ops)} session keys for {self.user_id} ({self.reads_served} reads served from memory)")
+        self._dirty = {}
+        self._list_ops = {}
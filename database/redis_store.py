@@ -4,7 +4,8 @@ import redis
 import json
 import logging
 from typing import Optional, List, Dict, Any
-from config.settings import REDIS_URL
+from config.settings import REDIS_URL, CONVERSATION_WINDOW
+from utils.cache_keys import response_cache_key
 from utils.retry import retry_db_operation
 
 logger = logging.getLogger(__name__)
@@ -36,10 +37,42 @@ class RedisStore:
             logger.error(f"❌ Failed to connect to Redis: {e}")
             self.client = None
 
+    def _migrate_legacy_conversation(self, user_id: str) -> List[str]:
+        """
+        Move a conversation stored in the old format to the conversation_turns list
+
+        Conversations used to be a single JSON string under conversation:<user_id>.
+        The turns are pushed to conversation_turns:<user_id> (keeping the remaining
+        TTL) and the old key is deleted. Once the old keys have expired this is a
+        no-op and can be removed.
+
+        Returns:
+            The migrated turns as JSON strings (empty if there was no old key)
+        """
+        legacy_key = f"conversation:{user_id}"
+        pipe = self.client.pipeline()
+        pipe.get(legacy_key)
+        pipe.ttl(legacy_key)
+        data, ttl = pipe.execute()
+        if not data:
+            return []
+
+        items = [json.dumps(turn) for turn in json.loads(data)][-CONVERSATION_WINDOW:]
+        key = f"conversation_turns:{user_id}"
+        pipe = self.client.pipeline()
+        if items:
+            pipe.rpush(key, *items)
+            pipe.ltrim(key, -CONVERSATION_WINDOW, -1)
+            pipe.expire(key, ttl if ttl and ttl > 0 else 86400)
+        pipe.delete(legacy_key)
+        pipe.execute()
+        logger.info(f"🔁 Migrated {len(items)} conversation turns for {user_id} from the old format")
+        return items
+
     @retry_db_operation()
     def set_conversation(self, user_id: str, conversation: List[Dict[str, str]], ttl: int = 86400):
         """
-        Store conversation history for a user
+        Replace the conversation history for a user
 
         Args:
             user_id: User identifier
@@ -51,37 +84,43 @@ class RedisStore:
             return
 
         try:
-            key = f"conversation:{user_id}"
-            self.client.setex(
-                key,
-                ttl,
-                json.dumps(conversation)
-            )
+            key = f"conversation_turns:{user_id}"
+            pipe = self.client.pipeline()
+            pipe.delete(key, f"conversation:{user_id}")
+            if conversation:
+                pipe.rpush(key, *[json.dumps(turn) for turn in conversation])
+                pipe.ltrim(key, -CONVERSATION_WINDOW, -1)
+                pipe.expire(key, ttl)
+            pipe.execute()
             logger.debug(f"Stored conversation for {user_id}")
         except Exception as e:
             logger.error(f"Error storing conversation: {e}")
             raise
 
     @retry_db_operation()
-    def get_conversation(self, user_id: str) -> Optional[List[Dict[str, str]]]:
+    def get_conversation(self, user_id: str, last_n: Optional[int] = None) -> Optional[List[Dict[str, str]]]:
         """
         Retrieve conversation history for a user
 
         Args:
             user_id: User identifier
+            last_n: Only fetch the most recent N turns (default: the whole window)
 
         Returns:
-            List of conversation messages or None
+            List of conversation messages (oldest first) or None
         """
         if not self.client:
             logger.warning("Redis not available, returning empty conversation")
             return None
 
         try:
-            key = f"conversation:{user_id}"
-            data = self.client.get(key)
-            if data:
-                return json.loads(data)
+            key = f"conversation_turns:{user_id}"
+            start = -last_n if last_n else 0
+            items = self.client.lrange(key, start, -1)
+            if not items:
+                items = self._migrate_legacy_conversation(user_id)[start:]
+            if items:
+                return [json.loads(item) for item in items]
             return None
         except Exception as e:
             logger.error(f"Error retrieving conversation: {e}")
@@ -92,6 +131,10 @@ class RedisStore:
         """
         Append a message to conversation history
 
+        Pushes the turn, trims the list to the last CONVERSATION_WINDOW turns and
+        refreshes the TTL in one pipeline, so the cost doesn't grow with history
+        length and concurrent writers can't overwrite each other's turns.
+
         Args:
             user_id: User identifier
             role: Message role (user/assistant)
@@ -102,18 +145,17 @@ class RedisStore:
             return
 
         try:
-            conversation = self.get_conversation(user_id) or []
-            conversation.append({"role": role, "content": content})
-
-            # Keep only last 10 messages to avoid growing too large
-            conversation = conversation[-10:]
-
-            self.set_conversation(user_id, conversation, ttl)
+            key = f"conversation_turns:{user_id}"
+            pipe = self.client.pipeline()
+            pipe.rpush(key, json.dumps({"role": role, "content": content}))
+            pipe.ltrim(key, -CONVERSATION_WINDOW, -1)
+            pipe.expire(key, ttl)
+            pipe.execute()
         except Exception as e:
             logger.error(f"Error appending to conversation: {e}")
 
     @retry_db_operation()
-    def cache_response(self, query: str, response: str, ttl: int = 3600):
+    def cache_response(self, query: str, response: str, ttl: int = 3600, language_code: Optional[str] = None, region: Optional[str] = None):
         """
         Cache a response for a query
 
@@ -121,24 +163,28 @@ class RedisStore:
             query: User query
             response: Bot response
             ttl: Time to live in seconds (default 1 hour)
+            language_code: Language of the response
+            region: User region
         """
         if not self.client:
             return
 
         try:
-            key = f"cache:{hash(query)}"
+            key = response_cache_key(query, language_code, region)
             self.client.setex(key, ttl, response)
             logger.debug(f"Cached response for query: {query[:50]}")
         except Exception as e:
             logger.error(f"Error caching response: {e}")
 
     @retry_db_operation()
-    def get_cached_response(self, query: str) -> Optional[str]:
+    def get_cached_response(self, query: str, language_code: Optional[str] = None, region: Optional[str] = None) -> Optional[str]:
         """
         Get cached response for a query
 
         Args:
             query: User query
+            language_code: Language of the response
+            region: User region
 
         Returns:
             Cached response or None
@@ -147,7 +193,7 @@ class RedisStore:
             return None
 
         try:
-            key = f"cache:{hash(query)}"
+            key = response_cache_key(query, language_code, region)
             return self.client.get(key)
         except Exception as e:
             logger.error(f"Error getting cached response: {e}")
@@ -295,8 +341,8 @@ class RedisStore:
             return
 
         try:
-            key = f"conversation:{user_id}"
-            self.client.delete(key)
+            key = f"conversation_turns:{user_id}"
+            self.client.delete(key, f"conversation:{user_id}")
             logger.debug(f"Cleared conversation history for {user_id}")
         except Exception as e:
             logger.error(f"Error clearing conversation history: {e}")
@@ -52,18 +52,18 @@ Replace this file with your own knowledge base documents!
 """)
         logger.info(f"✓ Created sample document: {sample_file}")
 
-    # Ingest all documents
+    # Ingest new/changed chunks and remove stale ones (safe to re-run)
     try:
-        total_chunks = vector_store.add_documents(docs_dir)
+        report = vector_store.sync_documents(docs_dir)
         logger.info(f"✅ Successfully ingested documents!")
-        logger.info(f"📊 Total chunks in database: {total_chunks}")
+        logger.info(f"📊 {report['files']} files: {report['added']} chunks added, {report['removed']} removed, {report['unchanged']} unchanged")
     except Exception as e:
         logger.error(f"❌ Error ingesting documents: {e}")
 
     logger.info("\n" + "="*60)
     logger.info("Next steps:")
     logger.info("1. Add your own .txt files to data/documents/")
-    logger.info("2. Run this script again to update the knowledge base")
+    logger.info("2. Run this script again to update the knowledge base (only changed chunks are re-embedded)")
     logger.info("3. Run 'python main.py' to start the bot")
     logger.info("="*60)
 
@@ -0,0 +1,278 @@
+"""Content-addressed embedding cache for VectorStore"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from config.settings import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_LRU_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingDiskStore:
+    """
+    Append-only on-disk store of float32 vectors for one embedding model
+
+    Vectors live in vectors.f32 (read through a memory map) and keys.log maps
+    each text digest to its row. Appends take an exclusive flock, so several
+    uvicorn workers on the same host can share one store; each process picks
+    up rows written by the others by reading new lines of keys.log on a miss.
+    A row is written before its key line, so a write torn by a crash leaves at
+    most a partial row with no key, which the next append truncates away.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.keys_path = os.path.join(directory, "keys.log")
+        self.lock_path = os.path.join(directory, ".lock")
+        self.meta_path = os.path.join(directory, "meta.json")
+
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._keys_offset = 0
+        self._mmap: Optional[np.memmap] = None
+
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r") as f:
+                self.dim = json.load(f)["dim"]
+        self.refresh()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def refresh(self):
+        """Read key entries appended since the last refresh"""
+        if not os.path.exists(self.keys_path):
+            return
+        with open(self.keys_path, "r") as f:
+            f.seek(self._keys_offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # partially written line, pick it up next time
+                digest, row = line.split()
+                self._rows[digest] = int(row)
+                self._keys_offset += len(line.encode("utf-8"))
+
+    def get(self, digest: str) -> Optional[np.ndarray]:
+        """Read a vector (None if not stored)"""
+        row = self._rows.get(digest)
+        if row is None or self.dim is None:
+            return None
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r").reshape(-1, self.dim)
+        return np.array(self._mmap[row])
+
+    def put(self, items: Dict[str, np.ndarray]):
+        """Append vectors that are not stored yet"""
+        if not items:
+            return
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                if self.dim is None:
+                    self.dim = len(next(iter(items.values())))
+                    with open(self.meta_path, "w") as f:
+                        json.dump({"dim": self.dim}, f)
+
+                row_bytes = self.dim * 4
+                with open(self.vectors_path, "ab") as vectors, open(self.keys_path, "a") as keys:
+                    # Drop a partial row left by an interrupted write so new rows stay aligned
+                    size = vectors.tell()
+                    if size % row_bytes:
+                        vectors.truncate(size - size % row_bytes)
+                        vectors.seek(0, os.SEEK_END)
+                    row = vectors.tell() // row_bytes
+                    for digest, vector in items.items():
+                        if digest in self._rows:
+                            continue
+                        vectors.write(np.asarray(vector, dtype=np.float32).tobytes())
+                        vectors.flush()
+                        keys.write(f"{digest} {row}\n")
+                        self._rows[digest] = row
+                        row += 1
+                    keys.flush()
+                    self._keys_offset = keys.tell()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only calls the underlying model for unseen text
+
+    Vectors are keyed by a BLAKE2 digest of the exact text and stored per
+    model name, so repeated queries and re-ingestion of unchanged documents
+    never hit the network. Lookups go through an in-process LRU first and
+    then the memory-mapped disk store. Only document vectors are written to
+    disk, so the store grows with the corpus rather than with user traffic;
+    query vectors live in the LRU alone. The async methods check the LRU inline
+    and run disk reads and appends in worker threads, so the event loop never
+    waits on file I/O or the store's flock.
+    """
+
+    def __init__(self, underlying: Embeddings, model_name: str, path: str = EMBEDDING_CACHE_PATH,
+                 lru_size: int = EMBEDDING_CACHE_LRU_SIZE):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()  # LRU and metrics, never held during I/O
+        self._disk_lock = threading.Lock()
+        self.disk: Optional[EmbeddingDiskStore] = None
+        try:
+            self.disk = EmbeddingDiskStore(os.path.join(path, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)))
+            logger.info(f"✓ Embedding cache for {model_name}: {len(self.disk)} vectors on disk")
+        except Exception as e:
+            logger.error(f"❌ Embedding disk cache unavailable, using in-memory LRU only: {e}")
+
+        # Metrics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _digest(self, text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _remember(self, digest: str, vector: np.ndarray):
+        self._lru[digest] = vector
+        self._lru.move_to_end(digest)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _lookup_memory(self, texts: List[str]):
+        """Split texts into LRU hits (by digest) and indexes of distinct texts not in memory"""
+        digests = [self._digest(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        missing: List[int] = []
+        pending = set()
+        with self._lock:
+            for i, digest in enumerate(digests):
+                if digest in found or digest in pending:
+                    continue  # same text earlier in the batch
+                vector = self._lru.get(digest)
+                if vector is not None:
+                    self._lru.move_to_end(digest)
+                    self.memory_hits += 1
+                    found[digest] = vector
+                    continue
+                missing.append(i)
+                pending.add(digest)
+        return digests, found, missing
+
+    def _lookup_disk(self, digests: List[str], missing: List[int], found: Dict[str, np.ndarray]) -> List[int]:
+        """Fill found from the disk store (blocking I/O); returns the indexes that still need embedding"""
+        hits: Dict[str, np.ndarray] = {}
+        still_missing: List[int] = []
+        with self._disk_lock:
+            refreshed = False
+            for i in missing:
+                vector = None
+                if self.disk is not None:
+                    try:
+                        vector = self.disk.get(digests[i])
+                        if vector is None and not refreshed:
+                            self.disk.refresh()  # rows written by other workers
+                            refreshed = True
+                            vector = self.disk.get(digests[i])
+                    except Exception as e:
+                        logger.error(f"Error reading embedding cache: {e}")
+                        vector = None
+                if vector is None:
+                    still_missing.append(i)
+                else:
+                    hits[digests[i]] = vector
+        with self._lock:
+            for digest, vector in hits.items():
+                self._remember(digest, vector)
+            self.disk_hits += len(hits)
+            self.misses += len(still_missing)
+        found.update(hits)
+        return still_missing
+
+    def _lookup(self, texts: List[str]):
+        """Split texts into cached vectors (by digest) and indexes of distinct texts that need embedding"""
+        digests, found, missing = self._lookup_memory(texts)
+        if missing:
+            missing = self._lookup_disk(digests, missing, found)
+        return digests, found, missing
+
+    async def _alookup(self, texts: List[str]):
+        """_lookup with the disk reads run in a worker thread"""
+        digests, found, missing = self._lookup_memory(texts)
+        if missing:
+            missing = await asyncio.to_thread(self._lookup_disk, digests, missing, found)
+        return digests, found, missing
+
+    def _store(self, digests: List[str], missing: List[int], vectors: List[List[float]], found: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Cache newly computed vectors in memory; returns them by digest for _persist"""
+        new = {}
+        for i, vector in zip(missing, vectors):
+            array = np.asarray(vector, dtype=np.float32)
+            found[digests[i]] = array
+            new[digests[i]] = array
+        with self._lock:
+            for digest, array in new.items():
+                self._remember(digest, array)
+        return new
+
+    def _persist(self, new: Dict[str, np.ndarray]):
+        """Append newly computed vectors to the disk store (blocking I/O)"""
+        if self.disk is None or not new:
+            return
+        with self._disk_lock:
+            try:
+                self.disk.put(new)
+            except Exception as e:
+                logger.error(f"Error writing embedding cache: {e}")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        digests, found, missing = self._lookup(texts)
+        if missing:
+            vectors = self.underlying.embed_documents([texts[i] for i in missing])
+            self._persist(self._store(digests, missing, vectors, found))
+        return [found[digest].tolist() for digest in digests]
+
+    def embed_query(self, text: str) -> List[float]:
+        digests, found, missing = self._lookup_memory([text])
+        if missing:
+            with self._lock:
+                self.misses += 1
+            self._store(digests, missing, [self.underlying.embed_query(text)], found)
+        return found[digests[0]].tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        digests, found, missing = await self._alookup(texts)
+        if missing:
+            vectors = await self.underlying.aembed_documents([texts[i] for i in missing])
+            await asyncio.to_thread(self._persist, self._store(digests, missing, vectors, found))
+        return [found[digest].tolist() for digest in digests]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        digests, found, missing = self._lookup_memory([text])
+        if missing:
+            with self._lock:
+                self.misses += 1
+            self._store(digests, missing, [await self.underlying.aembed_query(text)], found)
+        return found[digests[0]].tolist()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counts"""
+        return {
+            "model": self.model_name,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "lru_entries": len(self._lru),
+            "disk_entries": len(self.disk) if self.disk is not None else 0
+        }
@@ -0,0 +1,151 @@
+"""Hybrid keyword (BM25) + vector retrieval with reciprocal-rank fusion"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from config.settings import HYBRID_CANDIDATES, RRF_K
+
+logger = logging.getLogger(__name__)
+
+# 30 x 40, 30"x40", 30''x40'' -> 30x40
+_SIZE = re.compile(r"(\d+)\s*(?:\"|''|”|″)?\s*[x×]\s*(\d+)")
+_TOKEN = re.compile(r"[a-z0-9]+(?:_[a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for keyword matching
+
+    SKUs such as BlanketSherpafleece_25x20 are kept whole and also split on
+    underscores, and sizes are normalized to NxM so "30 x 40" matches "30x40".
+    """
+    text = _SIZE.sub(r"\1x\2", text.lower())
+    tokens = []
+    for token in _TOKEN.findall(text):
+        tokens.append(token)
+        if "_" in token:
+            tokens.extend(part for part in token.split("_") if part)
+    return tokens
+
+
+class BM25Index:
+    """In-memory inverted index scored with Okapi BM25"""
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.doc_lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                self.postings[token].append((doc_id, tf))
+
+        n = len(texts)
+        self.avg_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self.idf = {
+            token: math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for token, posting in self.postings.items()
+        }
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top-k (doc_id, score) for a query"""
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[token]:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_length or 1)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class HybridRetriever:
+    """
+    Retrieves chunks by fusing BM25 and vector search rankings
+
+    The BM25 index covers the same chunks as Chroma and is rebuilt whenever
+    the vector store's corpus_version changes. Each side returns its top
+    `candidates` chunks and they are combined with reciprocal-rank fusion
+    (score = sum of 1 / (rrf_k + rank)), which needs no score calibration
+    between the two systems and rewards chunks both agree on.
+    """
+
+    def __init__(self, vector_store, candidates: int = HYBRID_CANDIDATES, rrf_k: int = RRF_K):
+        self.vector_store = vector_store
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self._lock = threading.Lock()
+        self._index: Optional[BM25Index] = None
+        self._documents: List = []
+        self._version: Optional[str] = None
+
+    def _ensure_index(self):
+        """Build the BM25 index from Chroma if missing or outdated"""
+        if self._index is not None and self._version == self.vector_store.corpus_version:
+            return
+        with self._lock:
+            version = self.vector_store.corpus_version
+            if self._index is not None and self._version == version:
+                return
+            from langchain.schema import Document
+            stored = self.vector_store.vector_store.get(include=["documents", "metadatas"])
+            self._documents = [
+                Document(page_content=text, metadata=metadata or {})
+                for text, metadata in zip(stored["documents"], stored["metadatas"])
+            ]
+            self._index = BM25Index([doc.page_content for doc in self._documents])
+            self._version = version
+            logger.info(f"✓ Built BM25 index over {len(self._documents)} chunks (corpus {version})")
+
+    def warm_up(self) -> int:
+        """Build the BM25 index ahead of the first query (returns the number of chunks indexed)"""
+        self._ensure_index()
+        return len(self._documents)
+
+    def keyword_search(self, query: str, k: int) -> List:
+        """Top-k chunks by BM25 alone"""
+        self._ensure_index()
+        return [self._documents[doc_id] for doc_id, _ in self._index.search(query, k)]
+
+    def retrieve(self, query: str, k: int = 3, embedding=None) -> List:
+        """
+        Retrieve the k best chunks for a query
+
+        Args:
+            query: User message
+            k: Number of chunks to return
+            embedding: Precomputed query embedding (avoids embedding the query again)
+
+        Returns:
+            List of Documents, best first
+        """
+        if embedding is not None:
+            dense = self.vector_store.retrieve_by_vector(embedding, k=self.candidates)
+        else:
+            dense = self.vector_store.retrieve(query, k=self.candidates)
+
+        try:
+            sparse = self.keyword_search(query, self.candidates)
+        except Exception as e:
+            logger.error(f"❌ BM25 search failed, using vector results only: {e}")
+            return dense[:k]
+
+        return self.fuse([dense, sparse], k)
+
+    def fuse(self, rankings: List[List], k: int) -> List:
+        """Reciprocal-rank fusion of several rankings of Documents (matched by content)"""
+        scores: Dict[str, float] = defaultdict(float)
+        documents = {}
+        for ranking in rankings:
+            for rank, doc in enumerate(ranking, start=1):
+                scores[doc.page_content] += 1.0 / (self.rrf_k + rank)
+                documents.setdefault(doc.page_content, doc)
+        best = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [documents[content] for content in best]
@@ -0,0 +1,154 @@
+"""Batched, concurrent ingestion of large document sets into the vector store"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Set
+from config.settings import CHROMA_DB_PATH, EMBED_BATCH_SIZE, EMBED_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class IngestPipeline:
+    """
+    Streaming read -> split -> embed -> write pipeline
+
+    Files are loaded and split one at a time and their chunks grouped into
+    batches of batch_size. Up to `concurrency` batches are embedded at once
+    (instead of one serial stream of embedding requests). Each embedded batch
+    is upserted into Chroma under the chunks' content-hash IDs and recorded in
+    a checkpoint file, so an interrupted run can be restarted and skips
+    everything already written. The checkpoint is removed once a run completes.
+    """
+
+    def __init__(self, vector_store, batch_size: int = EMBED_BATCH_SIZE, concurrency: int = EMBED_CONCURRENCY,
+                 checkpoint_path: str = None):
+        """
+        Args:
+            vector_store: VectorStore to write to
+            batch_size: Chunks per embedding request
+            concurrency: Embedding requests in flight at once
+            checkpoint_path: File recording written chunk IDs (default: inside CHROMA_DB_PATH)
+        """
+        self.vector_store = vector_store
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.checkpoint_path = checkpoint_path or os.path.join(CHROMA_DB_PATH, "ingest_checkpoint.txt")
+
+    def _load_checkpoint(self) -> Set[str]:
+        """IDs of chunks written by a previous, interrupted run"""
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, "r") as f:
+            done = {line.strip() for line in f if line.strip()}
+        logger.info(f"↩️ Resuming ingestion: {len(done)} chunks already written")
+        return done
+
+    def iter_chunks(self, paths: Iterable[str]) -> Iterator:
+        """Load and split each file in turn, yielding chunks with their content-hash IDs"""
+        for path in paths:
+            documents = self.vector_store._load_documents(path)
+            if not documents:
+                logger.warning(f"⚠️ No documents loaded from {path}")
+                continue
+            for chunk in self.vector_store._split_documents(documents):
+                chunk.metadata["content_hash"] = self.vector_store._chunk_id(chunk)
+                yield chunk
+
+    def _batches(self, chunks: Iterator, skip: Set[str]) -> Iterator[List]:
+        """Group chunks into batches, skipping checkpointed and duplicate chunks"""
+        batch = []
+        seen = set()
+        for chunk in chunks:
+            chunk_id = chunk.metadata["content_hash"]
+            if chunk_id in skip or chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def run(self, paths: Iterable[str]) -> Dict[str, float]:
+        """
+        Ingest files or directories
+
+        Args:
+            paths: Files/directories to ingest (.txt, .json, .csv, .xlsx)
+
+        Returns:
+            dict: chunks written, chunks skipped from the checkpoint, batches, seconds and chunks/sec
+        """
+        done = self._load_checkpoint()
+        os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint_path)), exist_ok=True)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        write_lock = asyncio.Lock()
+        pending: Set[asyncio.Task] = set()
+        stats = {"written": 0, "batches": 0}
+        errors: List[BaseException] = []
+        start = time.perf_counter()
+
+        async def process(batch: List, checkpoint):
+            try:
+                texts = [chunk.page_content for chunk in batch]
+                embeddings = await self.vector_store.embeddings.aembed_documents(texts)
+                ids = [chunk.metadata["content_hash"] for chunk in batch]
+
+                # Chroma writes are serialized; embedding requests overlap
+                async with write_lock:
+                    await asyncio.to_thread(
+                        self.vector_store.upsert_embedded, ids, texts, embeddings, [chunk.metadata for chunk in batch]
+                    )
+                    checkpoint.write("".join(f"{chunk_id}\n" for chunk_id in ids))
+                    checkpoint.flush()
+
+                stats["written"] += len(batch)
+                stats["batches"] += 1
+                elapsed = time.perf_counter() - start
+                logger.info(f"📈 {stats['written']} chunks written ({stats['written'] / elapsed:.1f} chunks/sec)")
+            except Exception as e:
+                errors.append(e)
+            finally:
+                semaphore.release()
+
+        with open(self.checkpoint_path, "a") as checkpoint:
+            try:
+                for batch in self._batches(self.iter_chunks(paths), done):
+                    # Reading/splitting waits here, so at most `concurrency` batches are held in memory
+                    await semaphore.acquire()
+                    task = asyncio.create_task(process(batch, checkpoint))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+
+                    # Stop reading as soon as a batch fails
+                    if errors:
+                        break
+
+                await asyncio.gather(*pending)
+                if errors:
+                    raise errors[0]
+            except BaseException:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.error(f"❌ Ingestion interrupted after {stats['written']} chunks; re-run to resume from the checkpoint")
+                raise
+
+        if stats["written"]:
+            self.vector_store._bump_corpus_version()
+        os.remove(self.checkpoint_path)
+
+        elapsed = time.perf_counter() - start
+        report = {
+            "written": stats["written"],
+            "skipped": len(done),
+            "batches": stats["batches"],
+            "seconds": round(elapsed, 2),
+            "chunks_per_sec": round(stats["written"] / elapsed, 1) if elapsed > 0 else 0.0
+        }
+        logger.info(f"✅ Ingested {report['written']} chunks in {report['seconds']}s ({report['chunks_per_sec']} chunks/sec)")
+        return report
@@ -0,0 +1,85 @@
+"""In-process cache of retrieval results"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_TTL
+from utils.cache_keys import normalize_query
+
+
+class RetrievalCache:
+    """
+    LRU + TTL cache of the top-k chunks retrieved for a query
+
+    Keys combine the normalized query, k and the vector store's corpus
+    version, so ingestion (which bumps the version) invalidates every entry
+    at once without any explicit purge. Entries hold the chunk IDs, text and
+    metadata rather than live objects, and are rebuilt into Documents on hit.
+    """
+
+    def __init__(self, capacity: int = RETRIEVAL_CACHE_SIZE, ttl: int = RETRIEVAL_CACHE_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[float, List[Tuple[Optional[str], str, Dict[str, Any]]]]]" = OrderedDict()
+        self._lock = threading.Lock()  # retrieval runs in worker threads
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query: str, k: int, corpus_version: str) -> Optional[List]:
+        """
+        Cached chunks for a query
+
+        Args:
+            query: User message
+            k: Number of chunks requested
+            corpus_version: Current VectorStore.corpus_version
+
+        Returns:
+            List of Documents, or None on miss/expiry
+        """
+        key = (corpus_version, k, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            chunks = entry[1]
+
+        from langchain.schema import Document
+        return [Document(page_content=text, metadata=dict(metadata)) for _, text, metadata in chunks]
+
+    def put(self, query: str, k: int, corpus_version: str, documents: List):
+        """Store retrieved chunks for a query"""
+        if not normalize_query(query):
+            return
+        key = (corpus_version, k, normalize_query(query))
+        chunks = [(doc.metadata.get("content_hash"), doc.page_content, dict(doc.metadata)) for doc in documents]
+        with self._lock:
+            self._entries[key] = (time.monotonic(), chunks)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counts"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+# Global instance
+retrieval_cache = RetrievalCache()
@@ -4,36 +4,117 @@ from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import TextLoader, DirectoryLoader
+from rag.embedding_cache import CachedEmbeddings
 from config.settings import CHROMA_DB_PATH, RETRIEVAL_TOP_K, OPENAI_API_KEY
 import os
 import json
 import csv
+import time
+import hashlib
+import threading
 import pandas as pd
 
 
 class VectorStore:
-    def __init__(self):
-        self.embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
-        self.vector_store = None
-        self._initialize_store()
+    def __init__(self, lazy: bool = False):
+        """
+        Args:
+            lazy: Defer opening ChromaDB until the store is first used (or warm_up() is called)
+        """
+        openai_embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
+        self.embeddings = CachedEmbeddings(openai_embeddings, openai_embeddings.model)
+        self._store = None
+        self._store_lock = threading.Lock()
+        if not lazy:
+            self._initialize_store()
+        self._corpus_version_path = os.path.join(CHROMA_DB_PATH, "corpus_version")
+        self._corpus_version = "0"
+        self._corpus_version_mtime = None
+        self._load_corpus_version()
+
+    @property
+    def vector_store(self):
+        """ChromaDB store, opened on first access when created lazily"""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._initialize_store()
+        return self._store
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once ChromaDB has been opened"""
+        return self._store is not None
 
     def _initialize_store(self):
         """Initialize or load existing ChromaDB vector store"""
-        if os.path.exists(CHROMA_DB_PATH):
-            self.vector_store = Chroma(
-                persist_directory=CHROMA_DB_PATH,
-                embedding_function=self.embeddings
-            )
-            print(f"✓ Loaded existing vector store from {CHROMA_DB_PATH}")
-        else:
-            self.vector_store = Chroma(
-                persist_directory=CHROMA_DB_PATH,
-                embedding_function=self.embeddings
-            )
-            print(f"✓ Created new vector store at {CHROMA_DB_PATH}")
+        start = time.perf_counter()
+        existed = os.path.exists(CHROMA_DB_PATH)
+        self._store = Chroma(
+            persist_directory=CHROMA_DB_PATH,
+            embedding_function=self.embeddings
+        )
+        action = "Loaded existing" if existed else "Created new"
+        print(f"✓ {action} vector store at {CHROMA_DB_PATH} ({time.perf_counter() - start:.2f}s)")
 
-    def add_documents(self, file_path):
-        """Add documents from a file or directory to the vector store"""
+    def warm_up(self) -> int:
+        """
+        Open the store and run one query so the vector index is in memory before the first user message
+
+        The query reuses a stored embedding, so warming up costs no OpenAI call.
+
+        Returns:
+            Number of chunks in the store
+        """
+        store = self.vector_store
+        sample = store.get(limit=1, include=["embeddings"])
+        embeddings = sample.get("embeddings")
+        if embeddings is not None and len(embeddings):
+            store.similarity_search_by_vector(list(embeddings[0]), k=1)
+        return store._collection.count()
+
+    @property
+    def corpus_version(self) -> str:
+        """
+        Stamp identifying the current contents of the store
+
+        The stamp file is re-read whenever its mtime changes (one stat per
+        access), so ingestion by another process or uvicorn worker invalidates
+        the caches keyed on it here too.
+        """
+        self._load_corpus_version()
+        return self._corpus_version
+
+    def _load_corpus_version(self):
+        """Re-read the corpus version stamp if the file changed since the last read"""
+        try:
+            mtime = os.stat(self._corpus_version_path).st_mtime_ns
+            if mtime == self._corpus_version_mtime:
+                return
+            with open(self._corpus_version_path, "r") as f:
+                version = f.read().strip()
+        except OSError:
+            return
+        if version:
+            self._corpus_version = version
+            self._corpus_version_mtime = mtime
+
+    def _bump_corpus_version(self):
+        """Stamp a new corpus version after documents change (invalidates answers cached against the old one)"""
+        self._corpus_version = str(int(time.time() * 1000))
+        try:
+            os.makedirs(CHROMA_DB_PATH, exist_ok=True)
+            # Write then rename, so readers in other processes never see a partial stamp
+            tmp_path = f"{self._corpus_version_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(self._corpus_version)
+            os.replace(tmp_path, self._corpus_version_path)
+            self._corpus_version_mtime = os.stat(self._corpus_version_path).st_mtime_ns
+        except OSError as e:
+            print(f"⚠️  Could not persist corpus version: {e}")
+
+    def _load_documents(self, file_path):
+        """Load documents from a file or directory (.txt, .json and .csv)"""
         if os.path.isdir(file_path):
             # Handle both .txt and .json files
             documents = []
@@ -87,6 +168,12 @@ class VectorStore:
                         documents.append(doc)
                 except Exception as e:
                     print(f"⚠️  Error loading {csv_file}: {e}")
+
+            # Load .xlsx files (price sheets)
+            for root, dirs, files in os.walk(file_path):
+                for file in files:
+                    if file.endswith('.xlsx') and not file.startswith('~$'):
+                        documents.extend(self._load_xlsx(os.path.join(root, file)))
         else:
             if file_path.endswith('.json'):
                 # Handle single JSON file
@@ -123,27 +210,106 @@ class VectorStore:
                 except Exception as e:
                     print(f"⚠️  Error loading {file_path}: {e}")
                     documents = []
+            elif file_path.endswith('.xlsx'):
+                documents = self._load_xlsx(file_path)
             else:
                 loader = TextLoader(file_path)
                 documents = loader.load()
 
-        if not documents:
-            print("⚠️  No documents to process")
-            return 0
+        return documents
 
-        # Split documents into chunks
+    def _split_documents(self, documents):
+        """Split documents into chunks"""
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
             chunk_overlap=200
         )
-        splits = text_splitter.split_documents(documents)
+        return text_splitter.split_documents(documents)
+
+    @staticmethod
+    def _chunk_id(chunk):
+        """Stable ID for a chunk: digest of its source and content"""
+        source = os.path.abspath(chunk.metadata.get("source", ""))
+        return hashlib.blake2b(f"{source}\0{chunk.page_content}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def add_documents(self, file_path):
+        """Add documents from a file or directory to the vector store"""
+        documents = self._load_documents(file_path)
+        if not documents:
+            print("⚠️  No documents to process")
+            return 0
+
+        splits = self._split_documents(documents)
 
         # Add to vector store
         self.vector_store.add_documents(splits)
+        self._bump_corpus_version()
         print(f"✓ Added {len(splits)} document chunks to vector store")
 
         return len(splits)
 
+    def upsert_embedded(self, ids, texts, embeddings, metadatas):
+        """Write chunks whose embeddings were computed by the caller (idempotent per ID)"""
+        self.vector_store._collection.upsert(
+            ids=ids,
+            documents=texts,
+            embeddings=embeddings,
+            metadatas=metadatas
+        )
+
+    def sync_documents(self, file_path):
+        """
+        Incrementally bring the vector store in line with a file or directory
+
+        Chunks get stable IDs derived from their content, so re-running only
+        embeds chunks that are new or changed, deletes chunks whose text (or
+        whole file) is gone, and leaves everything else untouched. Only chunks
+        whose source lies under file_path are considered, so other content in
+        the store is never removed.
+
+        Args:
+            file_path: File or directory to sync (e.g. ./data/documents)
+
+        Returns:
+            dict: Counts of added, removed and unchanged chunks and files synced
+        """
+        documents = self._load_documents(file_path)
+        splits = self._split_documents(documents) if documents else []
+
+        desired = {}
+        for chunk in splits:
+            chunk_id = self._chunk_id(chunk)
+            chunk.metadata["content_hash"] = chunk_id
+            desired.setdefault(chunk_id, chunk)  # identical chunks are stored once
+
+        # Existing chunks that came from the synced path (including ones added without stable IDs)
+        root = os.path.abspath(file_path)
+        existing = self.vector_store.get(include=["metadatas"])
+        in_scope = set()
+        for chunk_id, metadata in zip(existing["ids"], existing["metadatas"]):
+            source = os.path.abspath((metadata or {}).get("source", ""))
+            if source == root or source.startswith(root + os.sep):
+                in_scope.add(chunk_id)
+
+        to_add = [chunk_id for chunk_id in desired if chunk_id not in in_scope]
+        to_remove = [chunk_id for chunk_id in in_scope if chunk_id not in desired]
+
+        if to_remove:
+            self.vector_store.delete(ids=to_remove)
+        if to_add:
+            self.vector_store.add_documents([desired[chunk_id] for chunk_id in to_add], ids=to_add)
+        if to_add or to_remove:
+            self._bump_corpus_version()
+
+        report = {
+            "files": len({chunk.metadata.get("source") for chunk in desired.values()}),
+            "added": len(to_add),
+            "removed": len(to_remove),
+            "unchanged": len(desired) - len(to_add)
+        }
+        print(f"✓ Synced {file_path}: {report['added']} added, {report['removed']} removed, {report['unchanged']} unchanged chunks")
+        return report
+
     def _json_to_text(self, data):
         """Convert JSON product data to searchable text format"""
         text_parts = []
@@ -268,6 +434,37 @@ class VectorStore:
             print(f"Error processing CSV {csv_file}: {e}")
             return ""
 
+    def _load_xlsx(self, xlsx_file):
+        """Load an Excel price sheet as a document (empty list if it can't be read)"""
+        text_content = self._xlsx_to_text(xlsx_file)
+        if not text_content:
+            return []
+        from langchain.schema import Document
+        return [Document(
+            page_content=text_content,
+            metadata={"source": xlsx_file, "type": "price_sheet"}
+        )]
+
+    def _xlsx_to_text(self, xlsx_file):
+        """Convert an Excel price sheet to searchable text (one line per non-empty row, all sheets)"""
+        try:
+            sheets = pd.read_excel(xlsx_file, sheet_name=None, header=None, dtype=str)
+            text_parts = []
+
+            for sheet_name, df in sheets.items():
+                text_parts.append(f"SHEET: {sheet_name}")
+                for _, row in df.iterrows():
+                    cells = [value.strip() for value in row if isinstance(value, str) and value.strip()]
+                    if cells:
+                        text_parts.append(" | ".join(cells))
+                text_parts.append("")
+
+            return "\n".join(text_parts)
+
+        except Exception as e:
+            print(f"Error processing Excel file {xlsx_file}: {e}")
+            return ""
+
     def retrieve(self, query: str, k: int = 3):
         """Retrieve relevant documents for a query (optimized: default k=3 for speed)"""
         if not self.vector_store:
@@ -276,6 +473,14 @@ class VectorStore:
         results = self.vector_store.similarity_search(query, k=k)
         return results
 
+    def retrieve_by_vector(self, embedding, k: int = 3):
+        """Retrieve relevant documents for an already-embedded query"""
+        if not self.vector_store:
+            return []
+
+        results = self.vector_store.similarity_search_by_vector(embedding, k=k)
+        return results
+
     def retrieve_with_scores(self, query: str, k: int = RETRIEVAL_TOP_K):
         """Retrieve relevant documents with similarity scores"""
         if not self.vector_store:
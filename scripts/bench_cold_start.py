@@ -0,0 +1,68 @@
+"""
+Benchmark cold-start time of the webhook server
+Starts uvicorn in a subprocess and measures seconds until the first 200 from /
+and until /ready reports warm-up complete, with LAZY_STARTUP on and off
+
+Usage: python scripts/bench_cold_start.py [rounds] [port]
+"""
+
+import sys
+import os
+import time
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMEOUT = 600
+
+
+def wait_for(url: str, start: float, proc: subprocess.Popen) -> float:
+    """Poll a URL until it returns 200; seconds since start"""
+    while time.perf_counter() - start < TIMEOUT:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{url} not ready after {TIMEOUT}s")
+
+
+def cold_start(lazy: bool, port: int) -> tuple:
+    """Start the server once; returns (seconds to first 200, seconds to ready)"""
+    env = dict(os.environ, LAZY_STARTUP="true" if lazy else "false")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.webhook:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        first_200 = wait_for(f"http://127.0.0.1:{port}/", start, proc)
+        ready = wait_for(f"http://127.0.0.1:{port}/ready", start, proc)
+        return first_200, ready
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+
+    print(f"Cold start over {rounds} rounds\n")
+    for lazy in (False, True):
+        results = [cold_start(lazy, port) for _ in range(rounds)]
+        first = [r[0] for r in results]
+        ready = [r[1] for r in results]
+        label = "LAZY_STARTUP=true " if lazy else "LAZY_STARTUP=false"
+        print(f"{label}  first 200: median {statistics.median(first):.2f}s (max {max(first):.2f}s)   "
+              f"ready: median {statistics.median(ready):.2f}s (max {max(ready):.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
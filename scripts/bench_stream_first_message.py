@@ -0,0 +1,87 @@
+"""
+Benchmark time-to-first-message for streamed LLM responses
+Compares when the user gets the first message with ainvoke (full completion)
+versus astream + sentence splitting (first complete sentence)
+
+Requires OPENAI_API_KEY. Usage: python scripts/bench_stream_first_message.py [rounds]
+"""
+
+import sys
+import os
+import time
+import asyncio
+import statistics
+
+# Add parent directory to path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_openai import ChatOpenAI
+from config.settings import OPENAI_API_KEY, STREAM_FIRST_CHUNK_MIN_CHARS
+from utils.sentence_splitter import last_sentence_boundary
+
+QUESTIONS = [
+    "What sizes do your fleece blankets come in?",
+    "How long does delivery to Germany take?",
+    "Can I add text to a photo book cover?",
+    "What is your returns policy for personalised items?",
+]
+
+PROMPT = """You are a professional PrinterPix support assistant on WhatsApp.
+Keep responses SHORT (1-3 sentences max) and end with a helpful question.
+
+Customer: {message}
+
+Your response:"""
+
+
+async def time_invoke(llm, prompt: str) -> float:
+    """Seconds until the full completion is available"""
+    start = time.perf_counter()
+    await llm.ainvoke(prompt)
+    return time.perf_counter() - start
+
+
+async def time_stream(llm, prompt: str):
+    """Seconds until the first sendable chunk, and until the stream ends"""
+    start = time.perf_counter()
+    first = None
+    text = ""
+    async for chunk in llm.astream(prompt):
+        text += chunk.content
+        if first is None and last_sentence_boundary(text) >= STREAM_FIRST_CHUNK_MIN_CHARS:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return first if first is not None else total, total
+
+
+def summary(label: str, values):
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    print(f"  {label:<28} median {statistics.median(values) * 1000:7.0f}ms   p95 {p95 * 1000:7.0f}ms")
+
+
+async def main():
+    if not OPENAI_API_KEY:
+        print("❌ OPENAI_API_KEY is not set")
+        sys.exit(1)
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, openai_api_key=OPENAI_API_KEY, request_timeout=30)
+
+    invoke_times, first_chunk_times, stream_totals = [], [], []
+    for _ in range(rounds):
+        for question in QUESTIONS:
+            prompt = PROMPT.format(message=question)
+            invoke_times.append(await time_invoke(llm, prompt))
+            first, total = await time_stream(llm, prompt)
+            first_chunk_times.append(first)
+            stream_totals.append(total)
+
+    print(f"Time to first message over {len(invoke_times)} requests (first chunk >= {STREAM_FIRST_CHUNK_MIN_CHARS} chars):")
+    summary("ainvoke (full completion)", invoke_times)
+    summary("astream (first sentence)", first_chunk_times)
+    summary("astream (full completion)", stream_totals)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
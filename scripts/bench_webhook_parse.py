@@ -0,0 +1,106 @@
+"""
+Microbenchmark for webhook parsing
+Compares per-webhook CPU cost of the old receive_webhook parse/log path with utils.webhook_parser
+
+Usage: python scripts/bench_webhook_parse.py [iterations]
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import logging
+
+# Add parent directory to path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.webhook_parser import parse_webhook, loads
+
+# Log to an in-memory stream so formatting cost is measured without terminal I/O
+stream = io.StringIO()
+handler = logging.StreamHandler(stream)
+handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+logger = logging.getLogger("bench_webhook")
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+def make_payload(entries: int = 1, messages_per_entry: int = 1) -> bytes:
+    """Build a realistic WhatsApp webhook payload"""
+    entry_list = []
+    for e in range(entries):
+        messages = []
+        for m in range(messages_per_entry):
+            messages.append({
+                "from": "447700900123",
+                "id": f"wamid.HBgMNDQ3NzAwOTAwMTIzFQIAEhgg{e:04d}{m:04d}",
+                "timestamp": "1718000000",
+                "type": "text",
+                "text": {"body": "Hi, how much are 50 sherpa fleece blankets in 30x40?"}
+            })
+        entry_list.append({
+            "id": "102290129340398",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {"display_phone_number": "15550783881", "phone_number_id": "106540352242922"},
+                    "contacts": [{"profile": {"name": "Customer"}, "wa_id": "447700900123"}],
+                    "messages": messages
+                }
+            }]
+        })
+    return json.dumps({"object": "whatsapp_business_account", "entry": entry_list}).encode()
+
+
+def old_path(body_bytes: bytes):
+    """Parse/log steps of the previous receive_webhook implementation"""
+    logger.info("=" * 80)
+    logger.info("🚨 POST /webhook CALLED - Webhook endpoint hit!")
+    logger.info("=" * 80)
+    logger.info(f"📦 RAW webhook body received: {len(body_bytes)} bytes")
+    body = json.loads(body_bytes)
+    logger.info(f"📦 Webhook parsed successfully")
+    logger.info(f"📦 Body keys: {list(body.keys())}")
+    logger.info(f"📦 Full body: {body}")
+    value = body.get("entry", [])[0].get("changes", [])[0].get("value", {})
+    return value.get("messages", [])
+
+
+def new_path(body_bytes: bytes):
+    """Parse steps of the current receive_webhook implementation"""
+    body = loads(body_bytes)
+    return parse_webhook(body)
+
+
+def bench(fn, payload: bytes, iterations: int) -> float:
+    """Return CPU microseconds per call"""
+    for _ in range(100):
+        fn(payload)
+    stream.seek(0)
+    stream.truncate()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(payload)
+    elapsed = time.process_time() - start
+    stream.seek(0)
+    stream.truncate()
+    return elapsed / iterations * 1e6
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print("=" * 70)
+    print(f"{'Payload':<30} | {'old (µs)':>10} | {'new (µs)':>10} | {'speedup':>8}")
+    print("=" * 70)
+    for entries, per_entry in [(1, 1), (1, 5), (3, 3)]:
+        payload = make_payload(entries, per_entry)
+        old_us = bench(old_path, payload, iterations)
+        new_us = bench(new_path, payload, iterations)
+        label = f"{entries} entry x {per_entry} msg ({len(payload)}B)"
+        print(f"{label:<30} | {old_us:>10.1f} | {new_us:>10.1f} | {old_us / new_us:>7.1f}x")
+    print("=" * 70)
+    print("Note: the old path only processed entry[0].changes[0]; the new path walks every entry.")
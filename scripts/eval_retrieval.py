@@ -0,0 +1,75 @@
+"""
+Offline retrieval evaluation
+Measures recall@k of vector, BM25 and hybrid retrieval on questions from data/documents/faq.txt
+
+A question counts as answered at k if one of the top-k chunks contains the
+start of its FAQ answer. Requires an ingested vector store (python ingest_documents.py);
+vector and hybrid modes also need OPENAI_API_KEY to embed the questions.
+
+Usage: python scripts/eval_retrieval.py [--faq PATH] [--k 1 3 5] [--bm25-only]
+"""
+
+import sys
+import os
+import re
+import argparse
+
+# Add parent directory to path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag.vector_store import VectorStore
+from rag.hybrid_retriever import HybridRetriever
+
+# How much of the answer must appear in a chunk for it to count as relevant
+ANSWER_PREFIX_CHARS = 60
+
+
+def load_questions(faq_path: str):
+    """Parse Q:/A: pairs from the FAQ file"""
+    with open(faq_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    pairs = re.findall(r"^Q:\s*(.+?)\s*\nA:\s*(.+?)\s*$", text, flags=re.MULTILINE)
+    return [(question, answer[:ANSWER_PREFIX_CHARS]) for question, answer in pairs]
+
+
+def recall_at_k(results, answer: str, k: int) -> bool:
+    """True if any of the top-k chunks contains the answer prefix"""
+    normalize = lambda s: " ".join(s.split())
+    answer = normalize(answer)
+    return any(answer in normalize(doc.page_content) for doc in results[:k])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval recall@k on FAQ questions")
+    parser.add_argument("--faq", default="./data/documents/faq.txt", help="FAQ file with Q:/A: pairs")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5], help="Cutoffs to report")
+    parser.add_argument("--bm25-only", action="store_true", help="Skip modes that need the embeddings API")
+    args = parser.parse_args()
+
+    questions = load_questions(args.faq)
+    if not questions:
+        print(f"❌ No Q:/A: pairs found in {args.faq}")
+        sys.exit(1)
+
+    vector_store = VectorStore()
+    retriever = HybridRetriever(vector_store)
+    max_k = max(args.k)
+
+    modes = {"bm25": lambda q: retriever.keyword_search(q, max_k)}
+    if not args.bm25_only:
+        modes["vector"] = lambda q: vector_store.retrieve(q, k=max_k)
+        modes["hybrid"] = lambda q: retriever.retrieve(q, k=max_k)
+
+    print(f"Evaluating {len(questions)} FAQ questions")
+    print(f"{'mode':<8}" + "".join(f"{f'recall@{k}':>12}" for k in args.k))
+    for mode, search in modes.items():
+        hits = {k: 0 for k in args.k}
+        for question, answer in questions:
+            results = search(question)
+            for k in args.k:
+                hits[k] += recall_at_k(results, answer, k)
+        print(f"{mode:<8}" + "".join(f"{hits[k] / len(questions):>12.3f}" for k in args.k))
+
+
+if __name__ == "__main__":
+    main()
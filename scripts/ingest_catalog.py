@@ -0,0 +1,46 @@
+"""
+Bulk-ingest large catalogs (e.g. product.txt, *_UK.xlsx price sheets) into the vector store
+Embeds in batches with bounded concurrency and resumes from a checkpoint if interrupted
+
+Usage: python scripts/ingest_catalog.py [--batch-size N] [--concurrency N] PATH [PATH ...]
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import logging
+
+# Add parent directory to path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import EMBED_BATCH_SIZE, EMBED_CONCURRENCY
+from rag.vector_store import VectorStore
+from rag.ingest_pipeline import IngestPipeline
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest documents into the vector store")
+    parser.add_argument("paths", nargs="+", help="Files or directories (.txt, .json, .csv, .xlsx)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="Chunks per embedding request")
+    parser.add_argument("--concurrency", type=int, default=EMBED_CONCURRENCY, help="Embedding requests in flight")
+    args = parser.parse_args()
+
+    vector_store = VectorStore()
+    pipeline = IngestPipeline(vector_store, batch_size=args.batch_size, concurrency=args.concurrency)
+    report = asyncio.run(pipeline.run(args.paths))
+
+    logger.info("=" * 60)
+    logger.info(f"Chunks written:      {report['written']}")
+    logger.info(f"Skipped (resumed):   {report['skipped']}")
+    logger.info(f"Batches:             {report['batches']}")
+    logger.info(f"Elapsed:             {report['seconds']}s")
+    logger.info(f"Throughput:          {report['chunks_per_sec']} chunks/sec")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Load test: webhook latency while analytics queries run
+Sends status-receipt webhooks (no LLM or WhatsApp calls) at a fixed rate and
+reports p50/p99 latency, first alone and then while other clients hammer the
+analytics/agent console endpoints. With blocking DB calls in async handlers
+the webhook p99 rises to the query time; with the async store it should not.
+
+Run against a running server: python scripts/load_test_analytics.py [--url http://localhost:8000]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import httpx
+
+ANALYTICS_PATHS = [
+    "/api/analytics/funnel",
+    "/api/analytics/funnel/detailed",
+    "/api/analytics/stats",
+    "/api/analytics/stage-transitions/stats",
+    "/api/analytics/abandonments/stats",
+    "/api/agent/all-conversations?limit=200",
+]
+
+
+def status_payload(i: int) -> bytes:
+    """Webhook carrying one delivery receipt (buffered by the status batcher, no outbound calls)"""
+    return json.dumps({
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "load-test",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "statuses": [{
+                        "id": f"wamid.loadtest{i}",
+                        "status": "delivered",
+                        "timestamp": str(int(time.time())),
+                        "recipient_id": "440000000000"
+                    }]
+                }
+            }]
+        }]
+    }).encode()
+
+
+async def send_webhooks(client: httpx.AsyncClient, url: str, rate: float, duration: float) -> list:
+    """POST webhooks at a fixed rate; returns latencies in ms"""
+    latencies = []
+    tasks = []
+
+    async def one(i: int):
+        start = time.perf_counter()
+        response = await client.post(f"{url}/webhook", content=status_payload(i), headers={"Content-Type": "application/json"})
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    i = 0
+    while time.perf_counter() - started < duration:
+        tasks.append(asyncio.create_task(one(i)))
+        i += 1
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return latencies
+
+
+async def hammer_analytics(client: httpx.AsyncClient, url: str, stop: asyncio.Event, counts: dict):
+    """Request analytics endpoints back to back until stopped"""
+    i = 0
+    while not stop.is_set():
+        path = ANALYTICS_PATHS[i % len(ANALYTICS_PATHS)]
+        i += 1
+        try:
+            response = await client.get(f"{url}{path}")
+            counts["ok" if response.status_code == 200 else "error"] += 1
+        except httpx.HTTPError:
+            counts["error"] += 1
+
+
+def summarize(label: str, latencies: list):
+    if not latencies:
+        print(f"{label:<28} no successful requests")
+        return
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    print(f"{label:<28} n={len(ordered):<5} p50={statistics.median(ordered):7.1f}ms  p99={p99:7.1f}ms  max={ordered[-1]:7.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=50, help="webhooks per second")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per phase")
+    parser.add_argument("--analytics-clients", type=int, default=8, help="concurrent analytics clients")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.analytics_clients + 200)
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        baseline = await send_webhooks(client, args.url, args.rate, args.duration)
+
+        stop = asyncio.Event()
+        counts = {"ok": 0, "error": 0}
+        workers = [asyncio.create_task(hammer_analytics(client, args.url, stop, counts)) for _ in range(args.analytics_clients)]
+        loaded = await send_webhooks(client, args.url, args.rate, args.duration)
+        stop.set()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    print(f"\nWebhook latency at {args.rate:.0f}/s over {args.duration:.0f}s per phase\n")
+    summarize("baseline", baseline)
+    summarize(f"+{args.analytics_clients} analytics clients", loaded)
+    print(f"\nAnalytics requests: {counts['ok']} ok, {counts['error']} errors")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
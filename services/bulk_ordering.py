@@ -13,8 +13,8 @@ from config.bulk_products import (
 )
 from services.freshdesk_service import FreshdeskService
 from services.region_lookup import RegionLookupService
-from database.redis_store import redis_store
-from database.postgres_store import postgres_store
+from database.async_redis_store import async_redis_store
+from database.analytics_writer import analytics_writer
 from bot.whatsapp_api import WhatsAppAPI
 from utils.language_detection import get_bulk_message, get_product_names
 
@@ -26,7 +26,7 @@ class BulkOrderingService:
     
     def __init__(self, whatsapp_api: WhatsAppAPI):
         self.whatsapp_api = whatsapp_api
-        self.redis_store = redis_store
+        self.redis_store = async_redis_store
         self.freshdesk_service = FreshdeskService()
         self.region_lookup_service = RegionLookupService()
     
@@ -41,7 +41,7 @@ class BulkOrderingService:
                 "selections": {k: v for k, v in selections.items() if k not in ["email", "postcode"]},
                 "timestamp": datetime.utcnow().isoformat()
             }
-            postgres_store.save_analytics_event(
+            analytics_writer.add_event(
                 event_type="stage_transition",
                 user_id=user_id,
                 data=transition_data
@@ -60,7 +60,7 @@ class BulkOrderingService:
                 "flow": "bulk_ordering",
                 "timestamp": datetime.utcnow().isoformat()
             }
-            postgres_store.save_analytics_event(
+            analytics_writer.add_event(
                 event_type="user_action",
                 user_id=user_id,
                 data=action_data
@@ -69,14 +69,14 @@ class BulkOrderingService:
         except Exception as e:
             logger.error(f"Error tracking user action: {e}", exc_info=True)
     
-    def _set_state_with_tracking(self, user_id: str, new_state: str, data: Dict):
+    async def _set_state_with_tracking(self, user_id: str, new_state: str, data: Dict):
         """Set bulk order state and track transition"""
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         old_state = state_data.get("state") if state_data else None
         selections = data.get("selections", {})
         
         # Set state and get transition info
-        transition_info = self.redis_store.set_bulk_order_state(user_id, new_state, data)
+        transition_info = await self.redis_store.set_bulk_order_state(user_id, new_state, data)
         
         # Track transition if state actually changed
         if old_state and old_state != new_state and transition_info:
@@ -88,15 +88,15 @@ class BulkOrderingService:
     async def start_bulk_ordering(self, user_id: str) -> None:
         """Start the bulk ordering flow - ask for name first"""
         # Reset/clear any existing state first
-        self.redis_store.clear_bulk_order_state(user_id)
-        self.redis_store.clear_last_message_sent(user_id)
+        await self.redis_store.clear_bulk_order_state(user_id)
+        await self.redis_store.clear_last_message_sent(user_id)
         
         # Get user's language preference
-        user_language = self.redis_store.get_user_language(user_id)
+        user_language = await self.redis_store.get_user_language(user_id)
         language_code = user_language.get("language_code", "en") if user_language else "en"
         
         # Set new state (no transition tracking on start)
-        self.redis_store.set_bulk_order_state(
+        await self.redis_store.set_bulk_order_state(
             user_id,
             "asking_name",
             {"selections": {}}
@@ -104,7 +104,7 @@ class BulkOrderingService:
         
         # Track initial entry
         try:
-            postgres_store.save_analytics_event(
+            analytics_writer.add_event(
                 event_type="flow_started",
                 user_id=user_id,
                 data={
@@ -119,10 +119,10 @@ class BulkOrderingService:
         # Note: Welcome message already asks for name, so we don't send ask_name here
         # The welcome message in llm_handler.py includes "First off, what is your name?"
     
-    def end_bulk_ordering(self, user_id: str) -> None:
+    async def end_bulk_ordering(self, user_id: str) -> None:
         """End bulk ordering flow and clear state"""
-        self.redis_store.clear_bulk_order_state(user_id)
-        self.redis_store.clear_last_message_sent(user_id)
+        await self.redis_store.clear_bulk_order_state(user_id)
+        await self.redis_store.clear_last_message_sent(user_id)
         logger.info(f"Ended bulk ordering for user {user_id}")
     
     async def handle_interactive_response(self, user_id: str, button_id: str, list_id: Optional[str] = None) -> str:
@@ -137,7 +137,7 @@ class BulkOrderingService:
         Returns:
             Status message
         """
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         
         if not state_data:
             # Not in bulk ordering flow, restart
@@ -154,7 +154,7 @@ class BulkOrderingService:
             self._track_user_action(user_id, action_type, action_id, current_state)
         
         # Get user's language preference
-        user_language = self.redis_store.get_user_language(user_id)
+        user_language = await self.redis_store.get_user_language(user_id)
         language_code = user_language.get("language_code", "en") if user_language else "en"
         
         # Handle product selection
@@ -166,7 +166,7 @@ class BulkOrderingService:
                 selections["product"] = other_product
                 selections["is_other"] = True
                 # Go straight to quantity
-                self._set_state_with_tracking(
+                await self._set_state_with_tracking(
                     user_id,
                     "asking_quantity",
                     {"selections": selections}
@@ -203,7 +203,7 @@ class BulkOrderingService:
                 
                 # Regular product - go straight to quantity (no specs needed)
                 selections["product"] = product
-                self._set_state_with_tracking(
+                await self._set_state_with_tracking(
                     user_id,
                     "asking_quantity",
                     {"selections": selections}
@@ -216,7 +216,7 @@ class BulkOrderingService:
     async def _send_next_question(self, user_id: str, product: str) -> None:
         """Send the next question in the product qualification flow"""
         # Check if it's an Other product (no questions)
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         selections = state_data.get("selections", {})
         if selections.get("is_other") or product in OTHER_PRODUCTS:
             # Other products skip questions - go straight to quantity
@@ -226,7 +226,7 @@ class BulkOrderingService:
         if product not in BULK_PRODUCTS:
             logger.error(f"Unknown product: {product}")
             # Get user's language preference
-            user_language = self.redis_store.get_user_language(user_id)
+            user_language = await self.redis_store.get_user_language(user_id)
             language_code = user_language.get("language_code", "en") if user_language else "en"
             error_message = get_bulk_message(language_code, "error_generic")
             await self.whatsapp_api.send_message(
@@ -236,7 +236,7 @@ class BulkOrderingService:
             return
         
         product_config = BULK_PRODUCTS[product]
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         selections = state_data.get("selections", {})
         
         # Find which question to ask next
@@ -248,7 +248,7 @@ class BulkOrderingService:
                 continue
             
             # Ask this question
-            state_data = self.redis_store.get_bulk_order_state(user_id)
+            state_data = await self.redis_store.get_bulk_order_state(user_id)
             current_state = state_data.get("state", "selecting_specs") if state_data else "selecting_specs"
             step_info = {"flow": "bulk_ordering", "state": current_state, "current_step": step}
             
@@ -288,15 +288,15 @@ class BulkOrderingService:
                 if opt["id"] == selection_id:
                     # This is the answer to this question
                     selections[step] = selection_id
-                    state_data_current = self.redis_store.get_bulk_order_state(user_id)
-                    self._set_state_with_tracking(
+                    state_data_current = await self.redis_store.get_bulk_order_state(user_id)
+                    await self._set_state_with_tracking(
                         user_id,
                         "selecting_specs",
                         {"selections": selections, "discount_offers": state_data_current.get("discount_offers", []) if state_data_current else []}
                     )
                     
                     # Check if there are more questions
-                    state_data_updated = self.redis_store.get_bulk_order_state(user_id)
+                    state_data_updated = await self.redis_store.get_bulk_order_state(user_id)
                     all_answered = all(
                         q["step"] in state_data_updated.get("selections", {})
                         for q in product_config["questions"]
@@ -321,7 +321,7 @@ class BulkOrderingService:
         
         if not name_text or len(name_text) < 2:
             # Get user's language preference
-            user_language = self.redis_store.get_user_language(user_id)
+            user_language = await self.redis_store.get_user_language(user_id)
             language_code = user_language.get("language_code", "en") if user_language else "en"
             invalid_name_msg = get_bulk_message(language_code, "invalid_name")
             name_message = get_bulk_message(language_code, "ask_name")
@@ -332,7 +332,7 @@ class BulkOrderingService:
             return
         
         # Store name
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         selections = state_data.get("selections", {}) if state_data else {}
         selections["name"] = name_text
         
@@ -340,12 +340,12 @@ class BulkOrderingService:
         self._track_user_action(user_id, "text_input", name_text, "asking_name")
         
         # Get user's language preference
-        user_language = self.redis_store.get_user_language(user_id)
+        user_language = await self.redis_store.get_user_language(user_id)
         language_code = user_language.get("language_code", "en") if user_language else "en"
         product_names = get_product_names(language_code)
         
         # Update state and ask for product
-        self._set_state_with_tracking(
+        await self._set_state_with_tracking(
             user_id,
             "selecting_product",
             {"selections": selections}
@@ -381,11 +381,11 @@ class BulkOrderingService:
     async def _ask_quantity(self, user_id: str) -> None:
         """Ask user for quantity"""
         # Get user's language preference
-        user_language = self.redis_store.get_user_language(user_id)
+        user_language = await self.redis_store.get_user_language(user_id)
         language_code = user_language.get("language_code", "en") if user_language else "en"
         
-        state_data = self.redis_store.get_bulk_order_state(user_id)
-        self._set_state_with_tracking(
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
+        await self._set_state_with_tracking(
             user_id,
             "asking_quantity",
             {"selections": state_data.get("selections", {}) if state_data else {}}
@@ -403,7 +403,7 @@ class BulkOrderingService:
         """Handle quantity input and create Freshdesk ticket"""
         try:
             # Get user's language preference
-            user_language = self.redis_store.get_user_language(user_id)
+            user_language = await self.redis_store.get_user_language(user_id)
             language_code = user_language.get("language_code", "en") if user_language else "en"
             
             # Try to extract number from text
@@ -432,7 +432,7 @@ class BulkOrderingService:
                 user_region = user_language.get("region") if user_language else None
                 
                 # Get product from selections to build product-specific URL
-                state_data = self.redis_store.get_bulk_order_state(user_id)
+                state_data = await self.redis_store.get_bulk_order_state(user_id)
                 selections = state_data.get("selections", {}) if state_data else {}
                 product = selections.get("product")
                 
@@ -451,7 +451,7 @@ class BulkOrderingService:
                 return
             
             # Store quantity (quantity >= 11)
-            state_data = self.redis_store.get_bulk_order_state(user_id)
+            state_data = await self.redis_store.get_bulk_order_state(user_id)
             selections = state_data.get("selections", {}) if state_data else {}
             selections["quantity"] = quantity
             
@@ -521,18 +521,18 @@ class BulkOrderingService:
             
             # Keep state for 1 minute so dashboard can pick it up
             # Update state to "completed" with 60 second TTL
-            self.redis_store.set_bulk_order_state(
+            await self.redis_store.set_bulk_order_state(
                 user_id, 
                 "completed", 
                 {"selections": selections},  # Keep selections including quantity
                 ttl=60  # 1 minute
             )
-            self.redis_store.clear_last_message_sent(user_id)
+            await self.redis_store.clear_last_message_sent(user_id)
             
         except Exception as e:
             logger.error(f"Error processing quantity: {e}")
             # Get user's language preference
-            user_language = self.redis_store.get_user_language(user_id)
+            user_language = await self.redis_store.get_user_language(user_id)
             language_code = user_language.get("language_code", "en") if user_language else "en"
             invalid_number_msg = get_bulk_message(language_code, "invalid_number")
             await self.whatsapp_api.send_message(
@@ -648,7 +648,7 @@ Send your email address, or type 'skip' to continue without it.
             email = email_text
         
         # Store email
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         selections = state_data.get("selections", {})
         if email:
             selections["email"] = email
@@ -657,7 +657,7 @@ Send your email address, or type 'skip' to continue without it.
         self._track_user_action(user_id, "text_input", email if email else "skip", "asking_email")
         
         # Update state and ask for postcode (optional)
-        self._set_state_with_tracking(
+        await self._set_state_with_tracking(
             user_id,
             "asking_postcode",
             {"selections": selections, "discount_offers": []}
@@ -686,7 +686,7 @@ Send your postcode, or type 'skip' to continue without it."""
             postcode = postcode_text.upper()
         
         # Store postcode
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         selections = state_data.get("selections", {})
         if postcode:
             selections["postcode"] = postcode
@@ -708,7 +708,7 @@ Send your postcode, or type 'skip' to continue without it."""
             name = name_text
         
         # Store name if provided
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         selections = state_data.get("selections", {})
         if name:
             selections["name"] = name
@@ -720,7 +720,7 @@ Send your postcode, or type 'skip' to continue without it."""
         state_data["selections"] = selections
         state_data.pop("pending_escalation", None)
         # Don't track transition here as we're proceeding to escalation
-        self.redis_store.set_bulk_order_state(user_id, state_data.get("state", "unknown"), state_data)
+        await self.redis_store.set_bulk_order_state(user_id, state_data.get("state", "unknown"), state_data)
         
         # Proceed with escalation (don't ask for name again)
         await self._escalate_to_support(user_id, selections, ask_name=False)
@@ -745,10 +745,10 @@ Send your postcode, or type 'skip' to continue without it."""
         discount_code = DISCOUNT_CODES["second_offer"]
         
         # Store offer
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         offers = state_data.get("discount_offers", [])
         offers.append("first_offer")
-        self._set_state_with_tracking(
+        await self._set_state_with_tracking(
             user_id,
             "offering_first_discount",
             {"selections": selections, "discount_offers": offers}
@@ -797,7 +797,7 @@ Send your postcode, or type 'skip' to continue without it."""
                 "selections": {k: v for k, v in selections.items() if k not in ["email", "postcode", "quantity"]}
             }
             logger.info(f"📊 Attempting to save analytics event for user {user_id}, product {product_name}, quantity {quantity}")
-            postgres_store.save_analytics_event(
+            analytics_writer.add_event(
                 event_type="bulk_quote_generated",
                 user_id=user_id,
                 email=selections.get("email"),
@@ -872,7 +872,7 @@ Ready to proceed?"""
     
     async def _handle_discount_acceptance(self, user_id: str, current_state: str) -> None:
         """Handle when user accepts discount"""
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         selections = state_data.get("selections", {})
         # Determine correct discount code based on state
         # offering_first_discount = second_offer (worse), offering_second_discount = first_offer (better)
@@ -897,14 +897,14 @@ Visit: {product_url}
 Apply the code at checkout. Happy to help with anything else!"""
         
         # Get current state for step_info
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         current_state = state_data.get("state", "completed") if state_data else "completed"
         step_info = {"flow": "bulk_ordering", "state": current_state}
         await self.whatsapp_api.send_message(user_id, message, step_info=step_info)
         
         # Clear bulk ordering state and last message tracking
-        self.redis_store.clear_bulk_order_state(user_id)
-        self.redis_store.clear_last_message_sent(user_id)
+        await self.redis_store.clear_bulk_order_state(user_id)
+        await self.redis_store.clear_last_message_sent(user_id)
     
     def _get_product_url(self, selections: Dict) -> str:
         """Get the appropriate product URL based on selections"""
@@ -969,7 +969,7 @@ Apply the code at checkout. Happy to help with anything else!"""
     
     async def _handle_discount_rejection(self, user_id: str, current_state: str) -> None:
         """Handle when user rejects discount - show follow-up question"""
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         selections = state_data.get("selections", {})
         
         # If rejecting second discount, show new buttons
@@ -985,7 +985,7 @@ Apply the code at checkout. Happy to help with anything else!"""
         state_data["selections"] = selections
         
         # Update state to asking for decline reason
-        self._set_state_with_tracking(
+        await self._set_state_with_tracking(
             user_id,
             "asking_decline_reason",
             state_data
@@ -1008,12 +1008,12 @@ Apply the code at checkout. Happy to help with anything else!"""
     
     async def _ask_after_second_discount(self, user_id: str) -> None:
         """Ask user after showing second discount with new buttons"""
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         if not state_data:
             state_data = {"selections": {}, "discount_offers": []}
         
         # Update state
-        self._set_state_with_tracking(
+        await self._set_state_with_tracking(
             user_id,
             "asking_after_second_discount",
             state_data
@@ -1045,11 +1045,11 @@ Feel free to reach out if you have any questions! 😊"""
         await self.whatsapp_api.send_message(user_id, message)
         
         # Clear bulk ordering state
-        self.redis_store.clear_bulk_order_state(user_id)
+        await self.redis_store.clear_bulk_order_state(user_id)
     
     async def _handle_decline_too_expensive(self, user_id: str) -> None:
         """Handle when user says 'Too expensive' - show better discount"""
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         if not state_data:
             logger.error(f"No state data found for user {user_id} when handling too expensive")
             await self.whatsapp_api.send_message(
@@ -1064,7 +1064,7 @@ Feel free to reach out if you have any questions! 😊"""
     
     async def _handle_too_expensive_after_second(self, user_id: str) -> None:
         """Handle when user says 'Too expensive' after second discount - create Freshdesk ticket"""
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         if not state_data:
             logger.error(f"No state data found for user {user_id} when handling too expensive after second")
             await self.whatsapp_api.send_message(
@@ -1083,10 +1083,10 @@ Feel free to reach out if you have any questions! 😊"""
         discount_code = DISCOUNT_CODES["first_offer"]
         
         # Store offer
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         offers = state_data.get("discount_offers", [])
         offers.append("second_offer")
-        self._set_state_with_tracking(
+        await self._set_state_with_tracking(
             user_id,
             "offering_second_discount",
             {"selections": selections, "discount_offers": offers}
@@ -1129,7 +1129,7 @@ Feel free to reach out if you have any questions! 😊"""
                 "offer_type": "second",
                 "selections": {k: v for k, v in selections.items() if k not in ["email", "postcode", "quantity"]}
             }
-            postgres_store.save_analytics_event(
+            analytics_writer.add_event(
                 event_type="bulk_quote_generated",
                 user_id=user_id,
                 email=selections.get("email"),
@@ -1207,10 +1207,10 @@ Want me to update your pay link?"""
         # Check if we should ask for name first
         if ask_name and not selections.get("name"):
             # Ask for name (optional - don't block if not provided)
-            state_data = self.redis_store.get_bulk_order_state(user_id)
+            state_data = await self.redis_store.get_bulk_order_state(user_id)
             state_data["selections"] = selections
             state_data["pending_escalation"] = True
-            self._set_state_with_tracking(user_id, "asking_name_for_escalation", state_data)
+            await self._set_state_with_tracking(user_id, "asking_name_for_escalation", state_data)
             
             step_info = {"flow": "bulk_ordering", "state": "asking_name_for_escalation"}
             await self.whatsapp_api.send_message(
@@ -1237,7 +1237,7 @@ Want me to update your pay link?"""
         user_name = selections.get("name", "")  # Optional name
         
         # Get quote details from state
-        state_data = self.redis_store.get_bulk_order_state(user_id)
+        state_data = await self.redis_store.get_bulk_order_state(user_id)
         offers = state_data.get("discount_offers", [])
         
         # Get the best quote that was offered
@@ -1373,7 +1373,7 @@ Want me to update your pay link?"""
             )
         
         # Clear bulk ordering state
-        self.redis_store.clear_bulk_order_state(user_id)
+        await self.redis_store.clear_bulk_order_state(user_id)
     
     async def _create_accepted_order_ticket(self, user_id: str, selections: Dict, discount_code: str, offer_type: str) -> None:
         """Create Freshdesk ticket when customer accepts bulk order quote"""
@@ -1514,8 +1514,8 @@ Need a specific date? Choose rush shipping and contact us with your required dat
         await self.whatsapp_api.send_message(user_id, delivery_info)
         
         # Clear bulk ordering state so user can continue conversation or ask follow-up questions
-        self.redis_store.clear_bulk_order_state(user_id)
-        self.redis_store.clear_last_message_sent(user_id)
+        await self.redis_store.clear_bulk_order_state(user_id)
+        await self.redis_store.clear_last_message_sent(user_id)
 
 
 # Global instance will be created in main handler
@@ -12,6 +12,7 @@ from supabase import create_client, Client
 from config.settings import SUPABASE_URL, SUPABASE_KEY, CSV_DATA_PATH
 from config.bulk_product_mapping import get_product_reference_code
 from config.bulk_products import PRICE_POINT_MAPPING
+from utils.http_client import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -407,7 +408,7 @@ class BulkPricingService:
             }
             
             # Send empty JSON body as required by API
-            response = requests.post(
+            response = http_clients.session("bulk_pricing").post(
                 self.pricing_api_url,
                 params=params,
                 json={},  # Empty JSON body as required
@@ -0,0 +1,340 @@
+"""
+Catalog Index
+Structured product/size/region index that answers direct price and size questions without the LLM
+"""
+
+import csv
+import difflib
+import glob
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+from config.settings import CATALOG_DATA_PATH
+from config.bulk_products import BULK_PRODUCTS, OTHER_PRODUCTS
+from rag.hybrid_retriever import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Readable names for the product families used in MPNs (first segment of the MPN)
+FAMILY_NAMES = {
+    "blanketsherpafleece": "sherpa fleece blanket",
+    "blanketpolarfleece": "polar fleece blanket",
+    "blanketflannelfleece": "flannel fleece blanket",
+    "boxedpuzzle": "boxed jigsaw puzzle",
+    "puzzle": "jigsaw puzzle",
+    "cal": "calendar",
+    "pb": "photo book",
+    "pblayflat": "layflat photo book",
+    "cushionpolyester": "photo cushion",
+    "mousemat": "mouse mat",
+    "metalprint": "metal print",
+    "phototile": "photo tile",
+    "phototilealu": "aluminium photo tile",
+    "photostrip": "photo strip",
+    "towelbeach": "beach towel",
+    "christmasbubble": "christmas bauble",
+    "christmasstocking": "christmas stocking",
+    "slate": "photo slate",
+    "frame": "photo frame",
+    "bottle": "photo bottle",
+    "canvas": "canvas print",
+    "mug": "mug",
+    "coaster": "coaster",
+    "poster": "poster"
+}
+
+REGION_ALIASES = {
+    "uk": "UK", "gb": "UK", "britain": "UK", "england": "UK",
+    "france": "FR", "spain": "ES", "italy": "IT", "germany": "DE",
+    "netherlands": "NL", "holland": "NL", "uae": "AE", "dubai": "AE", "india": "IN"
+}
+
+CURRENCIES = {"UK": "£", "FR": "€", "ES": "€", "IT": "€", "DE": "€", "NL": "€", "AE": "AED ", "IN": "₹"}
+
+PRICE_WORDS = re.compile(r"\b(price|prices|cost|costs|how much|cheapest)\b|[£€$]")
+SIZE_WORDS = re.compile(r"\b(sizes?|dimensions?|how big|capacity)\b")
+SIZE = re.compile(r"^\d+(?:_\d+)?x\d+(?:_\d+)?$")
+DIGIT = re.compile(r"\d")
+
+# Words that make a price/size question about something else: an order, a refund, a bulk quote, a photo file
+OFF_TOPIC_WORDS = re.compile(
+    r"\b(refunds?|refunded|returns?|returned|broken|damaged|faulty|cancel\w*|exchange|replace\w*|complain\w*|"
+    r"orders?|ordered|ordering|deliver\w*|arriv\w*|dispatch\w*|track\w*|shipped|late|"
+    r"bulk|wholesale|quantit\w*|qty|units?|pieces|pcs|dozens?|hundreds?|thousands?|many|discounts?|"
+    r"upload\w*|resolution|pixels?|dpi|files?|images?)\b"
+)
+
+# Words that say nothing about which product is meant
+STOPWORDS = {
+    "the", "a", "an", "of", "for", "in", "is", "are", "do", "does", "you", "your", "what", "whats", "how",
+    "much", "price", "prices", "cost", "costs", "size", "sizes", "dimensions", "dimension", "big", "and",
+    "me", "i", "my", "have", "there", "to", "it", "available", "come", "with", "on", "please", "cheapest",
+    "capacity", "inch", "inches", "cm", "can", "get", "tell", "would", "will", "be", "could", "sell", "any", "which"
+}
+
+
+class CatalogIndex:
+    """
+    In-memory product index keyed by product tokens, size and region
+
+    Built from the same sources the vector store flattens into prose:
+    products.json (specs and UK price ranges), the regional sales CSVs (exact
+    prices and shipping per MPN) and config/bulk_products.py (available sizes).
+    Product words in a question are matched exactly or, for typos, with
+    difflib against the index vocabulary, so "how much is a sherpa blanket
+    30x40 in the UK" resolves with a few dict lookups instead of an LLM call.
+    Anything that isn't clearly a price/size question about a known product
+    returns None and goes down the normal RAG path: every word of the question
+    must be a product, size, region or price/size word, so questions that
+    merely mention a product ("my mug arrived broken, how much is a refund?")
+    or carry quantities ("100 mugs") are left to the LLM.
+    """
+
+    # Most entries listed in one answer
+    MAX_LINES = 6
+
+    def __init__(self, data_path: str = CATALOG_DATA_PATH):
+        self.data_path = data_path
+        self.entries: List[Dict[str, Any]] = []
+        self._by_token: Dict[str, Set[int]] = defaultdict(set)
+        self._by_sku: Dict[str, List[int]] = defaultdict(list)
+        self._vocabulary: List[str] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.answered = 0
+        self.passed = 0
+
+    def _add(self, entry: Dict[str, Any]):
+        index = len(self.entries)
+        self.entries.append(entry)
+        for token in entry["tokens"]:
+            self._by_token[token].add(index)
+        if entry.get("sku"):
+            self._by_sku[entry["sku"]].append(index)
+
+    @staticmethod
+    def _product_tokens(text: str) -> Set[str]:
+        return {token for token in tokenize(text) if token not in STOPWORDS and not SIZE.match(token)}
+
+    def load(self):
+        """(Re)build the index from the catalog sources"""
+        with self._lock:
+            self.entries = []
+            self._by_token = defaultdict(set)
+            self._by_sku = defaultdict(list)
+            self._load_products_json(os.path.join(self.data_path, "products.json"))
+            for csv_path in glob.glob(os.path.join(self.data_path, "*.csv")):
+                self._load_sales_csv(csv_path)
+            self._load_bulk_products()
+            self._vocabulary = list(self._by_token)
+            self._loaded = True
+        logger.info(f"✓ Catalog index built: {len(self.entries)} entries, {len(self._vocabulary)} product terms")
+
+    def _load_products_json(self, path: str):
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading catalog from {path}: {e}")
+            return
+
+        for product in data.get("products", []):
+            name = product.get("name", "")
+            tokens = self._product_tokens(f"{name} {product.get('category', '')} {product.get('subcategory', '')}")
+            for size in product.get("sizes", []):
+                self._add({
+                    "product": name,
+                    "size": size.get("name"),
+                    "dimensions": size.get("dimensions"),
+                    "capacity": size.get("capacity"),
+                    "price_text": size.get("price_range"),
+                    "region": "UK",
+                    "tokens": tokens
+                })
+
+    def _load_sales_csv(self, path: str):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        except Exception as e:
+            logger.error(f"Error loading catalog from {path}: {e}")
+            return
+        if not rows or "mpn" not in rows[0] or "price" not in rows[0]:
+            return
+
+        for row in rows:
+            sku = row["mpn"].strip().lower()
+            parts = sku.split("_")
+            family = FAMILY_NAMES.get(parts[0], parts[0])
+            size = next((part for part in parts[1:] if SIZE.match(part)), None)
+            try:
+                price = float(row["price"])
+                shipping = float(row["shipping"]) if row.get("shipping") else None
+            except ValueError:
+                continue
+            self._add({
+                "product": family.title(),
+                "sku": sku,
+                "variant": " ".join(part for part in parts[1:] if part != size) or None,
+                "size": size.replace("_", ".") if size else None,
+                "price": price,
+                "shipping": shipping,
+                "region": row.get("Region", "").strip().upper() or None,
+                "tokens": self._product_tokens(f"{family} {sku}")
+            })
+
+    def _load_bulk_products(self):
+        products = {key: value["name"] for key, value in BULK_PRODUCTS.items()}
+        products.update({key: value["name"] for key, value in OTHER_PRODUCTS.items()})
+        for key, name in products.items():
+            tokens = self._product_tokens(f"{name} {key}")
+            questions = BULK_PRODUCTS.get(key, {}).get("questions", [])
+            sizes = [option["title"] for q in questions if q["step"] == "size" for option in q["options"]]
+            for size in sizes:
+                self._add({"product": name, "size": size, "region": None, "tokens": tokens})
+
+    def _resolve_token(self, token: str) -> Optional[str]:
+        """Map a query word to an index term (exact, or closest match for typos)"""
+        if token in self._by_token:
+            return token
+        if len(token) < 4:
+            return None
+        close = difflib.get_close_matches(token, self._vocabulary, n=1, cutoff=0.85)
+        return close[0] if close else None
+
+    def lookup(self, query: str, region: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find catalog entries for a question
+
+        Args:
+            query: User message
+            region: User region code (used when the question doesn't name one)
+
+        Returns:
+            Entries matching every product word and the size, if one is named
+            (empty if any product word or the size is not recognised)
+        """
+        if not self._loaded:
+            self.load()
+
+        tokens = tokenize(query)
+        query_region = next((REGION_ALIASES[t] for t in tokens if t in REGION_ALIASES), None)
+        region = query_region or (region.upper() if region else None)
+        if region == "GB":
+            region = "UK"
+        size = next((t for t in tokens if SIZE.match(t)), None)
+
+        # Exact MPN mentioned
+        for token in tokens:
+            if token in self._by_sku:
+                return [self.entries[i] for i in self._by_sku[token]]
+
+        terms = {self._resolve_token(t) for t in tokens if t not in STOPWORDS and t not in REGION_ALIASES and not SIZE.match(t)}
+        if not terms or None in terms:
+            return []
+
+        # Entries must contain every product term
+        matches = set.intersection(*(self._by_token[term] for term in terms))
+        candidates = [self.entries[i] for i in sorted(matches)]
+
+        if size:
+            # A size named in the question must be honoured
+            candidates = [e for e in candidates if e.get("size") and size in tokenize(str(e["size"]))]
+        if region:
+            regional = [e for e in candidates if e.get("region") in (region, None)]
+            # A region named in the question must be honoured; the user's default region is a preference
+            candidates = regional if (regional or query_region) else candidates
+        return candidates
+
+    def answer(self, query: str, region: Optional[str] = None) -> Optional[str]:
+        """
+        Answer a direct price or size question from the catalog
+
+        Args:
+            query: User message
+            region: User region code
+
+        Returns:
+            Answer text, or None if the question should go to the LLM
+        """
+        text = query.lower()
+        wants_price = bool(PRICE_WORDS.search(text))
+        wants_size = bool(SIZE_WORDS.search(text))
+        if not (wants_price or wants_size):
+            return None
+        if not self._loaded:
+            self.load()
+
+        # Numbers other than sizes and SKUs are quantities, order numbers and the like
+        tokens = tokenize(query)
+        skus = [t for t in tokens if t in self._by_sku]
+        sku_parts = {part for sku in skus for part in sku.split("_")}
+        has_number = any(DIGIT.search(t) and not SIZE.match(t) and t not in skus and t not in sku_parts for t in tokens)
+        if has_number or OFF_TOPIC_WORDS.search(text):
+            self.passed += 1
+            return None
+
+        entries = self.lookup(query, region)
+        if wants_price:
+            entries = [e for e in entries if e.get("price") is not None or e.get("price_text")]
+            entries.sort(key=lambda e: (e.get("price") is None, e.get("price") or 0))
+        else:
+            entries = [e for e in entries if e.get("size")]
+        if not entries:
+            self.passed += 1
+            return None
+
+        lines = []
+        seen = set()
+        for entry in entries:
+            line = self._format(entry, wants_price)
+            if line not in seen:
+                seen.add(line)
+                lines.append(f"• {line}")
+            if len(lines) >= self.MAX_LINES:
+                break
+
+        self.answered += 1
+        header = "Here are our prices:" if wants_price else "Here are the available sizes:"
+        return f"{header}\n" + "\n".join(lines) + "\n\nWould you like help placing an order?"
+
+    @staticmethod
+    def _format(entry: Dict[str, Any], with_price: bool) -> str:
+        name = entry["product"]
+        if entry.get("variant"):
+            name += f" ({entry['variant']})"
+        if entry.get("size"):
+            name += f" {entry['size']}"
+        details = [entry[key] for key in ("dimensions", "capacity") if entry.get(key)]
+        if details and not with_price:
+            name += f" - {', '.join(details)}"
+        if not with_price:
+            return name
+
+        if entry.get("price") is not None:
+            currency = CURRENCIES.get(entry.get("region"), "")
+            price = f"{currency}{entry['price']:.2f}"
+            if entry.get("shipping") is not None:
+                price += f" + {currency}{entry['shipping']:.2f} shipping"
+            return f"{name}: {price}" + (f" ({entry['region']})" if entry.get("region") else "")
+        return f"{name}: {entry['price_text']}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and answer counts"""
+        return {
+            "entries": len(self.entries),
+            "answered": self.answered,
+            "passed_to_llm": self.passed
+        }
+
+
+# Global instance
+catalog_index = CatalogIndex()
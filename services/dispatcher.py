@@ -0,0 +1,106 @@
+"""
+Sharded Dispatcher
+Serializes work per key (WhatsApp number) while running different keys in parallel
+"""
+
+import asyncio
+import logging
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+ItemHandler = Callable[[Any], Awaitable[None]]
+
+
+class ShardedDispatcher:
+    """
+    Routes items to a fixed set of shard workers by hashing a key
+
+    Every item with the same key lands on the same shard, and each shard runs
+    one item at a time, so work for one user is processed strictly in arrival
+    order while other users proceed on the other shards. No locks are involved.
+
+    Ordering is per process: with several replicas consuming the same stream,
+    a user's messages are only ordered within the replica that received them.
+    """
+
+    def __init__(self, shards: int, handler: ItemHandler, queue_size: int = 16):
+        """
+        Args:
+            shards: Number of shard workers (maximum parallelism)
+            handler: Coroutine function called with each item
+            queue_size: Maximum queued items per shard before submit() waits
+        """
+        self.shards = max(1, shards)
+        self.handler = handler
+        self._queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=queue_size) for _ in range(self.shards)]
+        self._tasks: List[asyncio.Task] = []
+        self._busy = [False] * self.shards
+        self.processed = [0] * self.shards
+
+    def shard_for(self, key: str) -> int:
+        """Get the shard index for a key (stable across processes and restarts)"""
+        return zlib.crc32((key or "").encode("utf-8")) % self.shards
+
+    async def submit(self, key: str, item: Any):
+        """Queue an item on its key's shard, waiting if that shard is full"""
+        await self._queues[self.shard_for(key)].put(item)
+
+    def submit_nowait(self, key: str, item: Any) -> bool:
+        """
+        Queue an item without waiting
+
+        Returns:
+            True if queued, False if the shard is full
+        """
+        try:
+            self._queues[self.shard_for(key)].put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def start(self):
+        """Start one worker task per shard"""
+        if self._tasks:
+            return
+        for shard in range(self.shards):
+            self._tasks.append(asyncio.create_task(self._worker(shard)))
+
+    async def stop(self):
+        """Cancel shard workers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, shard: int):
+        """Run items for one shard sequentially"""
+        queue = self._queues[shard]
+        while True:
+            item = await queue.get()
+            self._busy[shard] = True
+            try:
+                await self.handler(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Dispatcher shard {shard} handler error: {e}", exc_info=True)
+            finally:
+                self._busy[shard] = False
+                self.processed[shard] += 1
+                queue.task_done()
+
+    def qsize(self) -> int:
+        """Total items waiting across all shards"""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-shard queue depth and utilisation"""
+        return {
+            "shards": self.shards,
+            "busy_shards": sum(self._busy),
+            "queued": self.qsize(),
+            "max_shard_depth": max(queue.qsize() for queue in self._queues),
+            "processed_per_shard": list(self.processed)
+        }
@@ -7,6 +7,7 @@ import logging
 import requests
 from typing import Dict, Optional, Any
 from config.settings import N8N_WEBHOOK_URL
+from utils.http_client import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -139,7 +140,7 @@ class FreshdeskService:
             logger.info(f"Sending support ticket request to n8n webhook")
             logger.debug(f"Ticket data: {ticket_data}")
             
-            response = requests.post(
+            response = http_clients.session("freshdesk").post(
                 self.api_url,
                 json=ticket_data,
                 headers=self.headers,
@@ -11,9 +11,10 @@ import time
 import asyncio
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-from database.redis_store import redis_store
+from database.async_redis_store import async_redis_store
 from bot.whatsapp_api import WhatsAppAPI
 from config.settings import UPLOADCARE_PUBLIC_KEY, UPLOADCARE_SECRET_KEY
+from utils.http_client import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ class ImageCreationService:
     
     def __init__(self, whatsapp_api: WhatsAppAPI):
         self.whatsapp_api = whatsapp_api
-        self.redis_store = redis_store
+        self.redis_store = async_redis_store
         self.dimensions_df = None
         self.target_products = None
         self._load_dimensions()
@@ -207,31 +208,31 @@ class ImageCreationService:
             
             logger.info(f"📤 Uploading image to Uploadcare ({len(image_bytes)} bytes)...")
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Upload with form data
-                response = await client.post(upload_url, files=files, data=data)
-                
-                logger.info(f"📤 Uploadcare response status: {response.status_code}")
-                logger.info(f"📤 Uploadcare response: {response.text[:200]}")
-                
-                response.raise_for_status()
-                
-                # Uploadcare returns the file UUID
-                file_uuid = response.text.strip()
-                logger.info(f"✅ Uploaded to Uploadcare, UUID: {file_uuid}")
-                
-                # Construct public URL
-                public_url = f"https://ucarecdn.com/{file_uuid}/"
-                
-                # Extract s3key (for Uploadcare, the UUID is typically the s3key)
-                # But we might need to construct it based on Uploadcare's structure
-                s3key = file_uuid
-                
-                logger.info(f"✅ Got public URL: {public_url}")
-                logger.info(f"✅ Extracted s3key: {s3key}")
-                
-                return public_url, s3key
-                
+            client = http_clients.get("uploadcare", timeout=30.0)
+            # Upload with form data
+            response = await client.post(upload_url, files=files, data=data)
+            
+            logger.info(f"📤 Uploadcare response status: {response.status_code}")
+            logger.info(f"📤 Uploadcare response: {response.text[:200]}")
+            
+            response.raise_for_status()
+            
+            # Uploadcare returns the file UUID
+            file_uuid = response.text.strip()
+            logger.info(f"✅ Uploaded to Uploadcare, UUID: {file_uuid}")
+            
+            # Construct public URL
+            public_url = f"https://ucarecdn.com/{file_uuid}/"
+            
+            # Extract s3key (for Uploadcare, the UUID is typically the s3key)
+            # But we might need to construct it based on Uploadcare's structure
+            s3key = file_uuid
+            
+            logger.info(f"✅ Got public URL: {public_url}")
+            logger.info(f"✅ Extracted s3key: {s3key}")
+            
+            return public_url, s3key
+            
         except httpx.TimeoutException:
             logger.error("⏱️ Timeout uploading to Uploadcare")
             raise Exception("Image upload timed out. Please try again.")
@@ -248,10 +249,10 @@ class ImageCreationService:
     async def start_image_creation(self, user_id: str) -> None:
         """Start the image creation flow - prompt user to send image"""
         # Clear any existing state
-        self.redis_store.clear_image_creation_state(user_id)
+        await self.redis_store.clear_image_creation_state(user_id)
         
         # Set state to waiting for image
-        self.redis_store.set_image_creation_state(
+        await self.redis_store.set_image_creation_state(
             user_id,
             "waiting_for_image",
             {}
@@ -269,7 +270,7 @@ class ImageCreationService:
         logger.info(f"🖼️ handle_image called for user {user_id}, media_id: {media_id}")
         try:
             # Update state to processing
-            self.redis_store.set_image_creation_state(
+            await self.redis_store.set_image_creation_state(
                 user_id,
                 "processing",
                 {"media_id": media_id}
@@ -322,7 +323,7 @@ class ImageCreationService:
                 user_id,
                 f"❌ Sorry, I encountered an error processing your image: {error_message}. Please try again."
             )
-            self.redis_store.clear_image_creation_state(user_id)
+            await self.redis_store.clear_image_creation_state(user_id)
     
     async def _process_all_products(self, user_id: str, image_url: str, s3key: str, region: str) -> None:
         """Process image through all target products"""
@@ -438,7 +439,7 @@ class ImageCreationService:
             )
         
         # Clear state
-        self.redis_store.set_image_creation_state(
+        await self.redis_store.set_image_creation_state(
             user_id,
             "completed",
             {"processed": processed, "errors": errors}
@@ -475,12 +476,12 @@ class ImageCreationService:
         
         try:
             logger.info(f"Calling API for {refcode} on {api_domain}")
-            async with httpx.AsyncClient(timeout=8.0) as client:  # Reduced timeout to 8s
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                logger.info(f"✅ API success for {refcode}")
-                return {"success": True, "data": data}
+            client = http_clients.get("product_api", timeout=8.0)
+            response = await client.post(url, json=payload, headers=headers)
+            response.raise_for_status()
+            data = response.json()
+            logger.info(f"✅ API success for {refcode}")
+            return {"success": True, "data": data}
         except httpx.TimeoutException:
             logger.warning(f"⏱️ API timeout for {refcode} (8s)")
             return {"success": False, "error": "timeout"}
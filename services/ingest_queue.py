@@ -0,0 +1,332 @@
+"""
+Ingest Queue
+Durable, bounded queue between the webhook endpoint and message processing
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from config.settings import (
+    INGEST_STREAM_KEY,
+    INGEST_CONSUMER_GROUP,
+    INGEST_QUEUE_MAX_DEPTH,
+    INGEST_WORKERS
+)
+from database.redis_store import redis_store
+from services.dispatcher import ShardedDispatcher
+from utils.task_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Depth check and append in one atomic round trip; returns nil when the stream is full
+APPEND_IF_ROOM = """
+if redis.call('XLEN', KEYS[1]) >= tonumber(ARGV[1]) then
+    return false
+end
+return redis.call('XADD', KEYS[1], '*', 'data', ARGV[2])
+"""
+
+
+class IngestQueue:
+    """
+    Bounded ingest queue backed by a Redis Stream with a local worker pool
+
+    The webhook only appends to the stream (one script call that checks the
+    depth and XADDs) and returns. A reader task
+    pulls entries through a consumer group and hands them to a sharded dispatcher
+    keyed on the sender's number, so messages from one user are handled in order
+    while different users run in parallel. Each entry is acknowledged once its
+    handler finishes. Entries that were read but never acknowledged (e.g. the pod
+    restarted mid-flight) are reclaimed from the pending list and processed again.
+
+    If Redis is unavailable, messages go straight to the dispatcher so the bot
+    keeps working, without durability.
+    """
+
+    BATCH_SIZE = 20
+    BLOCK_MS = 1000  # Must stay below the Redis socket timeout (5s)
+    RECLAIM_IDLE_MS = 60000  # Entries pending longer than this are considered orphaned
+    RECLAIM_INTERVAL = 30  # Seconds between pending-list sweeps
+    RATE_WINDOW = 60  # Seconds of history used for the drain rate
+
+    def __init__(
+        self,
+        stream_key: str = INGEST_STREAM_KEY,
+        group: str = INGEST_CONSUMER_GROUP,
+        max_depth: int = INGEST_QUEUE_MAX_DEPTH,
+        workers: int = INGEST_WORKERS
+    ):
+        self.redis_store = redis_store
+        self.stream_key = stream_key
+        self.group = group
+        self.max_depth = max_depth
+        self.workers = max(1, workers)
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+
+        # Per-shard buffers: with Redis the reader stops pulling from the stream when a
+        # shard is full, without Redis they are the whole queue
+        shard_queue_size = 16 if self.durable else max(1, max_depth // self.workers)
+        self._dispatcher = ShardedDispatcher(self.workers, self._process, queue_size=shard_queue_size)
+        self._handler: Optional[MessageHandler] = None
+        self._append_script = None  # APPEND_IF_ROOM registered on the Redis client (see _append)
+        self._supervisor: Optional[TaskSupervisor] = None
+        self._tasks = []
+        self._running = False
+
+        # Metrics
+        self._started_at = None
+        self._completed = deque()
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.reclaimed = 0
+
+    @property
+    def durable(self) -> bool:
+        """True when the queue is backed by Redis"""
+        return self.redis_store.client is not None
+
+    async def enqueue(self, message_data: Dict[str, Any]) -> bool:
+        """
+        Append a message to the queue
+
+        Args:
+            message_data: Parsed message dict as built by the webhook
+
+        Returns:
+            True if the message was accepted, False if the queue is full
+        """
+        if self.durable:
+            try:
+                entry_id = await asyncio.to_thread(self._append, json.dumps(message_data))
+                if entry_id is None:
+                    self.rejected += 1
+                    logger.warning(f"⚠️ Ingest queue full ({self.max_depth}), rejecting message {message_data.get('message_id')}")
+                    return False
+                self.enqueued += 1
+                return True
+            except Exception as e:
+                logger.error(f"❌ Error adding message to ingest stream, using local buffer: {e}")
+
+        if self._dispatcher.submit_nowait(message_data.get("from"), (None, message_data)):
+            self.enqueued += 1
+            return True
+        self.rejected += 1
+        logger.warning(f"⚠️ Local ingest buffer full, rejecting message {message_data.get('message_id')}")
+        return False
+
+    def _append(self, payload: str) -> Optional[str]:
+        """XADD the payload unless the stream is at max_depth (blocking, single round trip)"""
+        client = self.redis_store.client
+        if self._append_script is None or self._append_script.registered_client is not client:
+            self._append_script = client.register_script(APPEND_IF_ROOM)
+        return self._append_script(keys=[self.stream_key], args=[self.max_depth, payload])
+
+    async def start(self, handler: MessageHandler, supervisor: Optional[TaskSupervisor] = None):
+        """
+        Start the stream reader and shard workers
+
+        Args:
+            handler: Coroutine function called with each message dict
+            supervisor: Optional supervisor that limits concurrent handlers and drains them on shutdown
+        """
+        if self._running:
+            return
+
+        self._handler = handler
+        self._supervisor = supervisor
+        self._running = True
+        self._started_at = time.time()
+
+        self._dispatcher.start()
+        if self.durable:
+            self._ensure_group()
+            self._tasks.append(asyncio.create_task(self._reader()))
+
+        logger.info(f"✅ Ingest queue started (workers={self.workers}, durable={self.durable}, consumer={self.consumer_name})")
+
+    async def stop(self, drain_timeout: float = 0):
+        """
+        Stop reading new entries and shut down the workers
+
+        Messages already being handled get up to drain_timeout seconds to finish
+        (requires a supervisor). Anything not finished stays pending in Redis and
+        is redelivered after restart.
+
+        Args:
+            drain_timeout: Seconds to wait for in-flight handlers
+        """
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._supervisor:
+            await self._supervisor.drain(drain_timeout)
+        await self._dispatcher.stop()
+        logger.info("Ingest queue stopped")
+
+    def _ensure_group(self):
+        """Create the consumer group (and stream) if it doesn't exist yet"""
+        try:
+            self.redis_store.client.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+            logger.info(f"✓ Created consumer group {self.group} on {self.stream_key}")
+        except Exception as e:
+            # BUSYGROUP means the group already exists
+            if "BUSYGROUP" not in str(e):
+                logger.error(f"❌ Error creating consumer group: {e}")
+
+    def _read_batch(self):
+        """Blocking read of new entries for this consumer (runs in a thread)"""
+        return self.redis_store.client.xreadgroup(
+            self.group,
+            self.consumer_name,
+            {self.stream_key: ">"},
+            count=self.BATCH_SIZE,
+            block=self.BLOCK_MS
+        )
+
+    def _claim_orphans(self):
+        """Take over entries left pending by consumers that went away (runs in a thread)"""
+        result = self.redis_store.client.xautoclaim(
+            self.stream_key,
+            self.group,
+            self.consumer_name,
+            min_idle_time=self.RECLAIM_IDLE_MS,
+            start_id="0-0",
+            count=self.BATCH_SIZE * 5
+        )
+        # Redis 7 returns [next_id, entries, deleted_ids], Redis 6.2 returns [next_id, entries]
+        return result[1] if result else []
+
+    async def _reader(self):
+        """Move entries from the Redis Stream into the local buffer"""
+        last_reclaim = 0.0
+
+        while self._running:
+            try:
+                if time.time() - last_reclaim > self.RECLAIM_INTERVAL:
+                    last_reclaim = time.time()
+                    orphans = await asyncio.to_thread(self._claim_orphans)
+                    if orphans:
+                        logger.info(f"♻️ Reclaimed {len(orphans)} pending ingest entries")
+                        self.reclaimed += len(orphans)
+                        for entry_id, fields in orphans:
+                            await self._buffer_entry(entry_id, fields)
+
+                response = await asyncio.to_thread(self._read_batch)
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        await self._buffer_entry(entry_id, fields)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error reading from ingest stream: {e}", exc_info=True)
+                await asyncio.sleep(1)
+
+    async def _buffer_entry(self, entry_id: str, fields: Optional[Dict[str, str]]):
+        """Decode a stream entry and hand it to its shard (waits while that shard is full)"""
+        if not fields or "data" not in fields:
+            # Entry was trimmed/deleted while pending, nothing left to process
+            await asyncio.to_thread(self._ack, entry_id)
+            return
+        try:
+            message_data = json.loads(fields["data"])
+        except (TypeError, ValueError) as e:
+            logger.error(f"❌ Dropping malformed ingest entry {entry_id}: {e}")
+            await asyncio.to_thread(self._ack, entry_id)
+            return
+        await self._dispatcher.submit(message_data.get("from"), (entry_id, message_data))
+
+    async def _process(self, item: Tuple[Optional[str], Dict[str, Any]]):
+        """Run the handler for one message and acknowledge its stream entry"""
+        entry_id, message_data = item
+        try:
+            if self._supervisor:
+                if not await self._supervisor.run(self._handler(message_data)):
+                    # Shutting down - leave the entry pending for redelivery
+                    return
+            else:
+                await self._handler(message_data)
+            self.processed += 1
+        except asyncio.CancelledError:
+            # Leave the entry pending so it is reclaimed after a restart
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"❌ Ingest handler failed on message {message_data.get('message_id')}: {e}", exc_info=True)
+        self._record_completion()
+        if entry_id:
+            await asyncio.to_thread(self._ack, entry_id)
+
+    def _ack(self, entry_id: str):
+        """Acknowledge and delete a processed entry so XLEN reflects the real backlog (blocking)"""
+        try:
+            pipe = self.redis_store.client.pipeline(transaction=False)
+            pipe.xack(self.stream_key, self.group, entry_id)
+            pipe.xdel(self.stream_key, entry_id)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Error acknowledging ingest entry {entry_id}: {e}")
+
+    def _record_completion(self):
+        """Track completion times for the drain rate metric"""
+        now = time.time()
+        self._completed.append(now)
+        while self._completed and now - self._completed[0] > self.RATE_WINDOW:
+            self._completed.popleft()
+
+    def get_depth(self) -> Tuple[int, int]:
+        """
+        Get current backlog
+
+        Returns:
+            Tuple of (stream entries not yet acknowledged, pending entries read by consumers)
+        """
+        stream_depth = 0
+        pending = 0
+        if self.durable:
+            try:
+                stream_depth = self.redis_store.client.xlen(self.stream_key)
+                pending = self.redis_store.client.xpending(self.stream_key, self.group).get("pending", 0)
+            except Exception as e:
+                logger.error(f"Error getting ingest queue depth: {e}")
+        return stream_depth, pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and throughput metrics"""
+        stream_depth, pending = self.get_depth()
+        now = time.time()
+        while self._completed and now - self._completed[0] > self.RATE_WINDOW:
+            self._completed.popleft()
+
+        return {
+            "durable": self.durable,
+            "running": self._running,
+            "workers": self.workers,
+            "stream_depth": stream_depth,
+            "pending": pending,
+            "local_buffer": self._dispatcher.qsize(),
+            "dispatcher": self._dispatcher.get_stats(),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "reclaimed": self.reclaimed,
+            "drain_rate_per_sec": round(len(self._completed) / self.RATE_WINDOW, 2),
+            "uptime_seconds": round(now - self._started_at, 1) if self._started_at else 0
+        }
+
+
+# Global instance
+ingest_queue = IngestQueue()
@@ -0,0 +1,107 @@
+"""
+Message De-duplication
+Rejects WhatsApp webhook retries before any work is scheduled
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from config.settings import DEDUP_TTL_SECONDS, DEDUP_LOCAL_CAPACITY
+from database.async_redis_store import async_redis_store
+
+logger = logging.getLogger(__name__)
+
+
+class MessageDeduplicator:
+    """
+    Idempotency index keyed on the WhatsApp message id
+
+    A small in-process LRU of recently seen ids answers most retries without a
+    network round trip. Anything not in the LRU is claimed in Redis with
+    SET NX EX on the async client (the webhook awaits it without blocking the
+    event loop), which is atomic across workers and replicas. If Redis is down
+    the check fails open (the message is processed) so we never drop traffic.
+    """
+
+    KEY_PREFIX = "seen_message:"
+
+    def __init__(self, ttl: int = DEDUP_TTL_SECONDS, local_capacity: int = DEDUP_LOCAL_CAPACITY):
+        self.redis_store = async_redis_store
+        self.ttl = ttl
+        self.local_capacity = local_capacity
+        self._local: "OrderedDict[str, None]" = OrderedDict()
+
+        # Metrics
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _remember(self, message_id: str):
+        """Add an id to the local LRU, evicting the oldest entry when full"""
+        self._local[message_id] = None
+        self._local.move_to_end(message_id)
+        if len(self._local) > self.local_capacity:
+            self._local.popitem(last=False)
+
+    async def is_duplicate(self, message_id: Optional[str]) -> bool:
+        """
+        Check a message id and claim it if it's new
+
+        Args:
+            message_id: WhatsApp message id (wamid...)
+
+        Returns:
+            True if this id was already seen, False if it's new (and is now claimed)
+        """
+        if not message_id:
+            return False
+
+        if message_id in self._local:
+            self._local.move_to_end(message_id)
+            self.local_hits += 1
+            return True
+
+        if self.redis_store.client:
+            try:
+                claimed = await self.redis_store.client.set(f"{self.KEY_PREFIX}{message_id}", 1, nx=True, ex=self.ttl)
+                self._remember(message_id)
+                if not claimed:
+                    self.redis_hits += 1
+                    return True
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error checking message id {message_id} for duplicates: {e}")
+        else:
+            self._remember(message_id)
+
+        self.misses += 1
+        return False
+
+    async def release(self, message_id: Optional[str]):
+        """Forget a claimed id so a redelivery is processed (e.g. it couldn't be queued)"""
+        if not message_id:
+            return
+        self._local.pop(message_id, None)
+        if self.redis_store.client:
+            try:
+                await self.redis_store.client.delete(f"{self.KEY_PREFIX}{message_id}")
+            except Exception as e:
+                logger.error(f"Error releasing message id {message_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        hits = self.local_hits + self.redis_hits
+        total = hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "duplicate_rate": round(hits / total, 4) if total else 0.0,
+            "local_size": len(self._local)
+        }
+
+
+# Global instance
+message_deduplicator = MessageDeduplicator()
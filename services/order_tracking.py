@@ -8,6 +8,7 @@ import logging
 from typing import Dict, List, Optional, Tuple
 from utils.retry import retry_api_call
 from utils.error_handler import OrderTrackingError
+from utils.http_client import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +124,7 @@ class OrderTrackingService:
             logger.info(f"API URL: {self.base_url} with params: {params}")
             
             try:
-                response = requests.get(
+                response = http_clients.session("order_tracking").get(
                     self.base_url,
                     params=params,
                     timeout=10
@@ -138,7 +139,7 @@ class OrderTrackingService:
                         # Try UK (4) as fallback
                         logger.info(f"Retrying with website code 4 (UK)")
                         params_retry = {'webSiteCode': 4, 'orderNo': clean_order}
-                        response_retry = requests.get(self.base_url, params=params_retry, timeout=10)
+                        response_retry = http_clients.session("order_tracking").get(self.base_url, params=params_retry, timeout=10)
                         if response_retry.status_code == 200:
                             response = response_retry
                             website_code = 4
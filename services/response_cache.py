@@ -0,0 +1,138 @@
+"""
+Response Cache
+Caches bot answers in Redis so repeated questions skip the RAG + OpenAI call
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+from config.settings import RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES
+from database.async_redis_store import async_redis_store
+from utils.cache_keys import is_self_contained, normalize_query, response_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Response cache keyed on the normalized query, language and region
+
+    Keys are stable BLAKE2 digests (see utils.cache_keys), so every uvicorn
+    worker and every restart shares the same entries. A sorted set indexes
+    entries by last use; once it grows past max_entries the least recently
+    used entries are evicted, which keeps the cache within a fixed budget
+    regardless of how many distinct questions come in.
+    """
+
+    INDEX_KEY = "resp_cache:index"
+
+    # Longer messages are almost never repeated verbatim, so don't spend memory on them
+    MAX_QUERY_LENGTH = 500
+
+    def __init__(self, ttl: int = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.redis_store = async_redis_store
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # Metrics (per process)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _cacheable(self, query: str) -> bool:
+        """Skip very long queries and ones whose answer depends on the conversation ("yes please")"""
+        return len(normalize_query(query)) <= self.MAX_QUERY_LENGTH and is_self_contained(query)
+
+    async def get(self, query: str, language_code: Optional[str] = None, region: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            query: User query
+            language_code: User language
+            region: User region
+
+        Returns:
+            Cached response or None
+        """
+        client = self.redis_store.client
+        if not client or not self._cacheable(query):
+            return None
+
+        key = response_cache_key(query, language_code, region)
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.zadd(self.INDEX_KEY, {key: time.time()}, xx=True)  # refresh recency of existing entries only
+            response, _ = await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error reading response cache: {e}")
+            return None
+
+        if response is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return response
+
+    async def set(self, query: str, response: str, language_code: Optional[str] = None, region: Optional[str] = None):
+        """
+        Cache a response and evict least recently used entries beyond the budget
+
+        Args:
+            query: User query
+            response: Bot response
+            language_code: User language
+            region: User region
+        """
+        client = self.redis_store.client
+        if not client or not response or not self._cacheable(query):
+            return
+
+        key = response_cache_key(query, language_code, region)
+        now = time.time()
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.setex(key, self.ttl, response)
+            pipe.zadd(self.INDEX_KEY, {key: now})
+            pipe.zremrangebyscore(self.INDEX_KEY, "-inf", now - self.ttl)  # drop index entries whose keys expired
+            pipe.zcard(self.INDEX_KEY)
+            *_, size = await pipe.execute()
+            self.stores += 1
+
+            if size > self.max_entries:
+                await self._evict(client, size - self.max_entries)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error writing response cache: {e}")
+
+    async def _evict(self, client, count: int):
+        """Remove the least recently used entries"""
+        oldest = await client.zpopmin(self.INDEX_KEY, count)
+        keys = [member for member, _ in oldest]
+        if keys:
+            await client.delete(*keys)
+            self.evictions += len(keys)
+            logger.debug(f"Evicted {len(keys)} response cache entries")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction metrics"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl
+        }
+
+
+# Global instance
+response_cache = ResponseCache()
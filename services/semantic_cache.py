@@ -0,0 +1,243 @@
+"""
+Semantic Cache
+Reuses answers for questions that are worded differently but mean the same thing
+"""
+
+import base64
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config.settings import SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES, SEMANTIC_CACHE_TTL
+from database.async_redis_store import async_redis_store
+from utils.cache_keys import is_self_contained, query_digest
+
+logger = logging.getLogger(__name__)
+
+
+class _ScopeIndex:
+    """Flat cosine-similarity index over the cached questions of one scope"""
+
+    # Reload from Redis after this many seconds to pick up entries from other workers
+    REFRESH_INTERVAL = 300
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.answers: List[str] = []
+        self.matrix: Optional[np.ndarray] = None  # (n, dim) unit vectors
+        self.loaded_at = 0.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def stale(self) -> bool:
+        return time.monotonic() - self.loaded_at > self.REFRESH_INTERVAL
+
+    def add(self, entry_id: str, vector: np.ndarray, answer: str, max_entries: int):
+        """Add or replace an entry, dropping the oldest entries past max_entries"""
+        if entry_id in self.ids:
+            i = self.ids.index(entry_id)
+            self.answers[i] = answer
+            self.matrix[i] = vector
+            return
+
+        self.ids.append(entry_id)
+        self.answers.append(answer)
+        row = vector[np.newaxis, :]
+        self.matrix = row if self.matrix is None else np.vstack([self.matrix, row])
+
+        overflow = len(self.ids) - max_entries
+        if overflow > 0:
+            del self.ids[:overflow]
+            del self.answers[:overflow]
+            self.matrix = self.matrix[overflow:]
+
+    def search(self, vector: np.ndarray) -> Tuple[int, float]:
+        """Index and cosine similarity of the nearest entry (-1 if empty)"""
+        if self.matrix is None or not len(self.ids):
+            return -1, 0.0
+        scores = self.matrix @ vector
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+
+class SemanticCache:
+    """
+    Semantic cache of bot answers keyed on question embeddings
+
+    Entries are scoped by language and by the vector store's corpus version,
+    so an answer is only reused for users speaking the same language and only
+    while the knowledge base it was generated from is unchanged. Each scope is
+    held in memory as a matrix of normalized embeddings (a dot product finds
+    the nearest prior question) and persisted in a Redis hash so all workers
+    share entries and survive restarts.
+
+    Only self-contained messages are cached or looked up (see
+    utils.cache_keys.is_self_contained); short or anaphoric ones ("yes
+    please", "how much is it?") depend on the conversation. Answers to
+    self-contained messages are generated without conversation history (see
+    LLMHandler), so they can be shared between users. A sorted set per
+    scope indexes entries by write time: past max_entries or ttl the oldest
+    are removed from the hash, and loads read the newest entries first.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+                 ttl: int = SEMANTIC_CACHE_TTL):
+        self.redis_store = async_redis_store
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._scopes: Dict[str, _ScopeIndex] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+        self._lookup_ms = deque(maxlen=1000)
+
+    @staticmethod
+    def _scope_key(language_code: Optional[str], corpus_version: str) -> str:
+        return f"semantic_cache:{language_code or 'any'}:{corpus_version}"
+
+    @staticmethod
+    def _index_key(scope_key: str) -> str:
+        return f"{scope_key}:index"
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def _get_scope(self, scope_key: str) -> _ScopeIndex:
+        """Get a scope index, loading it from Redis on first use or when stale"""
+        index = self._scopes.get(scope_key)
+        if index is not None and not index.stale:
+            return index
+
+        index = _ScopeIndex()
+        client = self.redis_store.client
+        if client:
+            try:
+                # Newest first, so only the entries that will be kept are fetched and decoded
+                entry_ids = await client.zrevrangebyscore(
+                    self._index_key(scope_key), "+inf", time.time() - self.ttl, start=0, num=self.max_entries
+                )
+                payloads = await client.hmget(scope_key, entry_ids) if entry_ids else []
+                for entry_id, payload in reversed(list(zip(entry_ids, payloads))):
+                    if payload is None:
+                        continue
+                    entry = json.loads(payload)
+                    vector = np.frombuffer(base64.b64decode(entry["v"]), dtype=np.float32)
+                    index.add(entry_id, vector, entry["a"], self.max_entries)
+                if entry_ids:
+                    logger.info(f"✓ Loaded {len(index)} semantic cache entries for {scope_key}")
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error loading semantic cache {scope_key}: {e}")
+        index.loaded_at = time.monotonic()
+        self._scopes[scope_key] = index
+        return index
+
+    async def lookup(self, question: str, embedding: List[float], language_code: Optional[str], corpus_version: str) -> Optional[str]:
+        """
+        Find a stored answer for a near-duplicate question
+
+        Args:
+            question: Incoming message
+            embedding: Embedding of the incoming message
+            language_code: User language
+            corpus_version: VectorStore.corpus_version the answer must have been generated from
+
+        Returns:
+            Stored answer if the nearest question is above the similarity threshold, else None
+        """
+        if not is_self_contained(question):
+            return None
+
+        start = time.perf_counter()
+        index = await self._get_scope(self._scope_key(language_code, corpus_version))
+        best, score = index.search(self._normalize(embedding))
+        self._lookup_ms.append((time.perf_counter() - start) * 1000)
+
+        if best >= 0 and score >= self.threshold:
+            self.hits += 1
+            logger.info(f"✓ Semantic cache hit (similarity {score:.3f})")
+            return index.answers[best]
+
+        self.misses += 1
+        return None
+
+    async def add(self, question: str, embedding: List[float], answer: str, language_code: Optional[str], corpus_version: str):
+        """
+        Store an answer for a question
+
+        Args:
+            question: User message the answer was generated for
+            embedding: Embedding of the message
+            answer: Bot answer
+            language_code: User language
+            corpus_version: VectorStore.corpus_version used for retrieval
+        """
+        if not answer or not is_self_contained(question):
+            return
+
+        scope_key = self._scope_key(language_code, corpus_version)
+        index_key = self._index_key(scope_key)
+        index = await self._get_scope(scope_key)
+        entry_id = query_digest(question)
+        vector = self._normalize(embedding)
+        index.add(entry_id, vector, answer, self.max_entries)
+        self.stores += 1
+
+        client = self.redis_store.client
+        if not client:
+            return
+        try:
+            now = time.time()
+            payload = json.dumps({"q": question[:500], "a": answer, "v": base64.b64encode(vector.tobytes()).decode("ascii")})
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(scope_key, entry_id, payload)
+            pipe.zadd(index_key, {entry_id: now})
+            # Entries past max_entries (oldest first) or older than ttl
+            pipe.zrange(index_key, 0, -(self.max_entries + 1))
+            pipe.zrangebyscore(index_key, "-inf", now - self.ttl)
+            pipe.zremrangebyrank(index_key, 0, -(self.max_entries + 1))
+            pipe.zremrangebyscore(index_key, "-inf", now - self.ttl)
+            pipe.expire(scope_key, self.ttl)
+            pipe.expire(index_key, self.ttl)
+            results = await pipe.execute()
+
+            stale = set(results[2]) | set(results[3])
+            if stale:
+                await client.hdel(scope_key, *stale)
+                self.evictions += len(stale)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error persisting semantic cache entry: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate and lookup latency"""
+        lookups = self.hits + self.misses
+        latencies = sorted(self._lookup_ms)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "threshold": self.threshold,
+            "scopes": {key: len(index) for key, index in self._scopes.items()},
+            "lookup_ms_p50": round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+            "lookup_ms_p95": round(latencies[int(len(latencies) * 0.95)], 3) if latencies else 0.0
+        }
+
+
+# Global instance
+semantic_cache = SemanticCache()
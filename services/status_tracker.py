@@ -0,0 +1,152 @@
+"""
+Status Tracker
+Batches WhatsApp delivery/read receipts into bulk updates of messages.status
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from config.settings import STATUS_FLUSH_INTERVAL, STATUS_FLUSH_MAX_BATCH
+from database.postgres_store import postgres_store, PostgresStore
+from database.message_writer import message_writer
+
+logger = logging.getLogger(__name__)
+
+
+class StatusUpdateBatcher:
+    """
+    Collects status callbacks in memory and writes them on a timer
+
+    Only the most advanced status per message is kept (sent < delivered < read
+    < failed), so a burst of receipts for one message costs a single row update.
+    Buffered updates are written with one UPDATE per flush instead of one DB
+    round trip per receipt.
+    """
+
+    # Upper bound on buffered updates kept while the database is unavailable
+    MAX_BUFFERED = 50000
+
+    def __init__(self, flush_interval: float = STATUS_FLUSH_INTERVAL, max_batch: int = STATUS_FLUSH_MAX_BATCH):
+        self.postgres_store = postgres_store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: Dict[str, str] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.received = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+
+    def _merge(self, message_id: str, status: str):
+        """Keep the most advanced status for a message"""
+        ranks = PostgresStore.STATUS_RANKS
+        current = self._pending.get(message_id)
+        if current is None or ranks.get(status, 0) > ranks.get(current, 0):
+            self._pending[message_id] = status
+
+    def add(self, statuses: List[Dict[str, Any]]):
+        """
+        Buffer raw status objects from a webhook payload
+
+        Args:
+            statuses: Items of value.statuses (each has id, status, recipient_id, ...)
+        """
+        for item in statuses:
+            message_id = item.get("id")
+            status = item.get("status")
+            if not message_id or status not in PostgresStore.STATUS_RANKS:
+                continue
+
+            if status == "failed":
+                logger.warning(f"⚠️ Message {message_id} to {item.get('recipient_id')} failed: {item.get('errors')}")
+
+            if message_id not in self._pending and len(self._pending) >= self.MAX_BUFFERED:
+                self.dropped += 1
+                continue
+
+            self.received += 1
+            self._merge(message_id, status)
+
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ Status update batcher started (interval={self.flush_interval}s, max_batch={self.max_batch})")
+
+    async def stop(self):
+        """Stop the flush task and write whatever is still buffered"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        """Flush every interval, or sooner when the buffer reaches max_batch"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write buffered statuses to the database
+
+        Returns:
+            Number of rows updated
+        """
+        if not self._pending:
+            return 0
+
+        # Write buffered message rows first so receipts for just-sent messages find their row
+        await message_writer.flush()
+
+        batch = self._pending
+        self._pending = {}
+        start = time.perf_counter()
+
+        try:
+            updated = 0
+            items = list(batch.items())
+            for i in range(0, len(items), self.max_batch):
+                updated += await asyncio.to_thread(self.postgres_store.update_message_statuses, dict(items[i:i + self.max_batch]))
+            self.written += updated
+            self.flushes += 1
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+            logger.debug(f"📬 Flushed {len(batch)} status updates ({updated} rows) in {self.last_flush_ms:.1f}ms")
+            return updated
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"❌ Error flushing status updates, will retry next interval: {e}")
+            # Put the batch back without overwriting newer statuses that arrived meanwhile
+            for message_id, status in batch.items():
+                self._merge(message_id, status)
+            return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching metrics"""
+        return {
+            "buffered": len(self._pending),
+            "received": self.received,
+            "rows_updated": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
+
+
+# Global instance
+status_update_batcher = StatusUpdateBatcher()
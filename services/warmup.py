@@ -0,0 +1,117 @@
+"""
+Startup Warm-up
+Runs slow initialization (vector store, document sync, indexes) after the app is already serving
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Set when this module is first imported (during app import, before the server listens)
+PROCESS_STARTED = time.perf_counter()
+
+
+class Warmup:
+    """
+    Ordered list of blocking warm-up steps run in a worker thread
+
+    Steps run one after another in the order they were added. A failed
+    required step leaves the app not ready. A failed optional step is logged
+    and skipped, e.g. a document sync while OpenAI is down still serves from
+    the existing index. The app counts as ready once every step has run.
+    """
+
+    def __init__(self):
+        self._steps: List[Tuple[str, Callable[[], Any], bool]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._done: Optional[asyncio.Event] = None
+        self.state = "pending"  # pending -> warming_up -> ready | failed
+        self.step_seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.ready_after: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def add_step(self, name: str, func: Callable[[], Any], required: bool = False):
+        """
+        Register a blocking warm-up step
+
+        Args:
+            name: Label used in logs and stats
+            func: Callable run in a worker thread
+            required: If True, a failure leaves the app not ready
+        """
+        self._steps.append((name, func, required))
+
+    def start(self):
+        """Run the steps in a background task (the app serves meanwhile)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        """Run all steps now"""
+        self._done = self._done or asyncio.Event()
+        self.state = "warming_up"
+        started = time.perf_counter()
+        logger.info(f"🔥 Warming up ({len(self._steps)} steps)")
+
+        failed = False
+        for name, func, required in self._steps:
+            step_start = time.perf_counter()
+            try:
+                result = await asyncio.to_thread(func)
+                self.step_seconds[name] = round(time.perf_counter() - step_start, 3)
+                logger.info(f"✓ Warm-up step '{name}' done in {self.step_seconds[name]}s" + (f" ({result})" if result is not None else ""))
+            except Exception as e:
+                self.step_seconds[name] = round(time.perf_counter() - step_start, 3)
+                self.errors[name] = str(e)
+                logger.error(f"❌ Warm-up step '{name}' failed: {e}", exc_info=True)
+                if required:
+                    failed = True
+                    break
+
+        self.state = "failed" if failed else "ready"
+        if not failed:
+            self.ready_after = round(time.perf_counter() - PROCESS_STARTED, 3)
+        self._done.set()
+        if failed:
+            logger.error(f"❌ Warm-up failed after {time.perf_counter() - started:.2f}s")
+        else:
+            logger.info(f"✅ Warm-up complete in {time.perf_counter() - started:.2f}s (ready {self.ready_after}s after start)")
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for warm-up to finish
+
+        Args:
+            timeout: Seconds to wait (None = no limit)
+
+        Returns:
+            True if ready
+        """
+        self._done = self._done or asyncio.Event()
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.ready
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get warm-up state and step timings"""
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "ready_after_seconds": self.ready_after,
+            "uptime_seconds": round(time.perf_counter() - PROCESS_STARTED, 3),
+            "steps": self.step_seconds,
+            "errors": self.errors
+        }
+
+
+# Global instance
+warmup = Warmup()
@@ -0,0 +1,83 @@
+"""Test that a reply's last-message tracking survives the clear made earlier in the same message"""
+
+import asyncio
+import json
+
+from database.async_redis_store import async_redis_store
+from database.message_writer import message_writer
+from database.redis_session import UserSession, current_session
+
+
+class FakeRedis:
+    """In-memory stand-in for the async Redis client (string and list commands used by UserSession)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.ops.append((name, args, kwargs))
+
+    async def execute(self):
+        data = self.client.data
+        results = []
+        for name, args, _ in self.ops:
+            if name == "mget":
+                results.append([data.get(key) for key in args[0]])
+            elif name == "lrange":
+                results.append(list(data.get(args[0], [])))
+            elif name in ("set", "setex"):
+                data[args[0]] = args[-1]
+                results.append(True)
+            elif name == "delete":
+                results.append(sum(data.pop(key, None) is not None for key in args))
+            elif name == "rpush":
+                data.setdefault(args[0], []).extend(args[1:])
+                results.append(len(data[args[0]]))
+            else:
+                results.append(True)
+        self.ops = []
+        return results
+
+
+async def clear_send_flush_sequence():
+    user_id = "447700900000"
+    key = f"last_message:{user_id}"
+    client = FakeRedis()
+    client.data[key] = json.dumps({"content": "previous question", "timestamp": "2024-01-01T00:00:00", "step_info": {}})
+    async_redis_store.client = client
+
+    session = UserSession(client, user_id)
+    await session.load()
+    token = current_session.set(session)
+    try:
+        # User is back: the handler clears tracking (the DEL is deferred to the session flush)
+        await async_redis_store.clear_last_message_sent(user_id)
+        # The reply is sent mid-processing and records the new last message
+        message_writer.set_last_message(user_id, "Which size would you like?", {"flow": "bulk_ordering", "state": "size"})
+        # The writer's timer fires before processing ends
+        await message_writer.flush()
+    finally:
+        current_session.reset(token)
+    await session.flush()
+
+    stored = client.data.get(key)
+    assert stored is not None, "last_message was deleted by the session flush"
+    assert json.loads(stored)["content"] == "Which size would you like?"
+
+
+def test_last_message_survives_clear_then_send():
+    asyncio.run(clear_send_flush_sequence())
+
+
+if __name__ == "__main__":
+    test_last_message_survives_clear_then_send()
+    print("✅ last_message tracking survives clear -> send -> writer flush -> session flush")
@@ -0,0 +1,34 @@
+"""Test that context chunks take priority over history when the prompt budget runs out"""
+
+from bot.prompt_builder import PromptBuilder
+
+TEMPLATE = "Rules: answer from the context only.\nContext:\n{context}\nHistory:\n{history}\nCustomer: {message}\n"
+
+
+def test_last_chunk_partially_included_before_history():
+    probe = PromptBuilder(TEMPLATE, budget=10000)
+    message = "What sizes do canvas prints come in?"
+    first = "Canvas prints come in small, medium and large."
+    second = " ".join(f"Canvas size option {i} is {20 + i}x{30 + i}cm on an 18mm frame." for i in range(40))
+    history = [
+        {"role": "user", "content": "Hello"},
+        {"role": "assistant", "content": "Hi! How can I help you today?"}
+    ]
+
+    # Room for the message, the whole first chunk and about 20 tokens of the second, nothing more
+    context_budget = probe.count(first) + 1 + 20
+    budget = probe.template_tokens + probe.count(message) + context_budget
+    builder = PromptBuilder(TEMPLATE, budget=budget, chunk_max_tokens=500)
+
+    prompt, context, counts = builder.build(message, [first, second], history)
+
+    assert counts["context_chunks"] == 2, counts
+    included_second = context.split("\n", 1)[1]
+    assert second.startswith(included_second) and len(included_second) < len(second)
+    assert counts["history_turns"] == 0, counts
+    assert counts["total"] <= budget, counts
+
+
+if __name__ == "__main__":
+    test_last_chunk_partially_included_before_history()
+    print("✅ Truncated last chunk is included before any history")
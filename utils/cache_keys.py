@@ -0,0 +1,78 @@
+"""Stable cache keys derived from user text"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Optional
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,!?¿¡;:'\"“”‘’()"
+
+# Words that point back at earlier turns ("how much is it?", "what about the blue one", "yes please")
+_ANAPHORA = re.compile(
+    r"\b(it|its|it's|this|that|these|those|they|them|their|one|ones|same|another|other|else|also|too|"
+    r"yes|yeah|yep|no|nope|ok|okay|sure|what about|how about)\b"
+)
+
+# Shorter messages rarely stand on their own
+MIN_SELF_CONTAINED_WORDS = 4
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a user query so trivially different phrasings share a cache entry
+
+    Applies Unicode NFKC, lowercases, collapses whitespace and strips
+    punctuation from both ends ("What sizes do you have?" == "what sizes do you have").
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        Normalized text (may be empty)
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _WHITESPACE.sub(" ", text)
+    return text.strip(_EDGE_PUNCTUATION)
+
+
+def query_digest(text: str) -> str:
+    """
+    Stable 128-bit BLAKE2b digest of the normalized query
+
+    Unlike hash(), this is identical across processes and restarts.
+    """
+    return hashlib.blake2b(normalize_query(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def is_self_contained(text: str) -> bool:
+    """
+    Whether a message can be answered without the conversation before it
+
+    Short messages and messages that refer back to earlier turns get a
+    different answer in every conversation, so answers to them must not be
+    shared between users.
+
+    Args:
+        text: Raw message text
+
+    Returns:
+        False for short or anaphoric messages
+    """
+    normalized = normalize_query(text)
+    return len(normalized.split()) >= MIN_SELF_CONTAINED_WORDS and not _ANAPHORA.search(normalized)
+
+
+def response_cache_key(query: str, language_code: Optional[str] = None, region: Optional[str] = None) -> str:
+    """
+    Redis key for a cached bot response
+
+    Args:
+        query: User query
+        language_code: Language the response was written in
+        region: User region (prices and shipping answers differ per region)
+
+    Returns:
+        Key of the form resp_cache:<lang>:<region>:<digest>
+    """
+    return f"resp_cache:{language_code or 'any'}:{region or 'any'}:{query_digest(query)}"
@@ -0,0 +1,185 @@
+"""Shared outbound HTTP clients with tuned connection pools, timeouts and pool metrics"""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, Optional
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import (
+    HTTP2_ENABLED,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_WRITE_TIMEOUT,
+    HTTP_POOL_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+
+class HTTPClientFactory:
+    """
+    Named, long-lived httpx.AsyncClient instances shared by every service that calls out
+
+    Each name (e.g. "whatsapp", "uploadcare") gets one client, created on first
+    use with explicit connect/read/write/pool timeouts and keep-alive limits.
+    httpx pools connections per host inside a client, so repeated calls reuse
+    warm TCP/TLS connections instead of handshaking per request. With HTTP/2
+    (when the h2 package is installed) concurrent sends to graph.facebook.com
+    are multiplexed over a few connections. Request/response counts are
+    collected with event hooks, and pool usage is read from the transport.
+
+    Services that still make blocking calls with requests get a shared
+    requests.Session per name from session(), so they keep connections alive too.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._counters: Dict[str, Counter] = {}
+
+    def get(
+        self,
+        name: str,
+        http2: bool = False,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None
+    ) -> httpx.AsyncClient:
+        """
+        Get (or create) the shared client for a service
+
+        Args:
+            name: Client name; callers using the same name share one pool
+            http2: Negotiate HTTP/2 where the server supports it (only if HTTP2_ENABLED and h2 is installed)
+            timeout: Read/write timeout override for slow endpoints (e.g. uploads)
+            max_connections: Pool size override
+
+        Returns:
+            Shared AsyncClient (do not close it; close() closes all clients on shutdown)
+        """
+        client = self._clients.get(name)
+        if client is not None and not client.is_closed:
+            return client
+
+        use_http2 = http2 and HTTP2_ENABLED
+        if use_http2 and not H2_AVAILABLE:
+            logger.warning(f"⚠️ HTTP/2 requested for '{name}' but h2 is not installed - using HTTP/1.1")
+            use_http2 = False
+
+        counters = self._counters.setdefault(name, Counter())
+
+        async def on_request(request: httpx.Request):
+            counters["requests"] += 1
+
+        async def on_response(response: httpx.Response):
+            counters[response.http_version] += 1
+            if response.status_code >= 500:
+                counters["server_errors"] += 1
+            elif response.status_code >= 400:
+                counters["client_errors"] += 1
+
+        client = httpx.AsyncClient(
+            http2=use_http2,
+            timeout=httpx.Timeout(
+                connect=HTTP_CONNECT_TIMEOUT,
+                read=timeout or HTTP_READ_TIMEOUT,
+                write=timeout or HTTP_WRITE_TIMEOUT,
+                pool=HTTP_POOL_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=max_connections or HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=min(HTTP_MAX_KEEPALIVE, max_connections or HTTP_MAX_CONNECTIONS),
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            event_hooks={"request": [on_request], "response": [on_response]}
+        )
+        self._clients[name] = client
+        logger.info(f"✓ HTTP client '{name}' created (http2={use_http2}, max_connections={max_connections or HTTP_MAX_CONNECTIONS})")
+        return client
+
+    def session(self, name: str) -> requests.Session:
+        """
+        Get (or create) the shared blocking session for a service
+
+        Args:
+            name: Session name; callers using the same name share one pool
+
+        Returns:
+            Shared requests.Session (timeouts are still passed per call)
+        """
+        session = self._sessions.get(name)
+        if session is not None:
+            return session
+
+        counters = self._counters.setdefault(name, Counter())
+
+        def on_response(response: requests.Response, *args, **kwargs):
+            counters["requests"] += 1
+            if response.status_code >= 500:
+                counters["server_errors"] += 1
+            elif response.status_code >= 400:
+                counters["client_errors"] += 1
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_MAX_KEEPALIVE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.hooks["response"].append(on_response)
+        self._sessions[name] = session
+        return session
+
+    @staticmethod
+    def _pool_usage(client: httpx.AsyncClient) -> Dict[str, Any]:
+        """Open/idle connections per host, read from the transport's connection pool"""
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+
+        hosts: Dict[str, Counter] = {}
+        for connection in connections:
+            origin = getattr(connection, "_origin", None)
+            host = origin.host.decode() if origin is not None else "unknown"
+            counts = hosts.setdefault(host, Counter())
+            counts["open"] += 1
+            if connection.is_idle():
+                counts["idle"] += 1
+        return {host: dict(counts) for host, counts in hosts.items()}
+
+    async def close(self):
+        """Close all clients (call once on shutdown)"""
+        for name, client in self._clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing HTTP client '{name}': {e}")
+        self._clients = {}
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request counts and pool usage per client"""
+        stats = {
+            name: {
+                **dict(self._counters.get(name, {})),
+                "pool": self._pool_usage(client)
+            }
+            for name, client in self._clients.items()
+        }
+        for name in self._sessions:
+            stats[name] = dict(self._counters.get(name, {}))
+        return stats
+
+
+# Global instance
+http_clients = HTTPClientFactory()
@@ -0,0 +1,211 @@
+"""Outbound send scheduler pacing WhatsApp messages to Graph API throughput and pair rate limits"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config.settings import (
+    SEND_RATE_PER_NUMBER,
+    SEND_BURST_PER_NUMBER,
+    SEND_RATE_PER_RECIPIENT,
+    SEND_BURST_PER_RECIPIENT,
+    SEND_MAX_RETRIES
+)
+
+logger = logging.getLogger(__name__)
+
+# Graph API error codes meaning "slow down" (returned with HTTP 400/429)
+RATE_LIMIT_ERROR_CODES = {4, 80007, 130429, 131048, 131056}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate tokens/sec up to burst"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.burst
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SendScheduler:
+    """
+    Paces sends per sender phone number and per recipient
+
+    Each send waits for a token from the sender's bucket (Cloud API throughput)
+    and from the recipient's bucket (pair rate limit), then runs. Sends to the
+    same recipient go through a FIFO lock, so a multi-part reply arrives in
+    order even when an earlier part is being retried. Rate-limit responses
+    (HTTP 429 or the Graph "too many messages" error codes) are retried after
+    Retry-After, or with exponential backoff when the header is absent; other
+    responses are returned to the caller unchanged.
+    """
+
+    # Latency samples kept for percentiles
+    LATENCY_SAMPLES = 1000
+
+    # Prune idle recipient buckets once this many are tracked
+    MAX_RECIPIENT_BUCKETS = 10000
+
+    def __init__(
+        self,
+        number_rate: float = SEND_RATE_PER_NUMBER,
+        number_burst: int = SEND_BURST_PER_NUMBER,
+        recipient_rate: float = SEND_RATE_PER_RECIPIENT,
+        recipient_burst: int = SEND_BURST_PER_RECIPIENT,
+        max_retries: int = SEND_MAX_RETRIES
+    ):
+        self.number_rate = number_rate
+        self.number_burst = number_burst
+        self.recipient_rate = recipient_rate
+        self.recipient_burst = recipient_burst
+        self.max_retries = max_retries
+        self._number_buckets: Dict[str, TokenBucket] = {}
+        self._recipient_buckets: Dict[str, TokenBucket] = {}
+        self._recipient_locks: Dict[str, asyncio.Lock] = {}
+        self._recipient_waiting: Dict[str, int] = {}
+        self._latencies = deque(maxlen=self.LATENCY_SAMPLES)
+
+        # Metrics
+        self.queued = 0
+        self.in_flight = 0
+        self.sent = 0
+        self.rate_limited = 0
+        self.gave_up = 0
+
+    def _bucket(self, buckets: Dict[str, TokenBucket], key: str, rate: float, burst: int) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            if buckets is self._recipient_buckets and len(buckets) >= self.MAX_RECIPIENT_BUCKETS:
+                # A full bucket behaves exactly like a new one, so dropping it loses nothing
+                for idle in [k for k, b in buckets.items() if b.full]:
+                    del buckets[idle]
+            bucket = buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    @staticmethod
+    def _retry_delay(response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, or None if it isn't one"""
+        if response.status_code != 429:
+            if response.status_code != 400:
+                return None
+            try:
+                code = response.json().get("error", {}).get("code")
+            except Exception:
+                return None
+            if code not in RATE_LIMIT_ERROR_CODES:
+                return None
+
+        retry_after = response.headers.get("Retry-After")
+        try:
+            return max(0.0, float(retry_after))
+        except (TypeError, ValueError):
+            return min(30.0, 2.0 ** attempt)
+
+    async def send(self, sender: str, recipient: str, request: Callable[[], Awaitable[Any]]):
+        """
+        Run a send request once the rate limits allow it
+
+        Args:
+            sender: Phone number id the message is sent from
+            recipient: Recipient phone number (ordering and pair limit are per recipient)
+            request: Coroutine function performing the HTTP call; returns the httpx response
+
+        Returns:
+            Response of the last attempt (the caller checks its status as before)
+        """
+        submitted = time.perf_counter()
+        started = False
+        self.queued += 1
+        self._recipient_waiting[recipient] = self._recipient_waiting.get(recipient, 0) + 1
+        lock = self._recipient_locks.setdefault(recipient, asyncio.Lock())
+        try:
+            async with lock:
+                attempt = 0
+                while True:
+                    await self._bucket(self._number_buckets, sender, self.number_rate, self.number_burst).acquire()
+                    await self._bucket(self._recipient_buckets, recipient, self.recipient_rate, self.recipient_burst).acquire()
+
+                    if not started:
+                        started = True
+                        self.queued -= 1
+                        self.in_flight += 1
+                    response = await request()
+
+                    delay = self._retry_delay(response, attempt)
+                    if delay is None:
+                        self.sent += 1
+                        self._latencies.append(time.perf_counter() - submitted)
+                        return response
+
+                    self.rate_limited += 1
+                    if attempt >= self.max_retries:
+                        self.gave_up += 1
+                        logger.error(f"❌ Still rate limited sending to {recipient} after {attempt + 1} attempts")
+                        return response
+
+                    attempt += 1
+                    logger.warning(f"⚠️ Rate limited sending to {recipient} (HTTP {response.status_code}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+        finally:
+            if started:
+                self.in_flight -= 1
+            else:
+                self.queued -= 1
+            self._release(recipient)
+
+    def _release(self, recipient: str):
+        """Forget the recipient's lock once nobody is waiting on it"""
+        remaining = self._recipient_waiting.get(recipient, 1) - 1
+        if remaining:
+            self._recipient_waiting[recipient] = remaining
+        else:
+            self._recipient_waiting.pop(recipient, None)
+            self._recipient_locks.pop(recipient, None)
+
+    @staticmethod
+    def _percentile(values, q: float) -> float:
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, outcomes and send latency percentiles"""
+        latencies = sorted(self._latencies)
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "recipients_waiting": len(self._recipient_waiting),
+            "sent": self.sent,
+            "rate_limited": self.rate_limited,
+            "gave_up": self.gave_up,
+            "latency_ms": {
+                "p50": round(self._percentile(latencies, 0.50) * 1000, 1),
+                "p90": round(self._percentile(latencies, 0.90) * 1000, 1),
+                "p99": round(self._percentile(latencies, 0.99) * 1000, 1)
+            }
+        }
+
+
+# Global instance
+send_scheduler = SendScheduler()
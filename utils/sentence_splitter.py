@@ -0,0 +1,27 @@
+"""Sentence boundary detection for streamed LLM output"""
+
+import re
+
+# Terminal punctuation (optionally followed by closing quotes/brackets) plus whitespace, or a blank line
+_BOUNDARY = re.compile(r'[.!?…]+["\'”’)\]]*\s+|\n\s*\n')
+
+
+def last_sentence_boundary(text: str) -> int:
+    """
+    Find where the last complete sentence in a partial text ends
+
+    Numbered list markers ("1. ") are not treated as sentence ends.
+
+    Args:
+        text: Text generated so far
+
+    Returns:
+        Index just past the last complete sentence (0 if there is none yet)
+    """
+    end = 0
+    for match in _BOUNDARY.finditer(text):
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        if text[line_start:match.start()].strip().isdigit():
+            continue
+        end = match.end()
+    return end
@@ -0,0 +1,142 @@
+"""Supervisor for background tasks with a concurrency limit and graceful drain"""
+
+import asyncio
+import logging
+from typing import Any, Coroutine, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TaskSupervisor:
+    """
+    Runs coroutines as tracked tasks with at most max_concurrency running at once
+
+    Callers awaiting run() wait for a free slot (counted as queued), so bursts
+    queue up instead of opening unbounded concurrent OpenAI/HTTP calls. On
+    shutdown, drain() stops accepting work and gives in-flight tasks until a
+    deadline to finish before cancelling them.
+    """
+
+    def __init__(self, max_concurrency: int, max_queued: Optional[int] = None, name: str = "tasks"):
+        """
+        Args:
+            max_concurrency: Maximum number of tasks running at once
+            max_queued: Maximum callers waiting for a slot before new work is rejected (None = unbounded)
+            name: Label used in logs
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queued = max_queued
+        self.name = name
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._queued = 0
+        self._closing = False
+
+        # Metrics
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+
+    @property
+    def accepting(self) -> bool:
+        """False once drain() has been called"""
+        return not self._closing
+
+    async def run(self, coro: Coroutine[Any, Any, Any]) -> bool:
+        """
+        Run a coroutine under the concurrency limit and wait for it to finish
+
+        The coroutine runs in its own task, so cancelling the caller does not
+        interrupt it - only drain() cancels in-flight work.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            True if the coroutine ran, False if it was rejected (draining or queue full)
+
+        Raises:
+            Whatever the coroutine raises
+        """
+        if self._closing or (self.max_queued is not None and self._queued >= self.max_queued):
+            return self._reject(coro)
+
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            coro.close()
+            raise
+        finally:
+            self._queued -= 1
+
+        if self._closing:
+            self._semaphore.release()
+            return self._reject(coro)
+
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        self.started += 1
+        task.add_done_callback(self._on_done)
+
+        await asyncio.shield(task)
+        return True
+
+    def _reject(self, coro: Coroutine[Any, Any, Any]) -> bool:
+        """Discard a coroutine that will not be run"""
+        coro.close()
+        self.rejected += 1
+        return False
+
+    def _on_done(self, task: asyncio.Task):
+        """Release the slot and record the outcome"""
+        self._tasks.discard(task)
+        self._semaphore.release()
+        if task.cancelled():
+            self.cancelled += 1
+        elif task.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Stop accepting work and wait for in-flight tasks
+
+        Args:
+            timeout: Seconds to wait before cancelling tasks that are still running
+
+        Returns:
+            Number of tasks that had to be cancelled
+        """
+        self._closing = True
+        if not self._tasks:
+            return 0
+
+        logger.info(f"⏳ Draining {len(self._tasks)} in-flight {self.name} (deadline {timeout}s)")
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(f"⚠️ Cancelled {len(pending)} {self.name} still running after {timeout}s")
+        else:
+            logger.info(f"✅ All in-flight {self.name} finished")
+        return len(pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get in-flight/queued/rejected counts"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": len(self._tasks),
+            "queued": self._queued,
+            "accepting": self.accepting,
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled
+        }
@@ -0,0 +1,92 @@
+"""Fast-path parsing of WhatsApp webhook payloads"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+
+    def loads(data: bytes) -> Any:
+        """Decode JSON bytes (orjson)"""
+        return orjson.loads(data)
+except ImportError:  # pragma: no cover - orjson is optional
+    import json
+
+    def loads(data: bytes) -> Any:
+        """Decode JSON bytes (stdlib fallback)"""
+        return json.loads(data)
+
+logger = logging.getLogger(__name__)
+
+
+def _build_message_data(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a raw WhatsApp message object to the dict process_message expects
+
+    Returns:
+        Message dict, or None for unsupported message types
+    """
+    message_type = message.get("type")
+    message_data = {
+        "from": message.get("from"),
+        "message_id": message.get("id"),
+        "timestamp": message.get("timestamp"),
+        "type": message_type
+    }
+
+    if message_type == "text":
+        message_data["text"] = message.get("text", {}).get("body", "")
+        return message_data
+
+    if message_type == "interactive":
+        interactive = message.get("interactive", {})
+        interactive_type = interactive.get("type")
+        if interactive_type == "button_reply":
+            message_data["button_id"] = interactive.get("button_reply", {}).get("id")
+            message_data["interactive_type"] = "button"
+            return message_data
+        if interactive_type == "list_reply":
+            message_data["list_id"] = interactive.get("list_reply", {}).get("id")
+            message_data["interactive_type"] = "list"
+            return message_data
+        return None
+
+    if message_type == "image":
+        image_data = message.get("image", {})
+        message_data["media_id"] = image_data.get("id")
+        message_data["mime_type"] = image_data.get("mime_type")
+        return message_data
+
+    return None
+
+
+def parse_webhook(body: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Extract messages and status callbacks from every entry/change of a webhook body
+
+    WhatsApp may batch several entries and changes into one delivery, so all of
+    them are walked rather than just entry[0].changes[0].
+
+    Args:
+        body: Decoded webhook JSON
+
+    Returns:
+        Tuple of (message dicts ready for processing, raw status objects)
+    """
+    messages = []
+    statuses = []
+
+    for entry in body.get("entry") or []:
+        for change in entry.get("changes") or []:
+            value = change.get("value") or {}
+
+            for message in value.get("messages") or []:
+                message_data = _build_message_data(message)
+                if message_data:
+                    messages.append(message_data)
+                else:
+                    logger.info(f"ℹ️ Unsupported message type: {message.get('type')}")
+
+            statuses.extend(value.get("statuses") or [])
+
+    return messages, statuses